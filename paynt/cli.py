@@ -1,19 +1,10 @@
-from . import version
-
-import paynt.utils.timer
-import paynt.parser.sketch
+import time
+# moment the CLI started loading, used to report the startup cost
+cli_load_start = time.perf_counter()
 
-import paynt.quotient.quotient
-import paynt.quotient.pomdp
-import paynt.quotient.decpomdp
-import paynt.quotient.posmg
-import paynt.quotient.storm_pomdp_control
-import paynt.quotient.mdp
+from . import version
 
-import paynt.synthesizer.synthesizer
-import paynt.synthesizer.synthesizer_cegis
-import paynt.synthesizer.policy_tree
-import paynt.synthesizer.decision_tree
+# synthesis modules are imported in paynt_run, each run loads only the modules it needs
 
 import click
 import sys
@@ -67,17 +58,49 @@ def setup_logger(log_path = None):
     help="timeout (s)")
 
 @click.option("--export",
-    type=click.Choice(['jani', 'drn', 'pomdp']),
+    type=click.Choice(['jani', 'drn', 'pomdp', 'binary']),
     help="export the model to specified format and abort")
+@click.option("--quotient-cache", type=click.Path(file_okay=False), default=None,
+    help="directory to cache quotients constructed from PRISM sketches in")
+@click.option("--symbolic", is_flag=True, default=False,
+    help="represent the quotient of a PRISM sketch symbolically (BDD) and model check it via the DD engine")
+@click.option("--symbolic-sparse-size", type=int, default=256, show_default=True,
+    help="symbolic quotient: families of at most this size are evaluated member by member")
+@click.option("--symbolic-memory-limit", type=int, default=4096, show_default=True,
+    help="memory limit (in MB) of the BDD library (symbolic quotient, all-in-one with the bdd engine)")
+@click.option("--batch", type=click.Path(exists=True), default=None,
+    help="construct the quotient once and synthesize each job (properties, method, options) of the given JSON manifest; --method, --relative-error and --optimum-threshold are defaults for the jobs")
 
 @click.option("--method",
-    type=click.Choice(['onebyone', 'ar', 'cegis', 'hybrid', 'ar_multicore']),
+    type=click.Choice(['onebyone', 'ar', 'cegis', 'hybrid', 'ar_multicore', 'all_in_one']),
     default="ar", show_default=True,
     help="synthesis method"
     )
+@click.option("--all-in-one-engine", type=click.Choice(["sparse", "bdd"]), default="sparse", show_default=True,
+    help="all-in-one: engine used to build and check the all-in-one model")
 
 @click.option("--disable-expected-visits", is_flag=True, default=False,
     help="do not compute expected visits for the splitting heuristic")
+@click.option("--expected-visits-approximation", type=int, default=None,
+    help="approximate expected visits for families of at most this size")
+@click.option("--exploration-order", type=click.Choice(["dfs", "best-first"]), default="dfs", show_default=True,
+    help="AR: order in which families are explored; best-first explores families with the most promising optimality bound first")
+@click.option("--compact-frontier", is_flag=True, default=False,
+    help="store families awaiting exploration in a packed form and release their models")
+@click.option("--frontier-spill-size", type=int, default=None,
+    help="keep at most this many families awaiting exploration in memory, spill the rest to disk (implies --compact-frontier)")
+@click.option("--checkpoint", type=click.Path(), default=None,
+    help="periodically save the state of the synthesis to this file (AR, CEGIS, hybrid)")
+@click.option("--checkpoint-interval", type=int, default=300, show_default=True,
+    help="minimum time (in seconds) between two consecutive checkpoints")
+@click.option("--resume", type=click.Path(exists=True), default=None,
+    help="resume the synthesis from the given checkpoint")
+@click.option("--lazy-secondary", is_flag=True, default=False,
+    help="AR: check the secondary direction of a constraint only if it is likely to decide the family")
+@click.option("--disable-warm-start", is_flag=True, default=False,
+    help="AR: do not use values of the parent MDP as starting values when model checking sub-MDPs")
+@click.option("--evaluation-threads", type=int, default=1, show_default=True,
+    help="1-by-1: number of threads used to evaluate batches of hole assignments")
 
 @click.option("--fsc-synthesis", is_flag=True, default=False,
     help="enable incremental synthesis of FSCs for a (Dec-)POMDP")
@@ -147,9 +170,10 @@ def setup_logger(log_path = None):
 
 def paynt_run(
     project, sketch, props, relative_error, optimum_threshold, precision, exact, timeout,
-    export,
-    method,
-    disable_expected_visits,
+    export, quotient_cache, symbolic, symbolic_sparse_size, symbolic_memory_limit, batch,
+    method, all_in_one_engine,
+    disable_expected_visits, expected_visits_approximation, exploration_order, compact_frontier, frontier_spill_size,
+    checkpoint, checkpoint_interval, resume, lazy_secondary, disable_warm_start, evaluation_threads,
     fsc_synthesis, fsc_memory_size, posterior_aware,
     storm_pomdp, iterative_storm, get_storm_result, storm_options, prune_storm,
     use_storm_cutoffs, unfold_strategy_storm,
@@ -163,18 +187,56 @@ def paynt_run(
     generated_fsc_route,
 ):
 
+    startup_time = time.perf_counter() - cli_load_start
     profiler = None
     if profiling:
         profiler = cProfile.Profile()
         profiler.enable()
+
+    import paynt.utils.timer
+    import paynt.parser.sketch
+    import paynt.parser.quotient_cache
+    import paynt.models.models
+    import paynt.quotient.quotient
+    import paynt.quotient.pomdp
+    import paynt.quotient.decpomdp
+    import paynt.quotient.posmg
+    import paynt.quotient.mdp
+    import paynt.synthesizer.synthesizer
     paynt.utils.timer.GlobalTimer.start(timeout)
 
     logger.info("This is Paynt version {}.".format(version()))
 
     # set CLI parameters
+    paynt.parser.quotient_cache.QuotientCache.directory = quotient_cache
+    if symbolic:
+        import paynt.quotient.symbolic
+        paynt.quotient.symbolic.SymbolicQuotient.sparse_family_size = symbolic_sparse_size
+        paynt.quotient.symbolic.SymbolicQuotient.memory_limit_mb = symbolic_memory_limit
     paynt.quotient.quotient.Quotient.disable_expected_visits = disable_expected_visits
+    paynt.quotient.quotient.Quotient.expected_visits_approximation_threshold = expected_visits_approximation
+    # modules of individual synthesizers are imported only if their options differ from the defaults, the synthesizer
+    # itself is imported once chosen (see Synthesizer.choose_synthesizer)
+    if exploration_order != "dfs" or lazy_secondary:
+        import paynt.synthesizer.synthesizer_ar
+        paynt.synthesizer.synthesizer_ar.SynthesizerAR.exploration_order = exploration_order
+        paynt.synthesizer.synthesizer_ar.SynthesizerAR.lazy_secondary = lazy_secondary
+    if compact_frontier or frontier_spill_size is not None:
+        import paynt.synthesizer.frontier
+        paynt.synthesizer.frontier.Frontier.compact = compact_frontier
+        paynt.synthesizer.frontier.Frontier.spill_size = frontier_spill_size
+    if checkpoint is not None or resume is not None:
+        import paynt.synthesizer.checkpoint
+        paynt.synthesizer.checkpoint.Checkpoint.path = checkpoint
+        paynt.synthesizer.checkpoint.Checkpoint.interval = checkpoint_interval
+        paynt.synthesizer.checkpoint.Checkpoint.resume_path = resume
+    paynt.quotient.quotient.Quotient.evaluation_threads = evaluation_threads
+    paynt.models.models.SubMdp.warm_start = not disable_warm_start
     paynt.synthesizer.synthesizer.Synthesizer.export_synthesis_filename_base = export_synthesis
-    paynt.synthesizer.synthesizer_cegis.SynthesizerCEGIS.conflict_generator_type = ce_generator
+    if ce_generator != "dtmc":
+        # CEGIS loads the SMT stack
+        import paynt.synthesizer.synthesizer_cegis
+        paynt.synthesizer.synthesizer_cegis.SynthesizerCEGIS.conflict_generator_type = ce_generator
     paynt.quotient.pomdp.PomdpQuotient.initial_memory_size = fsc_memory_size
     paynt.quotient.pomdp.PomdpQuotient.posterior_aware = posterior_aware
     paynt.quotient.decpomdp.DecPomdpQuotient.initial_memory_size = fsc_memory_size
@@ -182,15 +244,20 @@ def paynt_run(
     
     paynt.cli.memory_constraint = memory_constraint
 
-    paynt.synthesizer.policy_tree.SynthesizerPolicyTree.discard_unreachable_choices = mdp_discard_unreachable_choices
+    if mdp_discard_unreachable_choices:
+        import paynt.synthesizer.policy_tree
+        paynt.synthesizer.policy_tree.SynthesizerPolicyTree.discard_unreachable_choices = mdp_discard_unreachable_choices
 
-    paynt.synthesizer.decision_tree.SynthesizerDecisionTree.tree_depth = tree_depth
-    paynt.synthesizer.decision_tree.SynthesizerDecisionTree.tree_enumeration = tree_enumeration
-    paynt.synthesizer.decision_tree.SynthesizerDecisionTree.scheduler_path = tree_map_scheduler
+    if tree_depth != 0 or tree_enumeration or tree_map_scheduler is not None:
+        import paynt.synthesizer.decision_tree
+        paynt.synthesizer.decision_tree.SynthesizerDecisionTree.tree_depth = tree_depth
+        paynt.synthesizer.decision_tree.SynthesizerDecisionTree.tree_enumeration = tree_enumeration
+        paynt.synthesizer.decision_tree.SynthesizerDecisionTree.scheduler_path = tree_map_scheduler
     paynt.quotient.mdp.MdpQuotient.add_dont_care_action = add_dont_care_action
 
     storm_control = None
     if storm_pomdp:
+        import paynt.quotient.storm_pomdp_control
         storm_control = paynt.quotient.storm_pomdp_control.StormPOMDPControl()
         storm_control.set_options(
             storm_options, get_storm_result, iterative_storm, use_storm_cutoffs,
@@ -199,18 +266,42 @@ def paynt_run(
 
     sketch_path = os.path.join(project, sketch)
     properties_path = os.path.join(project, props)
-    quotient = paynt.parser.sketch.Sketch.load_sketch(sketch_path, properties_path, export, relative_error, precision, constraint_bound, exact)
-    synthesizer = paynt.synthesizer.synthesizer.Synthesizer.choose_synthesizer(quotient, method, fsc_synthesis, storm_control)
-    synthesizer.run(optimum_threshold, memory_constraint, generated_fsc_route)
+    if batch is not None:
+        import paynt.synthesizer.batch
+        batch_synthesis = paynt.synthesizer.batch.Batch(
+            project, sketch_path, batch, method, relative_error, optimum_threshold, exact)
+        batch_synthesis.run(precision, constraint_bound, fsc_synthesis)
+    elif method == "all_in_one":
+        import paynt.synthesizer.all_in_one
+        program, specification, family = paynt.parser.sketch.Sketch.load_sketch_as_all_in_one(
+            sketch_path, properties_path, relative_error, precision)
+        all_in_one = paynt.synthesizer.all_in_one.AllInOne(
+            program, specification, all_in_one_engine, symbolic_memory_limit, family)
+        all_in_one.synthesize(optimum_threshold)
+    else:
+        if symbolic:
+            quotient = paynt.parser.sketch.Sketch.load_sketch_symbolic(sketch_path, properties_path, relative_error, precision)
+        else:
+            quotient = paynt.parser.sketch.Sketch.load_sketch(sketch_path, properties_path, export, relative_error, precision, constraint_bound, exact)
+        synthesizer = paynt.synthesizer.synthesizer.Synthesizer.choose_synthesizer(quotient, method, fsc_synthesis, storm_control)
+        synthesizer.run(optimum_threshold, memory_constraint, generated_fsc_route)
 
     if profiling:
         profiler.disable()
-        print_profiler_stats(profiler)
+        print_profiler_stats(profiler, startup_time)
 
-def print_profiler_stats(profiler):
+def print_profiler_stats(profiler, startup_time=None):
     stats = pstats.Stats(profiler)
     NUM_LINES = 10
 
+    # cumulative time of outermost imports performed while profiling
+    import_time = sum(
+        data[3] for (module,line,method),data in stats.stats.items()
+        if module.startswith("<frozen importlib") and method == "_find_and_load"
+    )
+    if startup_time is not None:
+        logger.debug(f"startup: {round(startup_time,3)} s before the run, {round(import_time,3)} s importing modules during the run")
+
     logger.debug("cProfiler info:")
     stats.sort_stats('tottime').print_stats(NUM_LINES)
 
@@ -1,11 +1,8 @@
 import html
 import re
 import string
-import graphviz
 import payntbind.synthesis
 
-import paynt.family.smt
-
 import math
 import random
 import itertools
@@ -26,6 +23,12 @@ class ParentInfo():
         self.selected_choices = None
         self.constraint_indices = None
         self.refinement_depth = None
+        # sub-MDP of the parent family, used to build sub-MDPs of its subfamilies incrementally
+        self.mdp = None
+        # hole wrt which the parent family was split
+        self.splitter = None
+        # number of subfamilies whose sub-MDP has not been built yet
+        self.num_pending_children = 0
 
 
 class Family:
@@ -51,6 +54,7 @@ class Family:
 
     def add_parent_info(self, parent_info):
         self.parent_info = parent_info
+        parent_info.num_pending_children += 1
         self.refinement_depth = parent_info.refinement_depth + 1
         self.constraint_indices = parent_info.constraint_indices
 
@@ -168,6 +172,7 @@ class Family:
         return legend
 
     def toGraph(self, route = None):
+        import graphviz
         txt = self.__str__()
         arr = txt.split(", ")
         
@@ -246,15 +251,51 @@ class Family:
         assignment = self.assume_options_copy(suboptions)
         return assignment
 
+    def pack(self, parent_choices=True):
+        '''
+        Encode hole options and parent info of this family into a compact picklable tuple: hole options are packed
+        as concatenated per-hole bitmasks, selected choices of the parent as a bit vector blob.
+        :param parent_choices if False, selected choices of the parent are omitted
+        '''
+        parent_info = None
+        if self.parent_info is not None:
+            pi = self.parent_info
+            selected_choices = None
+            if parent_choices and pi.selected_choices is not None:
+                selected_choices = (pi.selected_choices.size(), payntbind.synthesis.packBitVector(pi.selected_choices))
+            parent_info = (selected_choices, pi.constraint_indices, pi.refinement_depth)
+        return (self.family.pack(), parent_info)
+
+    def unpack(self, packed):
+        ''' Reconstruct a subfamily of this family from the output of pack(). '''
+        hole_options,parent_info = packed
+        subfamily = Family()
+        subfamily.family = payntbind.synthesis.Family(self.family, hole_options)
+        subfamily.hole_to_name = self.hole_to_name
+        subfamily.hole_to_option_labels = self.hole_to_option_labels
+        if parent_info is not None:
+            selected_choices,constraint_indices,refinement_depth = parent_info
+            pi = ParentInfo()
+            if selected_choices is not None:
+                num_choices,blob = selected_choices
+                pi.selected_choices = payntbind.synthesis.unpackBitVector(blob, num_choices)
+            pi.constraint_indices = constraint_indices
+            pi.refinement_depth = refinement_depth
+            subfamily.add_parent_info(pi)
+        return subfamily
+
     def collect_parent_info(self, specification):
         pi = ParentInfo()
         pi.selected_choices = self.selected_choices
+        pi.mdp = self.mdp
         pi.refinement_depth = self.refinement_depth
         cr = self.analysis_result.constraints_result
         pi.constraint_indices = cr.undecided_constraints if cr is not None else []
         return pi
 
     def encode(self, smt_solver):
+        # the SMT stack is imported only by methods that need it
+        import paynt.family.smt
         if self.encoding is None:
             self.encoding = paynt.family.smt.FamilyEncoding(smt_solver, self)
 
@@ -103,6 +103,9 @@ class SmtSolver():
         # current depth of push/pop solving
         self.solver_depth = 0
 
+        # for each excluded conflict, the depth at which it was excluded and its hole options
+        self.conflicts = []
+
         # choose solver
         if "pycvc5" in sys.modules:
             logger.debug("using CVC5 for SMT solving.")
@@ -196,15 +199,25 @@ class SmtSolver():
 
         pruning_estimate = 1
         counterexample_clauses = []
+        conflict_options = []
         for hole,var in enumerate(self.solver_vars):
             if hole in conflict:
                 option = assignment.hole_options(hole)[0]
                 counterexample_clauses.append(self.solver_clauses[hole][option])
+                conflict_options.append((hole,[option]))
             else:
                 if family.hole_num_options(hole) < family.hole_num_options_total(hole):
                     counterexample_clauses.append(family.encoding.hole_clauses[hole])
+                    conflict_options.append((hole,family.hole_options(hole)))
                 pruning_estimate *= family.hole_num_options(hole)
 
+        self.exclude_clauses(counterexample_clauses)
+        self.conflicts.append((self.solver_depth,conflict_options))
+        return pruning_estimate
+
+
+    def exclude_clauses(self, counterexample_clauses):
+        ''' Add the negation of the conjunction of the clauses to the solver. '''
         if self.use_python_z3:
             if len(counterexample_clauses) == 0:
                 counterexample_encoding = False
@@ -222,7 +235,29 @@ class SmtSolver():
         else:
             pass
 
-        return pruning_estimate
+
+    def conflict_options(self):
+        ''' :return hole options of the conflicts currently excluded from the solver '''
+        return [options for _,options in self.conflicts]
+
+
+    def exclude_conflict_options(self, conflicts):
+        '''
+        Exclude conflicts previously obtained via conflict_options(), e.g. when resuming the synthesis.
+        :param conflicts a list of conflicts, each one a list of (hole,options) pairs
+        '''
+        for conflict_options in conflicts:
+            counterexample_clauses = []
+            for hole,options in conflict_options:
+                clauses = [self.solver_clauses[hole][option] for option in options]
+                if len(clauses) == 1:
+                    counterexample_clauses.append(clauses[0])
+                elif self.use_python_z3:
+                    counterexample_clauses.append(z3.Or(clauses))
+                elif self.use_cvc:
+                    counterexample_clauses.append(self.solver.mkTerm(pycvc5.Kind.Or, clauses))
+            self.exclude_clauses(counterexample_clauses)
+            self.conflicts.append((self.solver_depth,conflict_options))
 
 
     def level(self, refinement_depth):
@@ -236,6 +271,7 @@ class SmtSolver():
         while self.solver_depth >= refinement_depth:
             self.solver.pop()
             self.solver_depth -= 1
+        self.conflicts = [conflict for conflict in self.conflicts if conflict[0] <= self.solver_depth]
 
         # create new scope
         self.solver.push()
@@ -1,4 +1,5 @@
 import stormpy
+import payntbind
 from paynt.parser.drn_parser import DrnParser
 
 class ModelBuilder:
@@ -41,3 +42,8 @@ class ModelBuilder:
     @classmethod
     def from_drn(cls, drn_path, use_exact=False):
         return DrnParser.parse_drn(drn_path, use_exact)
+
+    @classmethod
+    def from_binary(cls, binary_path, use_exact=False):
+        assert not use_exact, "exact models cannot be stored in the binary format"
+        return payntbind.synthesis.importQuotientBinary(binary_path)
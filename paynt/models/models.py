@@ -61,11 +61,56 @@ class Mdp:
 
 class SubMdp(Mdp):
 
+    # if set, minimizing properties are model checked using the results of the parent MDP as starting values
+    warm_start = True
+    # number of model checking calls that were warm-started
+    num_warm_started_checks = 0
+
     def __init__(self, model, quotient_state_map, quotient_choice_map):
         super().__init__(model)
         self.quotient_choice_map = quotient_choice_map
         self.quotient_state_map = quotient_state_map
 
+        # results of model checking, can be used to warm-start model checking of sub-MDPs of this MDP
+        self.property_results = {}
+        # if this MDP was obtained by restricting the MDP of the parent family, results of the parent and the mapping
+        # of states to the states of the parent MDP
+        self.parent_property_results = None
+        self.parent_state_map = None
+
+    def parent_value(self, prop, alt=False):
+        ''' Value of the property in the initial state of the parent MDP, if it was computed. '''
+        if self.parent_property_results is None:
+            return None
+        result = self.parent_property_results.get((prop,alt))
+        if result is None:
+            return None
+        return result.at(self.parent_state_map[self.initial_state])
+
+    def release_parent_results(self):
+        ''' Forget the results of the parent MDP once this MDP has been analysed. '''
+        self.parent_property_results = None
+        self.parent_state_map = None
+
+    def model_check_property(self, prop, alt=False):
+        formula = prop.formula if not alt else prop.formula_alt
+        hint = None
+        # the sub-MDP has fewer choices than the parent MDP, hence parent values are lower bounds only for minimizing
+        # properties; solvers iterating from below may stop prematurely when started above the fixpoint
+        if SubMdp.warm_start and self.parent_property_results is not None and \
+                formula.optimality_type == stormpy.OptimizationDirection.Minimize:
+            hint = self.parent_property_results.get((prop,alt))
+        if hint is None or self.model.is_exact:
+            result = paynt.verification.property.Property.model_check(self.model,formula)
+        else:
+            result = paynt.verification.property.Property.model_check_with_hint(
+                self.model, formula, hint, self.parent_state_map
+            )
+            SubMdp.num_warm_started_checks += 1
+        self.property_results[(prop,alt)] = result
+        value = result.at(self.initial_state)
+        return paynt.verification.property_result.PropertyResult(prop, result, value)
+
 
 class Smg(Mdp):
     
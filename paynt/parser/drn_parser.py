@@ -13,7 +13,6 @@ class DrnParser:
 
     COMMENT_PREFIX = '//'
     TYPE_PREFIX = '@type: '
-    STATE_PREFIX = 'state '
     WHITESPACES = ' \t\n\v\f\r'
 
     @classmethod
@@ -26,16 +25,13 @@ class DrnParser:
             if type == 'POSMG':
                 if use_exact:
                     raise ValueError('Exact synthesis is not supported for POSMG models')
-                pomdp_path = sketch_path + '.tmp'
-                state_player_indications = DrnParser.pomdp_from_posmg(sketch_path, pomdp_path)
-                pomdp = DrnParser.read_drn(pomdp_path)
-                explicit_model = payntbind.synthesis.posmg_from_pomdp(pomdp, state_player_indications)
-                os.remove(pomdp_path)
+                # observations and player indications are parsed natively in a single pass
+                explicit_model = payntbind.synthesis.parse_posmg_drn(sketch_path)
             else:
                 explicit_model = DrnParser.read_drn(sketch_path, use_exact)
         except Exception as e:
-            print(e)
-            raise ValueError('Failed to read sketch file in a .drn format')
+            logger.error(f"failed to parse {sketch_path}: {e}")
+            raise ValueError('Failed to read sketch file in a .drn format') from e
         return explicit_model
 
     @classmethod
@@ -54,44 +50,6 @@ class DrnParser:
                     return type
                 raise ValueError
 
-    @classmethod
-    def pomdp_from_posmg(cls, old_path: str, new_path) -> list:
-        # Change type of model in drn file from posmg to pomdp and store it in a new file
-        # old_path - path to drn file with posmg model
-        # new_path - path to drn file to store pomdp model
-        # return - list indicating which states (indices) belongs to which player (values)
-        posmg_file = open(old_path, 'r')
-        pomdp_file = open(new_path, 'w')
-        state_player_indications = []
-
-        for line in posmg_file:
-            if line.startswith(cls.TYPE_PREFIX):
-                line = line.replace('POSMG', 'POMDP')
-            if line.startswith(cls.STATE_PREFIX):
-                l_idx = line.index('<')
-                r_idx = line.index('>')
-                player_num = line[l_idx + 1:r_idx]
-                state_player_indications.append(int(player_num))
-                line = cls.str_remove_range(line, l_idx-1, r_idx) # -1 to remove the space before <
-
-            line = line.replace(' []', '') # temporaty fix
-            pomdp_file.write(line)
-
-        posmg_file.close()
-        pomdp_file.close()
-
-        return state_player_indications
-
-    @staticmethod
-    def str_remove_range(string: str, start_idx: int, end_idx: int) -> str:
-        # return string without characters in specified range
-        # both indices will be removed
-        assert 0 <= start_idx < len(string)
-        assert 0 <= end_idx < len(string)
-        assert start_idx <= end_idx
-
-        return string[:start_idx] + string[end_idx+1:]
-
     @classmethod
     def read_drn(cls, sketch_path, use_exact=False):
         builder_options = stormpy.core.DirectEncodingParserOptions()
@@ -17,7 +17,10 @@ logger = logging.getLogger(__name__)
 class PrismParser:
 
     @classmethod
-    def read_prism(cls, sketch_path, properties_path, relative_error, use_exact=False):
+    def read_prism(cls, sketch_path, properties_path, relative_error, use_exact=False, quotient_cache=None):
+        '''
+        :param quotient_cache if not None, the quotient is loaded from (or stored into) this cache
+        '''
 
         # parse the program
         prism, hole_definitions = PrismParser.load_sketch_prism(sketch_path)
@@ -47,7 +50,13 @@ class PrismParser:
         coloring = None
         jani_unfolder = None
         obs_evaluator = None
-        if family is not None:
+        quotient_mdp = None
+        if quotient_cache is not None and prism.model_type != stormpy.storage.PrismModelType.POMDP:
+            quotient_mdp,coloring = quotient_cache.load(specification, family)
+        if quotient_mdp is not None:
+            if family is not None:
+                _,specification = paynt.parser.jani.JaniUnfolder.translate_to_jani(prism, specification)
+        elif family is not None:
             assert prism_model_type in ["DTMC","MDP","POMDP"], "hole detected, but the program is neither DTMC nor (PO)MDP"
             # unfold hole options via Jani
             jani_unfolder = paynt.parser.jani.JaniUnfolder(prism, hole_expressions, specification, family)
@@ -57,8 +66,12 @@ class PrismParser:
             if prism.model_type == stormpy.storage.PrismModelType.POMDP:
                 obs_evaluator = payntbind.synthesis.ObservationEvaluator(prism, quotient_mdp)
             quotient_mdp = payntbind.synthesis.addChoiceLabelsFromJani(quotient_mdp)
+            if quotient_cache is not None:
+                quotient_cache.store(quotient_mdp, family, coloring)
         else:
             quotient_mdp = paynt.models.model_builder.ModelBuilder.from_prism(prism, specification, use_exact)
+            if quotient_cache is not None:
+                quotient_cache.store(quotient_mdp)
 
         return prism, quotient_mdp, specification, family, coloring, jani_unfolder, obs_evaluator
 
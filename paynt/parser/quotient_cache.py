@@ -0,0 +1,158 @@
+import stormpy
+import payntbind
+
+import paynt
+
+import hashlib
+import importlib.metadata
+import json
+import numpy
+import os
+import shutil
+import uuid
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class QuotientCache:
+    '''
+    On-disk cache of explicit quotients constructed from PRISM sketches. An entry is keyed by the hash of the sketch,
+    the formulae of the properties stripped of their thresholds and optimization directions (their atoms may introduce
+    labels of the quotient), the model building options and the versions of storm, PAYNT and payntbind; it stores the quotient MDP (including its state valuations) in the binary format, the
+    hole options associated with its choices (as .npy files) and the hole definitions. The model is memory-mapped upon
+    loading, the arrays are read into the coloring.
+    '''
+
+    # directory to store the cache entries in; if None, caching is disabled
+    directory = None
+
+    # changes whenever the layout of a cache entry changes, invalidating all previous entries
+    FORMAT_VERSION = 2
+
+    MODEL_FILENAME = "quotient.bin"
+    METADATA_FILENAME = "metadata.json"
+
+    @classmethod
+    def open(cls, sketch_path, use_exact=False):
+        '''
+        :return the cache for the given sketch, or None if caching is disabled or not supported
+        '''
+        if QuotientCache.directory is None:
+            return None
+        if use_exact:
+            logger.debug("quotient cache is not supported for exact models")
+            return None
+        return cls(sketch_path)
+
+    def __init__(self, sketch_path):
+        self.sketch_path = sketch_path
+        # the entry depends on the specification, it is located once the properties are parsed
+        self.key = None
+        self.path = None
+
+    @staticmethod
+    def payntbind_version():
+        try:
+            return importlib.metadata.version("payntbind")
+        except importlib.metadata.PackageNotFoundError:
+            return "unknown"
+
+    @staticmethod
+    def specification_signature(specification):
+        '''
+        :return sorted formulae of the specification without thresholds and optimization directions; all labels and
+            reward models are built anyway, so only the atoms of the formulae may affect the quotient
+        '''
+        formulae = set()
+        for prop in specification.all_properties():
+            # the bound is already removed from the property formula
+            formula = prop.formula.clone()
+            formula.set_optimality_type(stormpy.OptimizationDirection.Minimize)
+            formulae.add(str(formula))
+        return sorted(formulae)
+
+    @staticmethod
+    def compute_key(sketch_path, specification):
+        digest = hashlib.sha256()
+        versions = [QuotientCache.FORMAT_VERSION, stormpy.__version__, paynt.__version__, QuotientCache.payntbind_version()]
+        digest.update("".join(f"{version};" for version in versions).encode())
+        with open(sketch_path, "rb") as file:
+            content = file.read()
+        digest.update(f"{len(content)};".encode())
+        digest.update(content)
+        digest.update(json.dumps(QuotientCache.specification_signature(specification)).encode())
+        # builder options are fixed, see ModelBuilder.default_builder_options()
+        return digest.hexdigest()
+
+    @staticmethod
+    def family_signature(family):
+        return [[family.hole_name(hole),family.hole_to_option_labels[hole]] for hole in range(family.num_holes)]
+
+    def array_path(self, name, entry_path=None):
+        if entry_path is None:
+            entry_path = self.path
+        return os.path.join(entry_path, name + ".npy")
+
+    def load(self, specification, family=None):
+        '''
+        Locate the cache entry for the given specification and load the cached quotient.
+        :param specification parsed specification of the sketch
+        :param family design space of the sketch, or None if the sketch has no holes
+        :return (1) the quotient MDP, or None if the cache entry does not exist
+        :return (2) coloring of the quotient, or None if the sketch has no holes
+        '''
+        self.key = QuotientCache.compute_key(self.sketch_path, specification)
+        self.path = os.path.join(QuotientCache.directory, self.key)
+        metadata_path = os.path.join(self.path, QuotientCache.METADATA_FILENAME)
+        if not os.path.isfile(metadata_path):
+            return None,None
+        with open(metadata_path) as file:
+            metadata = json.load(file)
+        holes = QuotientCache.family_signature(family) if family is not None else None
+        if metadata["holes"] != holes:
+            logger.warning(f"quotient cache entry {self.path} does not match the sketch, ignoring it")
+            return None,None
+
+        logger.info(f"loading cached quotient from {self.path} ...")
+        model_path = os.path.join(self.path, QuotientCache.MODEL_FILENAME)
+        quotient_mdp = payntbind.synthesis.importQuotientBinary(model_path)
+
+        coloring = None
+        if family is not None:
+            # the coloring copies the arrays into its own structures, mapping them would not save any memory
+            csr = [numpy.load(self.array_path(name)) for name in ["choice_offsets","choice_holes","choice_options"]]
+            coloring = payntbind.synthesis.Coloring(family.family, quotient_mdp.nondeterministic_choice_indices, *csr)
+        return quotient_mdp,coloring
+
+    def store(self, quotient_mdp, family=None, coloring=None):
+        ''' Store the quotient into the cache, the entry is written into a temporary directory first. '''
+        if quotient_mdp.is_partially_observable:
+            logger.debug("quotient cache is not supported for partially observable models")
+            return
+        assert self.path is not None, "the cache entry must be located via load() first"
+
+        os.makedirs(QuotientCache.directory, exist_ok=True)
+        entry_path = self.path + "." + str(uuid.uuid4())
+        os.makedirs(entry_path)
+        try:
+            payntbind.synthesis.exportQuotientBinary(quotient_mdp, os.path.join(entry_path, QuotientCache.MODEL_FILENAME))
+            if coloring is not None:
+                csr = coloring.getChoiceToAssignmentCsr()
+                for name,array in zip(["choice_offsets","choice_holes","choice_options"], csr):
+                    numpy.save(self.array_path(name, entry_path), array)
+            metadata = {
+                "sketch": os.path.abspath(self.sketch_path),
+                "holes": QuotientCache.family_signature(family) if family is not None else None,
+            }
+            with open(os.path.join(entry_path, QuotientCache.METADATA_FILENAME), "w") as file:
+                json.dump(metadata, file)
+            # another process might have stored the same entry in the meantime
+            if os.path.exists(self.path):
+                shutil.rmtree(entry_path)
+            else:
+                os.rename(entry_path, self.path)
+        except:
+            shutil.rmtree(entry_path, ignore_errors=True)
+            raise
+        logger.info(f"stored the quotient into the cache {self.path}")
@@ -10,9 +10,11 @@ import paynt.quotient.posmg
 import paynt.quotient.mdp_family
 import paynt.quotient.pomdp_family
 import paynt.verification.property
+import paynt.parser.jani
 
 from paynt.parser.prism_parser import PrismParser
 from paynt.parser.drn_parser import DrnParser
+from paynt.parser.quotient_cache import QuotientCache
 
 import uuid
 import os
@@ -31,31 +33,21 @@ def substitute_suffix(string, delimiter, replacer):
 
 
 def make_rewards_action_based(model):
-    tm = model.transition_matrix
-    for name,reward_model in model.reward_models.items():
+    for name,reward_model in list(model.reward_models.items()):
         assert not reward_model.has_transition_rewards, "Paynt does not support transition rewards"
         if not reward_model.has_state_rewards:
             continue
         logger.info("converting state rewards '{}' to state-action rewards".format(name))
         if reward_model.has_state_action_rewards:
             logger.info("state rewards will be added to existing state-action rewards".format(name))
-            action_reward = reward_model.state_action_rewards.copy()
-        else:
-            action_reward = [0] * model.nr_choices
-
-        for state in range(model.nr_states):
-            state_reward = reward_model.get_state_reward(state)
-            for action in range(tm.get_row_group_start(state),tm.get_row_group_end(state)):
-                action_reward[action] += state_reward
 
         if model.is_exact:
+            new_reward_model = payntbind.synthesis.state_action_reward_model_exact(model,name)
             payntbind.synthesis.remove_reward_model_exact(model,name)
-            new_reward_model = stormpy.storage.SparseExactRewardModel(optional_state_action_reward_vector=action_reward)
-            model.add_reward_model(name, new_reward_model)
         else:
+            new_reward_model = payntbind.synthesis.state_action_reward_model(model,name)
             payntbind.synthesis.remove_reward_model(model,name)
-            new_reward_model = stormpy.storage.SparseRewardModel(optional_state_action_reward_vector=action_reward)
-            model.add_reward_model(name, new_reward_model)
+        model.add_reward_model(name, new_reward_model)
 
 class Sketch:
 
@@ -80,13 +72,23 @@ class Sketch:
         logger.info(f"loading sketch from {sketch_path} ...")
 
         filetype = None
-        try:
-            logger.info(f"assuming sketch in PRISM format...")
-            prism, explicit_quotient, specification, family, coloring, jani_unfolder, obs_evaluator = PrismParser.read_prism(
-                        sketch_path, properties_path, relative_error, use_exact)
-            filetype = "prism"
-        except SyntaxError:
-            pass
+        if payntbind.synthesis.isQuotientBinary(sketch_path):
+            logger.info(f"found sketch in binary format...")
+            if use_exact:
+                raise ValueError("exact synthesis is not supported for sketches in the binary format")
+            explicit_quotient = paynt.models.model_builder.ModelBuilder.from_binary(sketch_path, use_exact)
+            specification = PrismParser.parse_specification(properties_path, relative_error)
+            filetype = "binary"
+        if filetype is None:
+            try:
+                logger.info(f"assuming sketch in PRISM format...")
+                # exporting requires the unfolded program, so the cache is bypassed
+                quotient_cache = QuotientCache.open(sketch_path, use_exact) if export is None else None
+                prism, explicit_quotient, specification, family, coloring, jani_unfolder, obs_evaluator = PrismParser.read_prism(
+                            sketch_path, properties_path, relative_error, use_exact, quotient_cache)
+                filetype = "prism"
+            except SyntaxError:
+                pass
         if filetype is None:
             try:
                 logger.info(f"assuming sketch in DRN format...")
@@ -158,7 +160,7 @@ class Sketch:
             logger.info("export OK, aborting...")
             exit(0)
 
-        if jani_unfolder is not None:
+        if family is not None:
             if prism.model_type == stormpy.storage.PrismModelType.DTMC:
                 quotient_container = paynt.quotient.quotient.Quotient(explicit_quotient, family, coloring, specification)
             elif prism.model_type == stormpy.storage.PrismModelType.MDP:
@@ -175,15 +177,32 @@ class Sketch:
                 quotient_container = paynt.quotient.mdp.MdpQuotient(explicit_quotient, specification)
             else:
                 quotient_container = paynt.quotient.pomdp.PomdpQuotient(explicit_quotient, specification, decpomdp_manager)
+        quotient_container.program = prism
         return quotient_container
 
 
     @classmethod
-    def load_sketch_as_all_in_one(cls, sketch_path, properties_path):
+    def load_specification(cls, properties_path, quotient, relative_error=0, use_exact=False):
+        '''
+        Parse a specification wrt an already constructed quotient, e.g. to re-use the quotient for a different set of
+        properties. Atoms of the properties must be labels of the quotient.
+        '''
+        prism = quotient.program
+        specification = PrismParser.parse_specification(properties_path, relative_error, prism, use_exact=use_exact)
+        if prism is not None and quotient.family is not None:
+            # the quotient was unfolded via Jani
+            _,specification = paynt.parser.jani.JaniUnfolder.translate_to_jani(prism, specification)
+        specification.transform_until_to_eventually()
+        return specification
+
+
+    @classmethod
+    def load_sketch_as_all_in_one(cls, sketch_path, properties_path, relative_error=0, precision=1e-4):
         if not os.path.isfile(sketch_path):
             raise ValueError(f"the sketch file {sketch_path} does not exist")
         logger.info(f"loading sketch from {sketch_path} ...")
         logger.info(f"all in one approach so assuming input in PRISM format...")
+        paynt.verification.property.Property.model_checking_precision = precision
         try:
             prism, hole_definitions = PrismParser.load_sketch_prism(sketch_path)
             expression_parser = stormpy.storage.ExpressionParser(prism.expression_manager)
@@ -201,7 +220,7 @@ class Sketch:
                 logger.info("processing hole definitions...")
                 prism, hole_expressions, family = PrismParser.parse_holes(prism, expression_parser, hole_definitions)
 
-            specification = PrismParser.parse_specification(properties_path, prism=prism)
+            specification = PrismParser.parse_specification(properties_path, relative_error, prism=prism)
 
             prism = prism.replace_variable_initialization_by_init_expression()
             expression_manager = prism.expression_manager
@@ -229,8 +248,23 @@ class Sketch:
             logger.error(f"all in one approach supports only input in PRISM format!")
             raise e
 
+        paynt.verification.property.Property.initialize()
+        specification.transform_until_to_eventually()
+        logger.info(f"found the following specification {specification}")
         return prism, specification, family
 
+    @classmethod
+    def load_sketch_symbolic(cls, sketch_path, properties_path, relative_error=0, precision=1e-4):
+        '''
+        Load the PRISM sketch as a symbolic quotient: holes are turned into constant variables of the all-in-one
+        program, which is then built as a BDD.
+        '''
+        prism, specification, family = Sketch.load_sketch_as_all_in_one(
+            sketch_path, properties_path, relative_error, precision)
+        assert family is not None, "symbolic quotient requires a sketch with holes"
+        import paynt.quotient.symbolic
+        return paynt.quotient.symbolic.SymbolicQuotient(prism, family, specification)
+
     @classmethod
     def export(cls, export, sketch_path, jani_unfolder, explicit_quotient):
         if export == "jani":
@@ -240,6 +274,9 @@ class Sketch:
         if export == "drn":
             output_path = substitute_suffix(sketch_path, '.', 'drn')
             stormpy.export_to_drn(explicit_quotient, output_path)
+        if export == "binary":
+            output_path = substitute_suffix(sketch_path, '.', 'bin')
+            payntbind.synthesis.exportQuotientBinary(explicit_quotient, output_path)
         if export == "pomdp":
             assert explicit_quotient.is_nondeterministic_model and explicit_quotient.is_partially_observable, \
                 "cannot '--export pomdp' with non-POMDP sketches"
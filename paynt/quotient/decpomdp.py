@@ -103,7 +103,6 @@ class DecPomdpQuotient(paynt.quotient.quotient.Quotient):
         self.is_action_hole = None
         
         self.quotient_mdp = self.decpomdp_manager.construct_quotient_mdp()
-        self.choice_destinations = payntbind.synthesis.computeChoiceDestinations(self.quotient_mdp)
         logger.debug(f"constructed quotient MDP having {self.quotient_mdp.nr_states} states and {self.quotient_mdp.nr_choices} actions.")
 
         self.family, choice_to_hole_options = self.create_coloring()
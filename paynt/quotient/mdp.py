@@ -2,8 +2,7 @@ import paynt.quotient.quotient
 
 import stormpy
 import payntbind
-import json
-import graphviz
+import numpy
 
 import logging
 logger = logging.getLogger(__name__)
@@ -264,6 +263,7 @@ class DecisionTree:
         return s
 
     def to_graphviz(self):
+        import graphviz
         logging.getLogger("graphviz").setLevel(logging.WARNING)
         logging.getLogger("graphviz.sources").setLevel(logging.ERROR)
         graphviz_tree = graphviz.Digraph(comment="decision tree")
@@ -280,22 +280,6 @@ class MdpQuotient(paynt.quotient.quotient.Quotient):
     # if true, irrelevant states will not be considered for tree mapping
     filter_deterministic_states = True
 
-    @classmethod
-    def get_state_valuations(cls, model):
-        ''' Identify variable names and extract state valuation in the same order. '''
-        assert model.has_state_valuations(), "model has no state valuations"
-        # get name
-        sv = model.state_valuations
-        variable_name = None
-        state_valuations = []
-        for state in range(model.nr_states):
-            valuation = json.loads(str(sv.get_json(state)))
-            if variable_name is None:
-                variable_name = list(valuation.keys())
-            valuation = [valuation[var_name] for var_name in variable_name]
-            state_valuations.append(valuation)
-        return variable_name,state_valuations
-
     def __init__(self, mdp, specification):
         super().__init__(specification=specification)
 
@@ -333,30 +317,23 @@ class MdpQuotient(paynt.quotient.quotient.Quotient):
             mdp = payntbind.synthesis.addDontCareAction(mdp,self.state_is_relevant_bv)
 
         self.quotient_mdp = mdp
-        self.choice_destinations = payntbind.synthesis.computeChoiceDestinations(mdp)
         self.action_labels,self.choice_to_action = payntbind.synthesis.extractActionLabels(mdp)
         logger.info(f"MDP has {len(self.action_labels)} actions")
         # TODO filter irrelevant actions?
 
         # get variable domains on relevant states
-        variable_name,state_valuations = self.get_state_valuations(mdp)
+        self.extract_state_valuations()
+        variable_name = self.state_valuation_variables
         num_variables = len(variable_name)
-        variable_domain = [set() for variable in range(num_variables)]
-        for state in self.state_is_relevant_bv:
-            valuation = state_valuations[state]
-            for variable in range(num_variables):
-                variable_domain[variable].add(valuation[variable])
-        variable_domain = [sorted(domain) for domain in variable_domain]
+        relevant_valuations = self.state_valuations[numpy.array(self.state_is_relevant, dtype=bool)]
+        variable_domain = [numpy.unique(relevant_valuations[:,variable]).tolist() for variable in range(num_variables)]
 
         # filter variables having only one option
         variable_mask = [len(domain) > 1 for domain in variable_domain]
         variable_name = [value for variable,value in enumerate(variable_name) if variable_mask[variable]]
         variable_domain = [value for variable,value in enumerate(variable_domain) if variable_mask[variable]]
         # we filter unused variables from state valuations: this means that multiple states can now have the same "valuation"
-        state_valuations = [
-            [value for variable,value in enumerate(valuations) if variable_mask[variable]]
-            for valuations in state_valuations
-        ]
+        state_valuations = self.state_valuations[:,numpy.array(variable_mask, dtype=bool)]
 
         self.variables = [Variable(variable,name,variable_domain[variable]) for variable,name in enumerate(variable_name)]
         self.relevant_state_valuations = state_valuations
@@ -364,17 +341,20 @@ class MdpQuotient(paynt.quotient.quotient.Quotient):
 
 
     def scheduler_json_to_choices(self, scheduler_json, discard_unreachable_states=False):
-        variable_name,state_valuations = self.get_state_valuations(self.quotient_mdp)
+        variable_name = self.state_valuation_variables
+        # index states by their valuations; booleans in the scheduler hash equal to their 0/1 encoding
+        valuation_to_state = {}
+        for state,state_valuation in enumerate(self.state_valuations.tolist()):
+            valuation_to_state.setdefault(tuple(state_valuation), state)
         nci = self.quotient_mdp.nondeterministic_choice_indices.copy()
         assert self.quotient_mdp.nr_states == len(scheduler_json)
         state_to_choice = self.empty_scheduler()
+        decision_to_state = []
         for state_decision in scheduler_json:
-            valuation = [state_decision["s"][name] for name in variable_name]
-            for state,state_valuation in enumerate(state_valuations):
-                if valuation == state_valuation:
-                    break
-            else:
-                assert False, "state valuation not found"
+            valuation = tuple(state_decision["s"][name] for name in variable_name)
+            state = valuation_to_state.get(valuation)
+            assert state is not None, "state valuation not found"
+            decision_to_state.append(state)
 
             actions = state_decision["c"]
             assert len(actions) == 1
@@ -404,11 +384,7 @@ class MdpQuotient(paynt.quotient.quotient.Quotient):
         choices = self.state_to_choice_to_choices(state_to_choice)
 
         scheduler_json_relevant = []
-        for state_decision in scheduler_json:
-            valuation = [state_decision["s"][name] for name in variable_name]
-            for state,state_valuation in enumerate(state_valuations):
-                if valuation == state_valuation:
-                    break
+        for state_decision,state in zip(scheduler_json,decision_to_state):
             if state_to_choice[state] is None:
                 continue
             scheduler_json_relevant.append(state_decision)
@@ -453,6 +429,7 @@ class MdpQuotient(paynt.quotient.quotient.Quotient):
         variable_name = [v.name for v in variables]
         variable_domain = [v.domain for v in variables]
         tree_list = self.decision_tree.to_list()
+        # the coloring evaluates the tree natively over the storm state valuations, no parsing is involved
         self.coloring = payntbind.synthesis.ColoringSmt(
             self.quotient_mdp.nondeterministic_choice_indices, self.choice_to_action,
             num_actions, dont_care_action,
@@ -496,19 +473,6 @@ class MdpQuotient(paynt.quotient.quotient.Quotient):
         spec_result.can_improve = False
         return spec_result
 
-    def build(self, family):
-        if family.parent_info is None:
-            choices = self.coloring.selectCompatibleChoices(family.family)
-        else:
-            choices = self.coloring.selectCompatibleChoices(family.family, family.parent_info.selected_choices)
-        assert choices.number_of_set_bits() > 0
-
-        # proceed as before
-        family.selected_choices = choices
-        family.mdp = self.build_from_choice_mask(choices)
-        family.mdp.family = family
-
-
     def are_choices_consistent(self, choices, family):
         ''' Separate method for profiling purposes. '''
         consistent,hole_selection = self.coloring.areChoicesConsistent(choices, family.family)
@@ -524,8 +488,7 @@ class MdpQuotient(paynt.quotient.quotient.Quotient):
         ''' Get hole options involved in the scheduler selection. '''
         scheduler = result.scheduler
         assert scheduler.memoryless and scheduler.deterministic
-        state_to_choice = self.scheduler_to_state_to_choice(mdp, scheduler)
-        choices = self.state_to_choice_to_choices(state_to_choice)
+        choices = self.scheduler_to_choices(mdp, scheduler)
         if self.specification.is_single_property:
             mdp.family.scheduler_choices = choices
         consistent,hole_selection = self.are_choices_consistent(choices, mdp.family)
@@ -590,9 +553,11 @@ class MdpQuotient(paynt.quotient.quotient.Quotient):
             suboptions = [other_suboptions] + core_suboptions  # DFS solves core first
 
         # construct corresponding subfamilies
+        family.mdp.release_parent_results()
         parent_info = family.collect_parent_info(self.specification)
         parent_info.analysis_result = family.analysis_result
         parent_info.scheduler_choices = family.scheduler_choices
+        parent_info.splitter = splitter
         # parent_info.unsat_core_hint = self.coloring.unsat_core.copy()
         subfamilies = family.split(splitter,suboptions)
         assert family.size == sum([family.size for family in subfamilies])
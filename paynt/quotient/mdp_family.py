@@ -4,7 +4,6 @@ import paynt.family.family
 import paynt.quotient.quotient
 import paynt.models.models
 
-import json
 
 import logging
 logger = logging.getLogger(__name__)
@@ -73,7 +72,13 @@ class MdpFamilyQuotient(paynt.quotient.quotient.Quotient):
         one available action are omitted.
         '''
         policy,_ = policy
-        sv = self.quotient_mdp.state_valuations
+        self.extract_state_valuations()
+        # location variables introduced by the translation to Jani are omitted
+        variables = [
+            (variable,name,is_boolean)
+            for variable,(name,is_boolean) in enumerate(zip(self.state_valuation_variables,self.state_valuation_is_boolean))
+            if "_loc_prism2jani_" not in name
+        ]
         state_valuation_to_action = []
         for state,action in enumerate(policy):
             if action is None:
@@ -86,12 +91,11 @@ class MdpFamilyQuotient(paynt.quotient.quotient.Quotient):
                 continue
 
             # get state valuation
-            valuation_jani = json.loads(str(sv.get_json(state)))
-            valuation = {}
-            for variable,value in valuation_jani.items():
-                if "_loc_prism2jani_" in variable:
-                    continue
-                valuation[variable] = value
+            values = self.state_valuations[state].tolist()
+            valuation = {
+                name : bool(values[variable]) if is_boolean else values[variable]
+                for variable,name,is_boolean in variables
+            }
 
             state_valuation_to_action.append( (valuation,action) )
 
@@ -128,6 +132,12 @@ class MdpFamilyQuotient(paynt.quotient.quotient.Quotient):
         return json_whole
 
     
+    def family_choices(self, family):
+        ''' Choices compatible with the family; these are recomputed if the family has released them. '''
+        if family.selected_choices is not None:
+            return family.selected_choices
+        return self.coloring.selectCompatibleChoices(family.family)
+
     def fix_and_apply_policy_to_family(self, family, policy):
         '''
         Apply policy to the quotient MDP for the given family. Every undefined action in a policy is set to an arbitrary
@@ -139,7 +149,7 @@ class MdpFamilyQuotient(paynt.quotient.quotient.Quotient):
         policy_choices = []
         for state,action in enumerate(policy):
             policy_choices += self.state_action_choices[state][action]
-        choices = payntbind.synthesis.policyToChoicesForFamily(policy_choices, family.selected_choices)
+        choices = payntbind.synthesis.policyToChoicesForFamily(policy_choices, self.family_choices(family))
 
         # build MDP and keep only reachable states in policy
         mdp = self.build_from_choice_mask(choices)
@@ -160,7 +170,7 @@ class MdpFamilyQuotient(paynt.quotient.quotient.Quotient):
                     policy_choices += choice
             else:
                 policy_choices += self.state_action_choices[state][action]
-        choices = payntbind.synthesis.policyToChoicesForFamily(policy_choices, family.selected_choices)
+        choices = payntbind.synthesis.policyToChoicesForFamily(policy_choices, self.family_choices(family))
 
         mdp = self.build_from_choice_mask(choices)
 
@@ -178,9 +188,7 @@ class MdpFamilyQuotient(paynt.quotient.quotient.Quotient):
             if len(choices)>1:
                 quotient_state = mdp.quotient_state_map[state]
                 quotient_choices = [mdp.quotient_choice_map[choice] for choice in choices]
-                state_str = self.quotient_mdp.state_valuations.get_string(quotient_state)
-                state_str = state_str.replace(" ","")
-                state_str = state_str.replace("\t","")
+                state_str = self.state_valuation_to_string(quotient_state)
                 actions_str = [self.action_labels[self.choice_to_action[choice]] for choice in quotient_choices]
                 logger.error(f"the following state {state_str} has multiple actions {actions_str}")
         logger.error("aborting...")
@@ -200,3 +208,7 @@ class MdpFamilyQuotient(paynt.quotient.quotient.Quotient):
         choices = self.coloring.selectCompatibleChoices(family.family)
         model,state_map,choice_map = self.restrict_quotient(choices)
         return paynt.models.models.SubMdp(model,state_map,choice_map)
+
+    def evaluate_assignments(self, assignments, prop):
+        # members of the family induce MDPs that cannot be evaluated natively as DTMCs
+        return self.evaluate_assignments_one_by_one([list(combination) for combination in assignments], prop)
@@ -3,8 +3,13 @@ import payntbind
 
 import paynt.family.family
 import paynt.models.models
+import paynt.verification.property
 
 import math
+import json
+import hashlib
+import numpy
+import collections
 import itertools
 
 import logging
@@ -16,15 +21,26 @@ class Quotient:
     # if True, expected visits will not be computed for hole scoring
     disable_expected_visits = False
 
+    # if set, expected visits for families of at most this size are approximated by a truncated power iteration
+    expected_visits_approximation_threshold = None
+    # number of steps of the truncated power iteration
+    expected_visits_approximation_steps = 100
+    # maximum total size (in bytes) of cached vectors of expected visits
+    expected_visits_cache_bytes = 64 * 2**20
+
+    # number of threads used for batch evaluation of hole assignments
+    evaluation_threads = 1
+
     # label associated with un-labelled choices
     EMPTY_LABEL = "__no_label__"
 
     @staticmethod
     def make_vector_defined(vector):
-        vector_noinf = [ value if value != math.inf else 0 for value in vector]
-        default_value = sum(vector_noinf) / len(vector)
-        vector_valid = [ value if value != math.inf else default_value for value in vector]
-        return vector_valid
+        vector = numpy.array(vector, dtype=numpy.float64)
+        infinite = vector == math.inf
+        if infinite.any():
+            vector[infinite] = vector[~infinite].sum() / len(vector)
+        return vector
 
     def __init__(self, quotient_mdp = None, family = None, coloring = None, specification = None):
 
@@ -33,16 +49,24 @@ class Quotient:
         self.family = family
         self.coloring = coloring
         self.specification = specification
+        # PRISM program of the sketch (if any), used to parse further specifications
+        self.program = None
+
+        # state valuations of the quotient MDP (see extract_state_valuations): variable names, whether each variable is
+        # boolean, and the matrix of values with one row per state
+        self.state_valuation_variables = None
+        self.state_valuation_is_boolean = None
+        self.state_valuations = None
 
         # builder options
         self.subsystem_builder_options = stormpy.SubsystemBuilderOptions()
         self.subsystem_builder_options.build_state_mapping = True
         self.subsystem_builder_options.build_action_mapping = True
 
-        # for each choice of the quotient, a list of its state-destinations
-        self.choice_destinations = None
-        if self.quotient_mdp is not None:
-            self.choice_destinations = payntbind.synthesis.computeChoiceDestinations(self.quotient_mdp)
+        # expected visits for choice masks of the quotient MDP
+        self.expected_visits_cache = collections.OrderedDict()
+        self.expected_visits_cache_model = None
+        self.expected_visits_cache_size = 0
 
 
     def export_result(self, dtmc):
@@ -75,11 +99,42 @@ class Quotient:
         mdp,state_map,choice_map = self.restrict_quotient(choices)
         return paynt.models.models.SubMdp(mdp, state_map, choice_map)
 
+    def build_from_parent_mdp(self, parent_mdp, choices):
+        '''
+        Restrict the sub-MDP of the parent family to the selected quotient choices. Since the choices are a subset of
+        the ones selected for the parent, this yields the same sub-MDP as restricting the whole quotient.
+        '''
+        sub_choices = payntbind.synthesis.restrictChoiceMask(choices, parent_mdp.quotient_choice_map)
+        mdp,parent_state_map,choice_map = self.restrict_mdp(parent_mdp.model, sub_choices)
+        state_map = payntbind.synthesis.composeMapping(parent_state_map, parent_mdp.quotient_state_map)
+        choice_map = payntbind.synthesis.composeMapping(choice_map, parent_mdp.quotient_choice_map)
+        submdp = paynt.models.models.SubMdp(mdp, state_map, choice_map)
+        # values of the parent MDP bound the values of the sub-MDP and serve as a warm start for model checking
+        submdp.parent_property_results = parent_mdp.property_results
+        submdp.parent_state_map = parent_state_map
+        return submdp
+
     def build(self, family):
         ''' Construct the quotient MDP for the family. '''
         # select actions compatible with the family and restrict the quotient
-        choices = self.coloring.selectCompatibleChoices(family.family)
-        family.mdp = self.build_from_choice_mask(choices)
+        parent_info = family.parent_info
+        if parent_info is None or parent_info.selected_choices is None:
+            choices = self.coloring.selectCompatibleChoices(family.family)
+        elif parent_info.splitter is not None and isinstance(self.coloring, payntbind.synthesis.Coloring):
+            # choices of the parent are compatible with all holes except for the split one
+            choices = self.coloring.selectCompatibleChoices(family.family, parent_info.selected_choices, parent_info.splitter)
+        else:
+            # only choices of the parent can be compatible with the subfamily
+            choices = self.coloring.selectCompatibleChoices(family.family, parent_info.selected_choices)
+        if parent_info is None or parent_info.mdp is None:
+            family.mdp = self.build_from_choice_mask(choices)
+        else:
+            family.mdp = self.build_from_parent_mdp(parent_info.mdp, choices)
+            parent_info.num_pending_children -= 1
+            if parent_info.num_pending_children == 0:
+                # sub-MDPs of all subfamilies have been built, the parent sub-MDP (and its results) is no longer needed
+                parent_info.mdp.property_results = {}
+                parent_info.mdp = None
         family.selected_choices = choices
         family.mdp.family = family
 
@@ -106,52 +161,65 @@ class Quotient:
         model = Quotient.mdp_to_dtmc(mdp)
         return paynt.models.models.SubMdp(model,state_map,choice_map)
 
+    def evaluate_assignments(self, assignments, prop):
+        '''
+        Evaluate the property on DTMCs induced by the given hole assignments. DTMCs are constructed and model checked
+        natively, without creating stormpy models. Quotients that override build_assignment are evaluated one by one
+        since the native evaluation would bypass the override.
+        :param assignments a list of hole option combinations, i.e. one option for each hole
+        :return (1) numpy array of values in the initial states
+        :return (2) numpy array of numbers of states of the DTMCs
+        '''
+        assignments = [list(combination) for combination in assignments]
+        if self.quotient_mdp.is_exact or not isinstance(self.coloring, payntbind.synthesis.Coloring) or \
+                type(self).build_assignment is not Quotient.build_assignment:
+            return self.evaluate_assignments_one_by_one(assignments, prop)
+        return payntbind.synthesis.evaluateAssignments(
+            self.quotient_mdp, self.coloring, self.family.family, assignments, prop.formula,
+            paynt.verification.property.Property.environment, Quotient.evaluation_threads
+        )
+
+    def evaluate_assignments_one_by_one(self, assignments, prop):
+        values = []
+        num_states = []
+        for combination in assignments:
+            model = self.build_assignment(self.family.construct_assignment(combination))
+            values.append(model.model_check_property(prop).value)
+            num_states.append(model.states)
+        return numpy.array(values), numpy.array(num_states)
+
     def empty_scheduler(self):
         return [None] * self.quotient_mdp.nr_states
 
     def discard_unreachable_choices(self, state_to_choice):
-        state_to_choice_reachable = self.empty_scheduler()
-        state_visited = [False]*self.quotient_mdp.nr_states
-        initial_state = list(self.quotient_mdp.initial_states)[0]
-        state_visited[initial_state] = True
-        state_queue = [initial_state]
-        while state_queue:
-            state = state_queue.pop()
-            choice = state_to_choice[state]
-            state_to_choice_reachable[state] = choice
-            for dst in self.choice_destinations[choice]:
-                if not state_visited[dst]:
-                    state_visited[dst] = True
-                    state_queue.append(dst)
-        return state_to_choice_reachable
+        if self.quotient_mdp.is_exact:
+            return payntbind.synthesis.discardUnreachableChoicesExact(self.quotient_mdp, state_to_choice)
+        return payntbind.synthesis.discardUnreachableChoices(self.quotient_mdp, state_to_choice)
 
     def scheduler_to_state_to_choice(self, submdp, scheduler, discard_unreachable_choices=True):
         if submdp.model.is_exact:
-            state_to_quotient_choice = payntbind.synthesis.schedulerToStateToGlobalChoiceExact(scheduler, submdp.model, submdp.quotient_choice_map)
-        else:
-            state_to_quotient_choice = payntbind.synthesis.schedulerToStateToGlobalChoice(scheduler, submdp.model, submdp.quotient_choice_map)
-        state_to_choice = self.empty_scheduler()
-        for state in range(submdp.model.nr_states):
-            quotient_choice = state_to_quotient_choice[state]
-            quotient_state = submdp.quotient_state_map[state]
-            state_to_choice[quotient_state] = quotient_choice
-        if discard_unreachable_choices:
-            state_to_choice = self.discard_unreachable_choices(state_to_choice)
-        return state_to_choice
+            return payntbind.synthesis.schedulerToQuotientStateToChoiceExact(
+                scheduler, submdp.model, submdp.quotient_state_map, submdp.quotient_choice_map, self.quotient_mdp,
+                discard_unreachable_choices)
+        return payntbind.synthesis.schedulerToQuotientStateToChoice(
+            scheduler, submdp.model, submdp.quotient_state_map, submdp.quotient_choice_map, self.quotient_mdp,
+            discard_unreachable_choices)
+
+    def scheduler_to_choices(self, submdp, scheduler):
+        ''' Get quotient choices selected by the scheduler in states reachable via these choices. '''
+        if submdp.model.is_exact:
+            return payntbind.synthesis.schedulerToQuotientChoicesExact(
+                scheduler, submdp.model, submdp.quotient_state_map, submdp.quotient_choice_map, self.quotient_mdp)
+        return payntbind.synthesis.schedulerToQuotientChoices(
+            scheduler, submdp.model, submdp.quotient_state_map, submdp.quotient_choice_map, self.quotient_mdp)
 
     def state_to_choice_to_choices(self, state_to_choice):
-        num_choices = self.quotient_mdp.nr_choices
-        choices = stormpy.BitVector(num_choices,False)
-        for choice in state_to_choice:
-            if choice is not None and choice < num_choices:
-                choices.set(choice,True)
-        return choices
+        return payntbind.synthesis.stateToChoiceToChoices(state_to_choice, self.quotient_mdp.nr_choices)
 
     def scheduler_selection(self, mdp, scheduler):
         ''' Get hole options involved in the scheduler selection. '''
         assert scheduler.memoryless and scheduler.deterministic
-        state_to_choice = self.scheduler_to_state_to_choice(mdp, scheduler)
-        choices = self.state_to_choice_to_choices(state_to_choice)
+        choices = self.scheduler_to_choices(mdp, scheduler)
         hole_selection = self.coloring.collectHoleOptions(choices)
         return hole_selection
 
@@ -166,33 +234,79 @@ class Quotient:
         - mc(s') is the model checking result in state s'
         '''
 
-        # multiply probability with model checking results
         if mdp.is_exact:
             choice_values = payntbind.synthesis.multiply_with_vector_exact(mdp.transition_matrix, state_values)
-        else:
-            choice_values = payntbind.synthesis.multiply_with_vector(mdp.transition_matrix, state_values)
-        choice_values = Quotient.make_vector_defined(choice_values)
-
-        # if the associated reward model has state-action rewards, then these must be added to choice values
-        if prop.reward:
-            reward_name = prop.formula.reward_name
-            rm = mdp.reward_models.get(reward_name)
-            assert rm.has_state_action_rewards
-            choice_rewards = list(rm.state_action_rewards)
-            assert mdp.nr_choices == len(choice_rewards)
-            for choice in range(mdp.nr_choices):
-                choice_values[choice] += choice_rewards[choice]
+            choice_values = Quotient.make_vector_defined(choice_values)
+            if prop.reward:
+                rm = mdp.reward_models.get(prop.formula.reward_name)
+                assert rm.has_state_action_rewards
+                choice_values += numpy.array(rm.state_action_rewards, dtype=numpy.float64)
+            return choice_values
 
-        return choice_values
+        # multiply probability with model checking results and add state-action rewards natively
+        reward_name = prop.formula.reward_name if prop.reward else None
+        return payntbind.synthesis.compute_choice_values(mdp, state_values, reward_name)
 
 
-    def compute_expected_visits(self, mdp, prop, choices):
+    def compute_expected_visits(self, mdp, prop, choices, family_size=None):
         '''
         Compute expected number of visits in the states of DTMC induced by the shoices.
+        :param family_size if the size of the family is at most Quotient.expected_visits_approximation_threshold,
+            expected visits are approximated
         '''
         if Quotient.disable_expected_visits:
-            return [1]*self.quotient_mdp.nr_states
+            return numpy.ones(self.quotient_mdp.nr_states)
+        if mdp.is_exact:
+            return self.compute_expected_visits_exact(mdp, prop, choices)
+
+        max_iterations = 0
+        threshold = Quotient.expected_visits_approximation_threshold
+        if threshold is not None and family_size is not None and family_size <= threshold:
+            max_iterations = Quotient.expected_visits_approximation_steps
+        expected_visits = self.expected_visits_cached(mdp, choices, max_iterations).copy()
+
+        # handle infinity- and zero-visits
+        infinite = expected_visits == math.inf
+        if infinite.any():
+            if prop.minimizing:
+                reachable = expected_visits > 0
+                expected_visits[infinite] = expected_visits[reachable & ~infinite].sum() / reachable.sum()
+            else:
+                expected_visits[infinite] = 0
+        return expected_visits
+
+    def clear_expected_visits_cache(self):
+        self.expected_visits_cache.clear()
+        self.expected_visits_cache_size = 0
+        self.expected_visits_cache_model = self.quotient_mdp
+
+    def expected_visits_cached(self, mdp, choices, max_iterations):
+        '''
+        Expected visits in the DTMC induced by the choices; results for the quotient MDP are cached in an LRU cache
+        bounded by Quotient.expected_visits_cache_bytes and keyed by a digest of the choice mask.
+        '''
+        environment = paynt.verification.property.Property.environment
+        if mdp is not self.quotient_mdp:
+            return payntbind.synthesis.computeExpectedVisits(mdp, choices, environment, max_iterations)
+        if self.expected_visits_cache_model is not self.quotient_mdp:
+            # the quotient has changed
+            self.clear_expected_visits_cache()
+        key = (max_iterations, hashlib.blake2b(payntbind.synthesis.packBitVector(choices), digest_size=16).digest())
+        expected_visits = self.expected_visits_cache.get(key)
+        if expected_visits is not None:
+            self.expected_visits_cache.move_to_end(key)
+            return expected_visits
+        expected_visits = payntbind.synthesis.computeExpectedVisits(mdp, choices, environment, max_iterations)
+        if expected_visits.nbytes > Quotient.expected_visits_cache_bytes:
+            return expected_visits
+        self.expected_visits_cache[key] = expected_visits
+        self.expected_visits_cache_size += expected_visits.nbytes
+        while self.expected_visits_cache_size > Quotient.expected_visits_cache_bytes:
+            _,evicted = self.expected_visits_cache.popitem(last=False)
+            self.expected_visits_cache_size -= evicted.nbytes
+        return expected_visits
 
+    def compute_expected_visits_exact(self, mdp, prop, choices):
         # extract DTMC induced by this MDP-scheduler
         sub_mdp,state_map,_ = self.restrict_mdp(mdp, choices)
         dtmc = Quotient.mdp_to_dtmc(sub_mdp)
@@ -202,15 +316,12 @@ class Quotient:
         if prop.minimizing:
             dtmc_visits = Quotient.make_vector_defined(dtmc_visits)
         else:
-            dtmc_visits = [ value if value != math.inf else 0 for value in dtmc_visits]
+            dtmc_visits = numpy.array(dtmc_visits, dtype=numpy.float64)
+            dtmc_visits[dtmc_visits == math.inf] = 0
 
         # map vector of expected visits onto the state space of the quotient MDP
-        expected_visits = [0] * mdp.nr_states
-        for state in range(dtmc.nr_states):
-            mdp_state = state_map[state]
-            visits = dtmc_visits[state]
-            expected_visits[mdp_state] = visits
-
+        expected_visits = numpy.zeros(mdp.nr_states)
+        expected_visits[numpy.asarray(state_map, dtype=numpy.int64)] = dtmc_visits
         return expected_visits
 
 
@@ -247,7 +358,13 @@ class Quotient:
         inconsistent_assignments = {hole:options for hole,options in enumerate(selection) if len(options) > 1 }
         choice_values = self.choice_values(mdp.model, prop, result.get_values())
         choices = result.scheduler.compute_action_support(mdp.model.nondeterministic_choice_indices)
-        expected_visits = self.compute_expected_visits(mdp.model, prop, choices)
+        if mdp.model.is_exact:
+            expected_visits = self.compute_expected_visits(mdp.model, prop, choices)
+        else:
+            # compute expected visits in the quotient to reuse them across families
+            quotient_choices = payntbind.synthesis.liftChoiceMask(choices, mdp.quotient_choice_map, self.quotient_mdp.nr_choices)
+            expected_visits = self.compute_expected_visits(self.quotient_mdp, prop, quotient_choices, mdp.family.size)
+            expected_visits = expected_visits[numpy.asarray(mdp.quotient_state_map, dtype=numpy.int64)]
         scores = self.estimate_scheduler_difference(mdp.model, mdp.quotient_choice_map, inconsistent_assignments, choice_values, expected_visits)
         return scores
 
@@ -310,7 +427,9 @@ class Quotient:
             suboptions = [other_suboptions] + core_suboptions  # DFS solves core first
 
         # construct corresponding subfamilies
+        family.mdp.release_parent_results()
         parent_info = family.collect_parent_info(self.specification)
+        parent_info.splitter = splitter
         subfamilies = family.split(splitter,suboptions)
         for subfamily in subfamilies:
             subfamily.add_parent_info(parent_info)
@@ -322,18 +441,54 @@ class Quotient:
         return self.specification.all_properties()[0]
 
     @classmethod
-    def identify_absorbing_states(cls, model):
-        state_is_absorbing = [True] * model.nr_states
-        tm = model.transition_matrix
+    def get_state_valuations(cls, model):
+        '''
+        Extract state valuations of the model as a matrix, boolean values are stored as 0/1. Valuations over boolean
+        and integer variables are extracted natively into an integer matrix; other valuations (e.g. containing
+        rational variables) are parsed from their JSON representation.
+        :return (1) variable names
+        :return (2) for each variable, whether it is boolean
+        :return (3) numpy matrix with one row per state and one column per variable
+        '''
+        assert model.has_state_valuations(), "model has no state valuations"
+        try:
+            return payntbind.synthesis.stateValuationsToMatrix(model)
+        except Exception as e:
+            logger.debug(f"state valuations cannot be extracted natively ({e}), parsing them from JSON...")
+        sv = model.state_valuations
+        variable_name = None
+        variable_is_boolean = None
+        state_valuations = []
         for state in range(model.nr_states):
-            for choice in tm.get_rows_for_group(state):
-                for entry in tm.get_row(choice):
-                    if entry.column != state:
-                        state_is_absorbing[state] = False
-                        break
-                if not state_is_absorbing[state]:
-                    break
-        return state_is_absorbing
+            valuation = json.loads(str(sv.get_json(state)))
+            if variable_name is None:
+                variable_name = list(valuation.keys())
+                variable_is_boolean = [isinstance(valuation[name],bool) for name in variable_name]
+            state_valuations.append([valuation[name] for name in variable_name])
+        return variable_name,variable_is_boolean,numpy.array(state_valuations)
+
+    def extract_state_valuations(self):
+        ''' Extract state valuations of the quotient MDP once, to be shared by all consumers. '''
+        if self.state_valuations is not None:
+            return
+        self.state_valuation_variables,self.state_valuation_is_boolean,self.state_valuations = \
+            self.get_state_valuations(self.quotient_mdp)
+
+    def state_valuation_to_string(self, state):
+        ''' Compact string representation of the valuation of the state of the quotient MDP. '''
+        self.extract_state_valuations()
+        values = self.state_valuations[state].tolist()
+        return "[" + "&".join(
+            f"{name}={bool(value) if is_boolean else value}"
+            for name,is_boolean,value in zip(self.state_valuation_variables,self.state_valuation_is_boolean,values)
+        ) + "]"
+
+    @classmethod
+    def identify_absorbing_states(cls, model):
+        ''' :return BitVector of states all of whose choices are self-loops '''
+        if model.is_exact:
+            return payntbind.synthesis.identify_absorbing_states_exact(model)
+        return payntbind.synthesis.identify_absorbing_states(model)
 
     @classmethod
     def identify_states_with_actions(cls, model):
@@ -0,0 +1,101 @@
+import stormpy
+import payntbind
+
+import paynt.quotient.quotient
+import paynt.models.models
+import paynt.verification.property
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class SymbolicQuotient(paynt.quotient.quotient.Quotient):
+    '''
+    Quotient represented by a BDD: holes are constant state variables of an all-in-one program, each initial state
+    corresponds to one member of the family. Properties are model checked once via the DD engine, restricting the
+    quotient to a sub-family is a cofactor of the result. Explicit models are built only for single assignments.
+    '''
+
+    # families of at most this size are evaluated member by member
+    sparse_family_size = 256
+    # memory limit (in MB) of the BDD library
+    memory_limit_mb = 4096
+
+    def __init__(self, program, family, specification):
+        super().__init__(family=family, specification=specification)
+
+        # properties are re-parsed wrt the all-in-one program
+        self.formulas = [prop.transform_to_optimality_formula(program) for prop in specification.all_properties()]
+
+        logger.debug("building the symbolic quotient...")
+        stormpy.set_settings(["--sylvan:maxmem", str(SymbolicQuotient.memory_limit_mb)])
+        self.quotient_mdp = stormpy.build_symbolic_model(program, self.formulas)
+        logger.debug(f"constructed symbolic quotient having {self.quotient_mdp.nr_states} states")
+
+        hole_names = [family.hole_name(hole) for hole in range(family.num_holes)]
+        hole_to_option_values = [
+            [int(label) for label in family.hole_to_option_labels[hole]] for hole in range(family.num_holes)
+        ]
+        self.symbolic_quotient = payntbind.synthesis.SymbolicQuotient(
+            self.quotient_mdp, hole_names, hole_to_option_values
+        )
+        logger.debug("model checking the symbolic quotient...")
+        for index,formula in enumerate(self.formulas):
+            self.symbolic_quotient.checkFormula(index, formula.raw_formula)
+
+    def family_bounds(self, family, prop_index):
+        '''
+        :returns the minimum and the maximum value of the property over the members of the family
+        '''
+        return self.symbolic_quotient.familyBounds(prop_index, family.family)
+
+    def family_best_value(self, family, prop_index):
+        ''' :returns the best value of the property over the members of the family '''
+        prop = self.specification.all_properties()[prop_index]
+        lower,upper = self.family_bounds(family, prop_index)
+        return lower if prop.minimizing else upper
+
+    def build_sparse(self, family):
+        '''
+        Convert the quotient restricted to the family into an explicit model.
+        :returns the explicit model and, for each of its initial states, the corresponding hole combination
+        '''
+        formulas = [formula.raw_formula for formula in self.formulas]
+        model,hole_to_state_option = self.symbolic_quotient.buildSparse(family.family, formulas)
+        initial_state_to_combination = {
+            state : tuple(state_option[state] for state_option in hole_to_state_option)
+            for state in model.initial_states
+        }
+        return model,initial_state_to_combination
+
+    def evaluate_members(self, family):
+        '''
+        Collect values of all properties for each member of the family from the symbolic results.
+        :returns a list of (hole combination, values of the properties) pairs
+        '''
+        hole_to_member_option = None
+        prop_values = []
+        for index in range(len(self.formulas)):
+            # members are enumerated in the same order for each property
+            hole_to_member_option,values = self.symbolic_quotient.familyMemberValues(index, family.family)
+            prop_values.append(values)
+        return [
+            (tuple(member_option[member] for member_option in hole_to_member_option),
+                [values[member] for values in prop_values])
+            for member in range(len(prop_values[0]))
+        ]
+
+    def build_assignment(self, family):
+        assert family.size == 1, "expecting family of size 1"
+        model,_ = self.build_sparse(family)
+        return paynt.models.models.Mdp(model)
+
+    def split(self, family):
+        ''' Split the options of the hole having the most options in half. '''
+        splitter = max(range(family.num_holes), key=family.hole_num_options)
+        options = family.hole_options(splitter)
+        half = len(options) // 2
+        subfamilies = family.split(splitter, [options[:half], options[half:]])
+        for subfamily in subfamilies:
+            subfamily.constraint_indices = family.constraint_indices
+        return subfamilies
@@ -3,19 +3,30 @@ import payntbind
 
 import paynt.utils.timer
 
+import numpy
+
 import logging
 logger = logging.getLogger(__name__)
 
 class AllInOne:
+    '''
+    All-in-one analysis: holes are constant state variables of a single program, each initial state of the resulting
+    model corresponds to one member of the family.
+    '''
 
     def __init__(self, all_in_one_program, specification, approach, memory_limit_mb, family):
 
+        self.specification = specification
         self.properties = specification.all_properties()
-        self.threshold = self.properties[0].threshold
-        logger.info("changing constraints into optimality") # TODO check if the properties are optimality or not
+        logger.info("changing constraints into optimality")
         self.transformed_properties = [x.transform_to_optimality_formula(all_in_one_program) for x in self.properties]
         self.approach = approach
         self.family = family
+        # shape of the arrays of per-member values: one dimension per hole
+        self.members_shape = tuple(family.hole_num_options_total(hole) for hole in range(family.num_holes))
+        self.hole_to_option_values = [
+            [int(label) for label in family.hole_to_option_labels[hole]] for hole in range(family.num_holes)
+        ]
 
         build_timer = paynt.utils.timer.Timer()
         logger.info(f"building {self.approach} all in one MDP")
@@ -23,13 +34,15 @@ class AllInOne:
         build_timer.start()
         if self.approach == 'bdd':
             stormpy.set_settings(["--sylvan:maxmem", str(memory_limit_mb)]) # set memory usage by the symbolic approach
-            self.model = stormpy.build_symbolic_model(all_in_one_program)
-            self.filter = stormpy.create_filter_initial_states_symbolic(self.model)
+            self.model = stormpy.build_symbolic_model(all_in_one_program, self.transformed_properties)
+            hole_names = [family.hole_name(hole) for hole in range(family.num_holes)]
+            self.symbolic_quotient = payntbind.synthesis.SymbolicQuotient(
+                self.model, hole_names, self.hole_to_option_values
+            )
         elif self.approach == 'sparse':
             build_options = stormpy.BuilderOptions([p.raw_formula for p in self.transformed_properties])
             build_options.set_build_state_valuations()
             self.model = stormpy.build_sparse_model_with_options(all_in_one_program, build_options)
-            self.filter = stormpy.create_filter_initial_states_sparse(self.model)
         else:
             logger.error("Unknown all in one approach!")
             exit(1)
@@ -39,34 +52,86 @@ class AllInOne:
         logger.info(f"constructed all in one MDP having {self.model.nr_states} states and {self.model.nr_choices} actions")
 
 
-    def synthesize(self, optimum_threshold=None):
+    def initial_state_to_member(self):
+        ''' For each initial state of the sparse model, the index of the corresponding member in the array of values. '''
+        variable_name,_,valuations = payntbind.synthesis.stateValuationsToMatrix(self.model)
+        initial_states = numpy.array(self.model.initial_states, dtype=numpy.int64)
+        hole_to_option = []
+        for hole in range(self.family.num_holes):
+            column = valuations[initial_states, variable_name.index(self.family.hole_name(hole))]
+            option_values = numpy.array(self.hole_to_option_values[hole], dtype=numpy.int64)
+            # option values need not be sorted
+            order = numpy.argsort(option_values)
+            hole_to_option.append(order[numpy.searchsorted(option_values, column, sorter=order)])
+        return initial_states, numpy.ravel_multi_index(hole_to_option, self.members_shape)
+
+    def member_values(self, prop_index):
+        '''
+        :returns array indexed by hole assignments containing the value of the property for each member
+        '''
+        prop = self.transformed_properties[prop_index]
+        if self.approach == 'bdd':
+            self.symbolic_quotient.checkFormula(prop_index, prop.raw_formula)
+            values = self.symbolic_quotient.memberValues(prop_index, self.family.family)
+            return values.reshape(self.members_shape)
+
+        result = stormpy.check_model_sparse(self.model, prop, only_initial_states=True)
+        initial_states,members = self.initial_state_to_member()
+        values = numpy.full(self.members_shape, numpy.nan)
+        values.flat[members] = numpy.array(result.get_values())[initial_states]
+        return values
+
+    def satisfies_threshold(self, prop, values, threshold):
+        ''' Vectorised counterpart of Property.satisfies_threshold. '''
+        with numpy.errstate(invalid="ignore"):
+            sat = prop.op(values, threshold)
+        if prop.reward:
+            sat &= values != numpy.inf
+        return sat
+
 
+    def synthesize(self, optimum_threshold=None):
+        '''
+        :returns the optimal member (or any satisfying member for specifications without optimality) or None
+        '''
         all_in_one_timer = paynt.utils.timer.Timer()
         logger.info(f"starting all in one analysis")
 
         all_in_one_timer.start()
-        if self.approach == 'bdd':
-            result = stormpy.check_model_dd(self.model, self.transformed_properties[0], only_initial_states=True)
-            result.filter(self.filter)
-            all_in_one_timer.stop()
-
-            members_sat = 0
-            result_values = result.get_values()
-            for valuation, mc_result in result_values:
-                # 'valuation' can be used to obtain hole assignments for a give result 
-                if self.properties[0].satisfies_threshold(mc_result):
-                    members_sat += 1
-                    
-        elif self.approach == 'sparse':
-            result = stormpy.check_model_sparse(self.model, self.transformed_properties[0], extract_scheduler=True, only_initial_states=True)
-            result.filter(self.filter)
-            all_in_one_timer.stop()
-        
+        values = [self.member_values(index) for index in range(len(self.properties))]
+        sat = numpy.ones(self.members_shape, dtype=bool)
+        for index,prop in enumerate(self.specification.constraints):
+            sat &= self.satisfies_threshold(prop, values[index], prop.threshold)
+
+        assignment = None
+        if self.specification.has_optimality:
+            optimality = self.specification.optimality
+            if optimum_threshold is not None:
+                sat &= self.satisfies_threshold(optimality, values[-1], optimum_threshold)
+            else:
+                sat &= self.satisfies_threshold(optimality, values[-1], -numpy.inf if optimality.maximizing else numpy.inf)
+            if sat.any():
+                candidates = numpy.where(sat, values[-1], numpy.nan)
+                best = numpy.nanargmin(candidates) if optimality.minimizing else numpy.nanargmax(candidates)
+                best = numpy.unravel_index(best, self.members_shape)
+                optimality.update_optimum(float(values[-1][best]))
+                assignment = self.family.construct_assignment([int(option) for option in best])
+        elif sat.any():
+            first = numpy.unravel_index(numpy.argmax(sat), self.members_shape)
+            assignment = self.family.construct_assignment([int(option) for option in first])
+        all_in_one_timer.stop()
+
+        members_sat = int(numpy.count_nonzero(sat))
         members_total = self.family.size
         members_sat_percentage = int(round(members_sat/members_total*100,0))
         print(f"satisfied {members_sat}/{members_total} members ({members_sat_percentage}%)")
 
         time_elapsed = round(all_in_one_timer.read(),1)
         logger.info(f"all in one analysis finished in {time_elapsed}s")
-
-
+        if assignment is not None:
+            if self.specification.has_optimality:
+                logger.info(f"optimal member (value {self.specification.optimality.optimum}):")
+            logger.info(assignment)
+        else:
+            logger.info("no satisfying member found")
+        return assignment
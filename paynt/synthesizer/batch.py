@@ -0,0 +1,135 @@
+import paynt.parser.sketch
+import paynt.synthesizer.synthesizer
+import paynt.utils.timer
+
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class BatchJob:
+    ''' Single synthesis problem of a batch: a set of properties and the options to synthesize with. '''
+
+    def __init__(self, index, description, project, method="ar", relative_error=0, optimum_threshold=None):
+        '''
+        :param method,relative_error,optimum_threshold defaults for options not given in the description
+        '''
+        if "props" not in description:
+            raise ValueError(f"job {index} of the manifest does not specify the properties file")
+        self.name = description.get("name", f"job{index}")
+        self.properties_path = os.path.join(project, description["props"])
+        self.method = description.get("method", method)
+        self.relative_error = description.get("relative_error", relative_error)
+        self.optimum_threshold = description.get("optimum_threshold", optimum_threshold)
+        self.timeout = description.get("timeout", None)
+
+
+class Batch:
+    '''
+    Batch synthesis over a single sketch: the quotient is constructed once and each job of the manifest is then
+    synthesized against a fresh copy of the design space. The manifest is a JSON file of the form
+        {"output": "results.jsonl", "jobs": [{"name": ..., "props": ..., "method": ..., "optimum_threshold": ...,
+            "relative_error": ..., "timeout": ...}, ...]}
+    where only "jobs" and the properties files are mandatory; paths are relative to the project. Options missing in
+    the description of a job are taken from the command line. For each job, one JSON record is appended to the output
+    file.
+    '''
+
+    # replaces the optimizing direction of an optimality property, e.g. Pmax=? becomes P>=0
+    OPTIMALITY_QUERY_RE = re.compile(r"(min|max)\s*=\s*\?")
+
+    def __init__(self, project, sketch_path, manifest_path, method="ar", relative_error=0, optimum_threshold=None,
+            use_exact=False):
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+        self.sketch_path = sketch_path
+        self.use_exact = use_exact
+        self.jobs = [
+            BatchJob(index, description, project, method, relative_error, optimum_threshold)
+            for index,description in enumerate(manifest["jobs"])
+        ]
+        if "output" in manifest:
+            self.output_path = os.path.join(project, manifest["output"])
+        else:
+            self.output_path = os.path.splitext(manifest_path)[0] + ".results.jsonl"
+        self.quotient = None
+
+    def labelling_properties(self, path):
+        '''
+        Collect properties of all jobs into a single file used to construct the quotient, such that atoms of all
+        properties become labels of the quotient. Optimality properties are turned into trivially satisfied
+        constraints since a specification may contain at most one optimality property.
+        '''
+        lines = []
+        for job in self.jobs:
+            with open(job.properties_path) as file:
+                for line in file:
+                    line = Batch.OPTIMALITY_QUERY_RE.sub(">=0", line.strip())
+                    if line != "" and line not in lines:
+                        lines.append(line)
+        with open(path, "w") as file:
+            for line in lines:
+                print(line, file=file)
+
+    def load_quotient(self, precision=1e-4, constraint_bound=None):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            properties_path = os.path.join(tmp_dir, "batch.props")
+            self.labelling_properties(properties_path)
+            self.quotient = paynt.parser.sketch.Sketch.load_sketch(
+                self.sketch_path, properties_path, precision=precision, constraint_bound=constraint_bound,
+                use_exact=self.use_exact)
+        finally:
+            shutil.rmtree(tmp_dir)
+        assert self.quotient.family is not None, "batch synthesis requires a sketch with holes"
+
+    def assignment_record(self, assignment):
+        if assignment is None:
+            return None
+        return {
+            assignment.hole_name(hole) : [assignment.hole_to_option_labels[hole][option] for option in assignment.hole_options(hole)]
+            for hole in range(assignment.num_holes)
+        }
+
+    def iterations_record(self, stat):
+        ''' Iteration counters relevant for the method, e.g. MDPs for AR, DTMCs for CEGIS or both for hybrid. '''
+        counters = {"mdp": stat.iterations_mdp, "dtmc": stat.iterations_dtmc, "game": stat.iterations_game}
+        return {kind: count for kind,count in counters.items() if count is not None}
+
+    def run_job(self, job, fsc_synthesis=False):
+        timer = paynt.utils.timer.Timer()
+        timer.start()
+        record = {"name": job.name, "props": job.properties_path, "method": job.method}
+        try:
+            specification = paynt.parser.sketch.Sketch.load_specification(
+                job.properties_path, self.quotient, job.relative_error, self.use_exact)
+            logger.info(f"batch job {job.name}: {specification}")
+            self.quotient.specification = specification
+            synthesizer = paynt.synthesizer.synthesizer.Synthesizer.choose_synthesizer(
+                self.quotient, job.method, fsc_synthesis)
+            assignment = synthesizer.synthesize(
+                family=self.quotient.family.copy(), optimum_threshold=job.optimum_threshold,
+                keep_optimum=True, timeout=job.timeout)
+            record["feasible"] = assignment is not None
+            record["assignment"] = self.assignment_record(assignment)
+            record["optimum"] = specification.optimality.optimum if specification.has_optimality else None
+            record["iterations"] = self.iterations_record(synthesizer.stat)
+        except Exception as e:
+            logger.error(f"batch job {job.name} failed: {e}")
+            record["error"] = str(e)
+        timer.stop()
+        record["time"] = round(timer.read(),3)
+        return record
+
+    def run(self, precision=1e-4, constraint_bound=None, fsc_synthesis=False):
+        self.load_quotient(precision, constraint_bound)
+        logger.info(f"running {len(self.jobs)} batch jobs, results are written to {self.output_path}")
+        with open(self.output_path, "w") as output:
+            for job in self.jobs:
+                record = self.run_job(job, fsc_synthesis)
+                print(json.dumps(record), file=output, flush=True)
@@ -0,0 +1,114 @@
+import paynt.utils.timer
+
+import os
+import pickle
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    '''
+    Periodically saves the state of the synthesis to a file so that an interrupted run can be resumed. The state
+    comprises the families remaining to be explored, the current optimum, the best assignment, the number of explored
+    members and the conflicts excluded from the SMT solver (CEGIS, hybrid).
+    '''
+
+    # path to the checkpoint file; if None, no checkpoints are written
+    path = None
+    # minimum time (in seconds) between two consecutive checkpoints
+    interval = 300
+    # path to the checkpoint to resume from; the checkpoint is consumed by the first synthesis run it fits
+    resume_path = None
+
+    def __init__(self, synthesizer):
+        self.synthesizer = synthesizer
+        self.timer = paynt.utils.timer.Timer()
+        self.timer.start()
+        self.last_saved = 0
+        # state loaded from the resumed checkpoint, parts of it are consumed by the synthesizer
+        self.state = None
+
+    def design_space_signature(self):
+        family = self.synthesizer.quotient.family
+        return [(family.hole_name(hole),family.hole_num_options_total(hole)) for hole in range(family.num_holes)]
+
+    def save(self, frontier=None, smt_solver=None):
+        ''' Write the checkpoint; the previous checkpoint is replaced atomically. '''
+        if Checkpoint.path is None:
+            return
+        synthesizer = self.synthesizer
+        spec = synthesizer.quotient.specification
+        best_assignment = synthesizer.best_assignment
+        state = {
+            "method": synthesizer.method_name,
+            "design_space": self.design_space_signature(),
+            "frontier": frontier.snapshot() if frontier is not None else None,
+            "optimum": spec.optimality.optimum if spec.has_optimality else None,
+            "best_assignment": best_assignment.pack() if best_assignment is not None else None,
+            "best_assignment_value": synthesizer.best_assignment_value,
+            "explored": synthesizer.explored,
+            "conflicts": smt_solver.conflict_options() if smt_solver is not None else None,
+        }
+        path_tmp = Checkpoint.path + ".tmp"
+        with open(path_tmp, "wb") as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path_tmp, Checkpoint.path)
+        self.last_saved = self.timer.read()
+        logger.debug(f"saved checkpoint to {Checkpoint.path}")
+
+    def save_if_due(self, frontier=None, smt_solver=None):
+        if Checkpoint.path is None or self.timer.read() - self.last_saved < Checkpoint.interval:
+            return
+        self.save(frontier, smt_solver)
+
+    def resume(self):
+        '''
+        Load the checkpoint to resume from (if any) and restore the optimum, the best assignment and the number of
+        explored members. The frontier and the conflicts are restored by the synthesizer.
+        :return True if the synthesis was resumed
+        '''
+        if Checkpoint.resume_path is None:
+            return False
+        with open(Checkpoint.resume_path, "rb") as file:
+            state = pickle.load(file)
+        synthesizer = self.synthesizer
+        if state["method"] != synthesizer.method_name or state["design_space"] != self.design_space_signature():
+            logger.warning(f"checkpoint {Checkpoint.resume_path} does not match the current synthesis problem, ignoring it")
+            return False
+        Checkpoint.resume_path = None
+        self.state = state
+
+        spec = synthesizer.quotient.specification
+        if state["optimum"] is not None:
+            spec.optimality.update_optimum(state["optimum"])
+        if state["best_assignment"] is not None:
+            synthesizer.best_assignment = synthesizer.quotient.family.unpack(state["best_assignment"])
+            synthesizer.best_assignment_value = state["best_assignment_value"]
+        synthesizer.explored = state["explored"]
+        logger.info(f"resumed synthesis from a checkpoint, {synthesizer.explored} members already explored")
+        return True
+
+    def restore_frontier(self, frontier, refinement_depth=None):
+        '''
+        Push the families of the resumed checkpoint to the frontier.
+        :param refinement_depth if set, the restored families are assigned this refinement depth instead of the one
+            they had when the checkpoint was saved, e.g. since the scopes of the SMT solver were not restored
+        :return True if the frontier was restored
+        '''
+        if self.state is None or self.state["frontier"] is None:
+            return False
+        root = self.synthesizer.quotient.family
+        for packed,bound in self.state["frontier"]:
+            family = root.unpack(packed)
+            if refinement_depth is not None:
+                family.refinement_depth = refinement_depth
+            frontier.push(family, bound)
+        self.state["frontier"] = None
+        return True
+
+    def restore_conflicts(self, smt_solver):
+        if self.state is None or self.state["conflicts"] is None:
+            return
+        smt_solver.exclude_conflict_options(self.state["conflicts"])
+        self.state["conflicts"] = None
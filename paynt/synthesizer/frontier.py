@@ -0,0 +1,219 @@
+import pickle
+import mmap
+import heapq
+import itertools
+import tempfile
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class SpillLog:
+    '''
+    Append-only log of frontier chunks stored in an anonymous temporary file. Chunks are read back via mmap; the file
+    is truncated whenever the chunks at its end have been read back.
+    '''
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile()
+        self.size = 0
+        # for each chunk, its offset and length, or None if the chunk has been read back
+        self.chunks = []
+
+    def append(self, items):
+        ''' Write a chunk of items to the end of the log. :return index of the chunk '''
+        payload = pickle.dumps(items, protocol=pickle.HIGHEST_PROTOCOL)
+        self.file.seek(self.size)
+        self.file.write(payload)
+        self.file.flush()
+        self.chunks.append((self.size,len(payload)))
+        self.size += len(payload)
+        return len(self.chunks)-1
+
+    def peek(self, chunk):
+        ''' Read the chunk without removing it from the log. '''
+        offset,length = self.chunks[chunk]
+        with mmap.mmap(self.file.fileno(), self.size, access=mmap.ACCESS_READ) as view:
+            return pickle.loads(view[offset:offset+length])
+
+    def read(self, chunk):
+        ''' Read back the chunk and remove it from the log. '''
+        items = self.peek(chunk)
+        self.chunks[chunk] = None
+        while self.chunks and self.chunks[-1] is None:
+            self.chunks.pop(-1)
+        size = self.chunks[-1][0] + self.chunks[-1][1] if self.chunks else 0
+        if size < self.size:
+            self.file.truncate(size)
+            self.size = size
+        return items
+
+    def close(self):
+        self.file.close()
+
+
+class Frontier:
+    '''
+    Families waiting to be explored, optionally with a bound on the optimality value of their members. The basic
+    frontier is a stack, i.e. families are explored in DFS order, and it ignores the bounds.
+    '''
+
+    # if True, queued families are stored in the packed form (see Family.pack()), dropping the attached models
+    compact = False
+    # if set, the frontier keeps at most this many families in memory and spills the others to disk; implies compact
+    spill_size = None
+
+    @staticmethod
+    def is_compact():
+        return Frontier.compact or Frontier.spill_size is not None
+
+    def __init__(self, root=None):
+        '''
+        :param root family that contains all queued families, used to unpack compact families
+        '''
+        self.root = root if Frontier.is_compact() else None
+        self.items = []
+        self.spill_log = None
+        # for each chunk in the spill log, its index, the number of its items and its priority
+        self.spilled_chunks = []
+        self.num_spilled = 0
+
+    def __len__(self):
+        return len(self.items) + self.num_spilled
+
+    def store(self, family):
+        if self.root is None:
+            return family
+        return family.pack(parent_choices=False)
+
+    def load(self, stored):
+        if self.root is None:
+            return stored
+        return self.root.unpack(stored)
+
+    def push(self, family, bound=None):
+        self.items.append((self.store(family),None))
+        self.spill_if_full()
+
+    def pop(self):
+        '''
+        :return (1) the next family to explore
+        :return (2) the bound associated with this family, or None if the bound is not known
+        '''
+        self.restore_if_needed()
+        stored,bound = self.items.pop(-1)
+        return self.load(stored),bound
+
+    def item_entry(self, item):
+        ''' :return the stored family and its bound '''
+        return item
+
+    def snapshot(self):
+        '''
+        Collect all queued families, including the spilled ones, in the packed form.
+        :return a list of (packed family, bound) pairs; pushing them in this order reconstructs the frontier
+        '''
+        items = []
+        for chunk,_,_ in self.spilled_chunks:
+            items += self.spill_log.peek(chunk)
+        items += self.items
+        entries = []
+        for item in items:
+            stored,bound = self.item_entry(item)
+            packed = stored if self.root is not None else stored.pack(parent_choices=False)
+            entries.append((packed,bound))
+        return entries
+
+    def spill_items(self):
+        ''' Remove items to be spilled from memory; the top half of the stack is kept. '''
+        half = len(self.items) // 2
+        spilled = self.items[:half]
+        self.items = self.items[half:]
+        return spilled
+
+    def restore_items(self, items):
+        self.items = items + self.items
+
+    def chunk_priority(self, items):
+        return None
+
+    def spill_if_full(self):
+        if Frontier.spill_size is None or self.root is None or len(self.items) <= Frontier.spill_size:
+            return
+        if self.spill_log is None:
+            self.spill_log = SpillLog()
+        spilled = self.spill_items()
+        chunk = self.spill_log.append(spilled)
+        self.spilled_chunks.append((chunk,len(spilled),self.chunk_priority(spilled)))
+        self.num_spilled += len(spilled)
+        logger.debug(f"spilled {len(spilled)} families to disk, {self.num_spilled} families are on disk")
+
+    def restore_chunk(self, index):
+        chunk,num_items,_ = self.spilled_chunks.pop(index)
+        self.num_spilled -= num_items
+        self.restore_items(self.spill_log.read(chunk))
+
+    def restore_if_needed(self):
+        # the most recently spilled chunk is on top of the remaining stack
+        if not self.items and self.spilled_chunks:
+            self.restore_chunk(-1)
+
+    def close(self):
+        if self.spill_log is not None:
+            self.spill_log.close()
+            self.spill_log = None
+
+
+class BestFirstFrontier(Frontier):
+    '''
+    Frontier ordered by the bound on the optimality value: the most promising family is explored first. Ties are
+    broken in favour of smaller and deeper families. Families with unknown bound are explored before all others. When
+    spilling, the less promising half of the families is moved to disk.
+    '''
+
+    def __init__(self, optimality, root=None):
+        super().__init__(root)
+        self.optimality = optimality
+        # insertion counter, ensures that families themselves are never compared
+        self.counter = itertools.count()
+
+    def push(self, family, bound=None):
+        if bound is None:
+            key = (0,0)
+        else:
+            key = (1, bound if self.optimality.minimizing else -bound)
+        item = (key, family.size, -family.refinement_depth, next(self.counter), self.store(family), bound)
+        heapq.heappush(self.items, item)
+        self.spill_if_full()
+
+    def pop(self):
+        self.restore_if_needed()
+        *_,stored,bound = heapq.heappop(self.items)
+        return self.load(stored),bound
+
+    def item_entry(self, item):
+        return item[-2:]
+
+    def spill_items(self):
+        # a sorted list is a valid heap
+        self.items.sort()
+        half = len(self.items) // 2
+        spilled = self.items[half:]
+        self.items = self.items[:half]
+        return spilled
+
+    def chunk_priority(self, items):
+        # spilled items are sorted, the first one is the most promising
+        return items[0][:4]
+
+    def restore_if_needed(self):
+        # restore the chunk containing the most promising spilled family if it beats all families in memory
+        if not self.spilled_chunks:
+            return
+        index = min(range(len(self.spilled_chunks)), key=lambda index: self.spilled_chunks[index][2])
+        if not self.items or self.spilled_chunks[index][2] < self.items[0][:4]:
+            self.restore_chunk(index)
+
+    def restore_items(self, items):
+        self.items += items
+        heapq.heapify(self.items)
@@ -3,13 +3,13 @@ import payntbind
 
 import paynt.family.family
 import paynt.synthesizer.synthesizer
+import paynt.synthesizer.frontier
 
 import paynt.quotient.quotient
 import paynt.verification.property_result
 from paynt.verification.property import Property
 import paynt.utils.timer
 
-import paynt.family.smt
 import paynt.synthesizer.conflict_generator.dtmc
 import paynt.synthesizer.conflict_generator.mdp
 
@@ -17,11 +17,6 @@ import paynt.synthesizer.conflict_generator.mdp
 import logging
 logger = logging.getLogger(__name__)
 
-# disable logging when importing graphviz to suppress warnings
-logging.disable(logging.CRITICAL)
-import graphviz
-logging.disable(logging.NOTSET)
-
 
 def policies_are_compatible(policy1, policy2):
     policy1,policy1_mask = policy1
@@ -459,6 +454,10 @@ class PolicyTree:
         }
 
     def extract_policy_tree(self, quotient):
+        # disable logging when importing graphviz to suppress warnings
+        logging.disable(logging.CRITICAL)
+        import graphviz
+        logging.disable(logging.NOTSET)
         logging.getLogger("graphviz").setLevel(logging.WARNING)
         logging.getLogger("graphviz.sources").setLevel(logging.ERROR)
         graphviz_tree = graphviz.Digraph(comment="policy_tree")
@@ -669,6 +668,13 @@ class SynthesizerPolicyTree(paynt.synthesizer.synthesizer.Synthesizer):
         return suboptions,subfamilies
 
     
+    def release_family_models(self, family):
+        ''' Drop structures attached to a family of the policy tree that has been processed. '''
+        family.mdp = None
+        if paynt.synthesizer.frontier.Frontier.is_compact():
+            family.selected_choices = None
+            family.analysis_result = None
+
     def evaluate_all(self, family, prop, keep_value_only=False):
         assert not prop.reward, "expecting reachability probability propery"
         game_solver = self.quotient.build_game_abstraction_solver(prop)
@@ -690,7 +696,7 @@ class SynthesizerPolicyTree(paynt.synthesizer.synthesizer.Synthesizer):
             if result.policy is not None:
                 self.explore(family)
                 if policy_tree_node != policy_tree.root:
-                    family.mdp = None
+                    self.release_family_models(family)
                 if result.policy is False:
                     policy_tree_node.sat = False
                 else:
@@ -701,7 +707,7 @@ class SynthesizerPolicyTree(paynt.synthesizer.synthesizer.Synthesizer):
             # refine
             suboptions,subfamilies = self.split(family, prop, result.hole_selection, result.splitter, result.game_policy)
             if policy_tree_node != policy_tree.root:
-                family.mdp = None
+                self.release_family_models(family)
             policy_tree_node.split(result.splitter,suboptions,subfamilies)
             undecided_leaves += policy_tree_node.child_nodes
 
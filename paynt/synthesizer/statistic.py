@@ -47,6 +47,9 @@ class Statistic:
         self.acc_size_game = 0
         self.avg_size_game = 0
 
+        # number of secondary model checking calls skipped by the lazy AR
+        self.num_secondary_skipped = 0
+
         self.synthesized_assignment = None
         self.job_type = None
 
@@ -102,6 +105,9 @@ class Statistic:
         self.acc_size_game += size_game
         self.print_status()
 
+    def secondary_skipped(self):
+        self.num_secondary_skipped += 1
+
     def new_fsc_found(self, value, assignment, size):
         time_elapsed = round(self.synthesis_timer_total.read(),1)
         # print(f'new opt: {value}')
@@ -199,6 +205,11 @@ class Statistic:
             avg_size = round(safe_division(self.acc_size_dtmc, self.iterations_dtmc))
             type_stats = f"DTMC stats: avg DTMC size: {avg_size}, iterations: {self.iterations_dtmc}"
             iterations += f"{type_stats}\n"
+
+        if self.num_secondary_skipped > 0:
+            iterations += f"skipped secondary MDP checks: {self.num_secondary_skipped}\n"
+        if paynt.models.models.SubMdp.num_warm_started_checks > 0:
+            iterations += f"warm-started MDP checks: {paynt.models.models.SubMdp.num_warm_started_checks}\n"
         return iterations
 
     def get_summary_synthesis(self):
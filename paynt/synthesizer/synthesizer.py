@@ -1,4 +1,5 @@
 import re
+import paynt.synthesizer.checkpoint
 import paynt.synthesizer.statistic
 import paynt.utils.timer
 
@@ -19,58 +20,67 @@ class Synthesizer:
 
     # base filename (i.e. without extension) to export synthesis result
     export_synthesis_filename_base = None
+    # default time limit (in seconds) of a single synthesis run
+    synthesis_time_limit = 900
 
     @staticmethod
     def choose_synthesizer(quotient, method, fsc_synthesis=False, storm_control=None):
 
-        # hiding imports here to avoid mutual top-level imports
+        # hiding imports here to avoid mutual top-level imports; synthesizer modules are imported only when chosen
+        # since some of them load heavy dependencies (e.g. CEGIS loads the SMT solver)
         import paynt.quotient.mdp
         import paynt.quotient.pomdp
+        import paynt.quotient.pomdp_family
         import paynt.quotient.decpomdp
         import paynt.quotient.mdp_family
         import paynt.quotient.posmg
-        import paynt.synthesizer.synthesizer_onebyone
-        import paynt.synthesizer.synthesizer_ar
-        import paynt.synthesizer.synthesizer_cegis
-        import paynt.synthesizer.synthesizer_hybrid
-        import paynt.synthesizer.synthesizer_multicore_ar
-        import paynt.synthesizer.synthesizer_pomdp
-        import paynt.synthesizer.synthesizer_decpomdp
-        import paynt.synthesizer.synthesizer_posmg
-        import paynt.synthesizer.policy_tree
-        import paynt.synthesizer.decision_tree
+        import paynt.quotient.symbolic
 
+        if isinstance(quotient, paynt.quotient.symbolic.SymbolicQuotient):
+            import paynt.synthesizer.synthesizer_symbolic
+            return paynt.synthesizer.synthesizer_symbolic.SynthesizerSymbolic(quotient)
         if isinstance(quotient, paynt.quotient.pomdp_family.PomdpFamilyQuotient):
             logger.info("nothing to do with the POMDP sketch, aborting...")
             exit(0)
         if isinstance(quotient, paynt.quotient.mdp.MdpQuotient):
+            import paynt.synthesizer.decision_tree
             return paynt.synthesizer.decision_tree.SynthesizerDecisionTree(quotient)
         # FSC synthesis for POMDPs
         if isinstance(quotient, paynt.quotient.pomdp.PomdpQuotient) and fsc_synthesis:
+            import paynt.synthesizer.synthesizer_pomdp
             return paynt.synthesizer.synthesizer_pomdp.SynthesizerPomdp(quotient, method, storm_control)
         # FSC synthesis for Dec-POMDPs
         if isinstance(quotient, paynt.quotient.decpomdp.DecPomdpQuotient) and fsc_synthesis:
+            import paynt.synthesizer.synthesizer_decpomdp
             return paynt.synthesizer.synthesizer_decpomdp.SynthesizerDecPomdp(quotient)
         # Policy Tree synthesis for family of MDPs
         if isinstance(quotient, paynt.quotient.mdp_family.MdpFamilyQuotient):
             if method == "onebyone":
+                import paynt.synthesizer.synthesizer_onebyone
                 return paynt.synthesizer.synthesizer_onebyone.SynthesizerOneByOne(quotient)
             else:
+                import paynt.synthesizer.policy_tree
                 return paynt.synthesizer.policy_tree.SynthesizerPolicyTree(quotient)
         # FSC synthesis for POSMGs
         if isinstance(quotient, paynt.quotient.posmg.PosmgQuotient) and fsc_synthesis:
+            import paynt.synthesizer.synthesizer_posmg
             return paynt.synthesizer.synthesizer_posmg.SynthesizerPosmg(quotient)
 
         # synthesis engines
         if method == "onebyone":
+            import paynt.synthesizer.synthesizer_onebyone
             return paynt.synthesizer.synthesizer_onebyone.SynthesizerOneByOne(quotient)
         if method == "ar":
+            import paynt.synthesizer.synthesizer_ar
             return paynt.synthesizer.synthesizer_ar.SynthesizerAR(quotient)
         if method == "cegis":
+            import paynt.synthesizer.synthesizer_cegis
             return paynt.synthesizer.synthesizer_cegis.SynthesizerCEGIS(quotient)
         if method == "hybrid":
+            import paynt.synthesizer.synthesizer_hybrid
             return paynt.synthesizer.synthesizer_hybrid.SynthesizerHybrid(quotient)
         if method == "ar_multicore":
+            import paynt.synthesizer.synthesizer_multicore_ar
             return paynt.synthesizer.synthesizer_multicore_ar.SynthesizerMultiCoreAR(quotient)
         raise ValueError("invalid method name")
 
@@ -82,6 +92,7 @@ class Synthesizer:
         self.explored = None
         self.best_assignment = None
         self.best_assignment_value = None
+        self.checkpoint = paynt.synthesizer.checkpoint.Checkpoint(self)
         # deciding upon memory constraint
         self.memory_constraintfunc = None
         memory_constraint = paynt.cli.memory_constraint 
@@ -206,7 +217,9 @@ class Synthesizer:
             family.constraint_indices = list(range(len(self.quotient.specification.constraints)))
 
         self.set_optimality_threshold(optimum_threshold)
-        self.synthesis_timer = paynt.utils.timer.Timer(900) # 15 minutes   
+        if timeout is None:
+            timeout = Synthesizer.synthesis_time_limit
+        self.synthesis_timer = paynt.utils.timer.Timer(timeout)
         self.synthesis_timer.start()
         self.stat = paynt.synthesizer.statistic.Statistic(self)
         self.explored = 0
@@ -214,6 +227,7 @@ class Synthesizer:
         if memory_constraint != "none":
             family = self.get_memory_restrained_family(family)
         self.stat.start(family)
+        self.checkpoint.resume()
         self.synthesize_one(family)
         if self.best_assignment is not None and self.best_assignment.size > 1 and not return_all:
             self.best_assignment = self.best_assignment.pick_any()
@@ -1,17 +1,41 @@
 import paynt.quotient.posmg
 import paynt.synthesizer.synthesizer
+import paynt.synthesizer.frontier
 import paynt.quotient.pomdp
 import paynt.verification.property_result
+import paynt.models.models
 
 import logging
 logger = logging.getLogger(__name__)
 
 class SynthesizerAR(paynt.synthesizer.synthesizer.Synthesizer):
 
+    # if True, the secondary direction of a constraint will be checked only if it is likely to decide the family
+    lazy_secondary = False
+
+    # order in which families are explored: 'dfs' or 'best-first' (the latter applies only to optimality synthesis)
+    exploration_order = "dfs"
+
     @property
     def method_name(self):
         return "AR"
 
+    def secondary_can_decide(self, mdp, constraint, result):
+        '''
+        Pre-test whether checking the secondary direction of a constraint is worth it. The secondary value can only
+        change the verdict if the constraint is not yet satisfied. Its value lies between the primary value and the
+        secondary value of the parent family; if the threshold is closer to the primary value, the secondary direction
+        is unlikely to satisfy the constraint and the family will be split anyway.
+        '''
+        if result.sat is True:
+            return False
+        if mdp.is_deterministic or not isinstance(mdp, paynt.models.models.SubMdp):
+            return True
+        parent_secondary = mdp.parent_value(constraint, alt=True)
+        if parent_secondary is None:
+            return True
+        return abs(parent_secondary-constraint.threshold) <= abs(constraint.threshold-result.primary.value)
+
     def check_specification(self, family):
         ''' Check specification for mdp or smg based on self.quotient '''
         mdp = family.mdp
@@ -49,6 +73,9 @@ class SynthesizerAR(paynt.synthesizer.synthesizer.Synthesizer):
                     admissible_assignment = assignment
 
             # primary direction is SAT: check secondary direction to see whether all SAT
+            if SynthesizerAR.lazy_secondary and not self.secondary_can_decide(mdp, constraint, result):
+                self.stat.secondary_skipped()
+                continue
             result.secondary = model.model_check_property(constraint, alt=True)
             if mdp.is_deterministic and result.primary.value != result.secondary.value:
                 logger.warning("WARNING: model is deterministic but min<max")
@@ -115,12 +142,32 @@ class SynthesizerAR(paynt.synthesizer.synthesizer.Synthesizer):
         if isinstance(self.quotient, paynt.quotient.pomdp.PomdpQuotient):
             self.stat.new_fsc_found(family.analysis_result.improving_value, ia, self.quotient.policy_size(ia))
 
+    def create_frontier(self, family):
+        spec = self.quotient.specification
+        if SynthesizerAR.exploration_order == "best-first" and spec.has_optimality:
+            return paynt.synthesizer.frontier.BestFirstFrontier(spec.optimality, root=family)
+        return paynt.synthesizer.frontier.Frontier(root=family)
+
+    def family_bound(self, family):
+        ''' Bound on the optimality value of members of the analysed family, or None if not available. '''
+        result = family.analysis_result.optimality_result
+        if result is None or result.primary is None:
+            return None
+        return result.primary.value
+
     def synthesize_one(self, family):
-        families = [family]
+        families = self.create_frontier(family)
+        if not self.checkpoint.restore_frontier(families):
+            families.push(family)
         while families:
             if self.resource_limit_reached():
                 break
-            family = families.pop(-1)
+            self.checkpoint.save_if_due(families)
+            family,bound = families.pop()
+            if bound is not None and not self.quotient.specification.optimality.improves_optimum(bound):
+                # the optimum has improved since the family was added to the frontier
+                self.explore(family)
+                continue
             self.verify_family(family)
             self.update_optimum(family)
             if not self.quotient.specification.has_optimality and self.best_assignment is not None:
@@ -130,6 +177,10 @@ class SynthesizerAR(paynt.synthesizer.synthesizer.Synthesizer):
                 self.explore(family)
                 continue
             # undecided
+            bound = self.family_bound(family)
             subfamilies = self.quotient.split(family)
-            families = families + subfamilies
+            for subfamily in subfamilies:
+                families.push(subfamily, bound)
+        self.checkpoint.save(families)
+        families.close()
         return self.best_assignment
@@ -36,21 +36,17 @@ class SynthesizerCEGIS(paynt.synthesizer.synthesizer.Synthesizer):
         return "CEGIS " + self.conflict_generator.name
 
     
-    def collect_conflict_requests(self, family, mc_result):
+    def collect_conflict_requests(self, family, unsat_constraint_indices):
         '''
         Construct conflict request wrt each unsatisfiable property,
             pack such properties as well as their MDP results (if available)
         '''
         conflict_requests = []
-        for index in family.constraint_indices:
-            member_result = mc_result.constraints_result.results[index]
-            if member_result.sat:
-                continue
+        for index in unsat_constraint_indices:
             prop = self.quotient.specification.constraints[index]
             family_result = family.analysis_result.constraints_result.results[index] if family.analysis_result is not None else None
             conflict_requests.append( (index,prop,family_result) )
         if self.quotient.specification.has_optimality:
-            member_result = mc_result.optimality_result
             index = len(self.quotient.specification.constraints)
             prop = self.quotient.specification.optimality
             family_result = family.analysis_result.optimality_result if family.analysis_result is not None else None
@@ -65,21 +61,36 @@ class SynthesizerCEGIS(paynt.synthesizer.synthesizer.Synthesizer):
         :return (2) accepting assignment (or None)
         """
         assert family.mdp is not None, "analyzed family does not have an associated quotient MDP"
+        spec = self.quotient.specification
 
-        dtmc = self.quotient.build_assignment(assignment)
-        self.stat.iteration(dtmc)
-        result = dtmc.check_specification(self.quotient.specification, family.constraint_indices, short_evaluation=True)
-        # analyze model checking results
-        accepting_assignment = None
-        accepting,improving_value = result.accepting_dtmc(self.quotient.specification)
-        if accepting:
-            accepting_assignment = assignment
-        if improving_value is not None:
-            self.quotient.specification.optimality.update_optimum(improving_value)
-        if accepting and not self.quotient.specification.can_be_improved():
+        # evaluate the assignment natively, stop at the first violated constraint
+        combination = [assignment.hole_options(hole)[0] for hole in range(assignment.num_holes)]
+        num_states = None
+        unsat_constraint_indices = []
+        for index in family.constraint_indices:
+            prop = spec.constraints[index]
+            values,dtmc_states = self.quotient.evaluate_assignments([combination], prop)
+            num_states = dtmc_states[0]
+            if not prop.satisfies_threshold(values[0]):
+                unsat_constraint_indices.append(index)
+                break
+        accepting = not unsat_constraint_indices
+        if accepting and spec.has_optimality:
+            values,dtmc_states = self.quotient.evaluate_assignments([combination], spec.optimality)
+            num_states = dtmc_states[0]
+            accepting = spec.optimality.improves_optimum(values[0])
+            if accepting:
+                spec.optimality.update_optimum(values[0])
+        if num_states is not None:
+            self.stat.iteration_dtmc(num_states)
+
+        accepting_assignment = assignment if accepting else None
+        if accepting and not spec.can_be_improved():
             return [], accepting_assignment
 
-        conflict_requests = self.collect_conflict_requests(family, result)
+        # the DTMC is built only for the conflict generator
+        dtmc = self.quotient.build_assignment(assignment)
+        conflict_requests = self.collect_conflict_requests(family, unsat_constraint_indices)
         conflicts = self.conflict_generator.construct_conflicts(family, assignment, dtmc, conflict_requests)
 
         return conflicts, accepting_assignment
@@ -93,10 +104,14 @@ class SynthesizerCEGIS(paynt.synthesizer.synthesizer.Synthesizer):
 
         # use sketch design space as a SAT baseline (TODO why?)
         smt_solver = paynt.family.smt.SmtSolver(self.quotient.family)
+        self.checkpoint.restore_conflicts(smt_solver)
         
         # CEGIS loop
         assignment = smt_solver.pick_assignment(family)
         while assignment is not None:
+            if self.resource_limit_reached():
+                break
+            self.checkpoint.save_if_due(smt_solver=smt_solver)
             
             conflicts, accepting_assignment = self.analyze_family_assignment_cegis(family, assignment)
             if accepting_assignment is not None:
@@ -109,4 +124,5 @@ class SynthesizerCEGIS(paynt.synthesizer.synthesizer.Synthesizer):
             
             # construct next assignment
             assignment = smt_solver.pick_assignment(family)
+        self.checkpoint.save(smt_solver=smt_solver)
         return self.best_assignment
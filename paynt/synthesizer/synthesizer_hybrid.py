@@ -1,6 +1,7 @@
 import paynt.synthesizer.synthesizer
 import paynt.synthesizer.synthesizer_ar
 import paynt.synthesizer.synthesizer_cegis
+import paynt.synthesizer.frontier
 
 import paynt.family.smt
 import paynt.utils.timer
@@ -95,17 +96,26 @@ class SynthesizerHybrid(paynt.synthesizer.synthesizer_ar.SynthesizerAR, paynt.sy
 
         self.conflict_generator.initialize()
         smt_solver = paynt.family.smt.SmtSolver(self.quotient.family)
-
-        # AR-CEGIS loop
-        families = [family]
+        self.checkpoint.restore_conflicts(smt_solver)
+
+        # AR-CEGIS loop; families are explored in the DFS order to match the scopes of the SMT solver
+        families = paynt.synthesizer.frontier.Frontier(root=family)
+        # restored conflicts are excluded at the root scope of the solver (each conflict is restricted to the options of
+        # the family it was obtained for, so it remains valid there), the restored families are then treated as children
+        # of the root such that their scopes are popped properly
+        if not self.checkpoint.restore_frontier(families, refinement_depth=1):
+            families.push(family)
         self.stage_control = StageControl(family.size)
         while families:
+            if self.resource_limit_reached():
+                break
+            self.checkpoint.save_if_due(families, smt_solver)
 
             # initiate AR analysis
             self.stage_control.start_ar()
             
             # choose family
-            family = families.pop(-1)
+            family,_ = families.pop()
 
             # reset SMT solver level
             smt_solver.level(family.refinement_depth)
@@ -150,6 +160,7 @@ class SynthesizerHybrid(paynt.synthesizer.synthesizer_ar.SynthesizerAR, paynt.sy
                 if accepting_assignment is not None:
                     self.best_assignment = accepting_assignment
                     if not self.quotient.specification.can_be_improved:
+                        families.close()
                         return self.best_assignment
 
                 # assignment is UNSAT: move on to the next assignment
@@ -158,6 +169,9 @@ class SynthesizerHybrid(paynt.synthesizer.synthesizer_ar.SynthesizerAR, paynt.sy
                 continue
         
             subfamilies = self.quotient.split(family)
-            families = families + subfamilies
+            for subfamily in subfamilies:
+                families.push(subfamily)
 
+        self.checkpoint.save(families, smt_solver)
+        families.close()
         return self.best_assignment
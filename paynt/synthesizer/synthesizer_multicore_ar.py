@@ -1,144 +1,208 @@
-from paynt.synthesizer.synthesizer import Synthesizer
 from paynt.synthesizer.synthesizer_ar import SynthesizerAR
 
+import paynt.synthesizer.statistic
+import paynt.utils.timer
+
 import os
-import time
+import math
+import queue
+import resource
+import traceback
 import multiprocessing
 
 import logging
 logger = logging.getLogger(__name__)
 
-
-import cProfile, pstats
-
 # global variables
 # when a new process is spawned (forked), it will inherit these variables from the parent
 quotient = None
-profiler = None
 
-# helper functions for family serialization
-def family_to_hole_options(family):
-    return [family.hole_options(hole) for hole in range(family.num_holes)]
+# families are exchanged between processes in the packed form, see Family.pack()
+def unpack_family(packed):
+    return quotient.family.unpack(packed)
 
-def hole_options_to_family(hole_options):
-    family = quotient.family.copy()
-    for hole,options in enumerate(hole_options):
-        family.hole_set_options(hole,options)
-    return family
 
+# messages sent from workers to the master process
+MSG_RESULT = 0
+MSG_IDLE = 1
+MSG_ERROR = 2
 
-def solve_family(args):
-    '''
-    Build the quotient, analyze it and, if necessary, split into subfamilies.
-    '''
-    try:
-
-        if args is None:
-            pstats.Stats(profiler).sort_stats('tottime').print_stats(10)
-            return
-
-        hole_options, optimum = args
-        # re-construct the family
-        family = hole_options_to_family(hole_options)
+# how often (in seconds) the master process checks resource limits while waiting for workers
+POLL_INTERVAL = 1
 
-        # synchronize optimum
-        if optimum is not None:
-            quotient.specification.optimality.optimum = optimum
 
-        quotient.build(family)
-        quotient.check_specification_for_mdp(family)
-        res = family.analysis_result
-        improving_value = res.improving_value
-        improving_assignment = res.improving_assignment
-        if improving_assignment is not None:
-            improving_assignment = family_to_hole_options(improving_assignment)
+def synchronize_optimum(shared_optimum):
+    ''' Adopt the optimum broadcast by other processes, if it is better than the local one. '''
+    if not quotient.specification.has_optimality:
+        return
+    optimum = shared_optimum.value
+    if math.isnan(optimum):
+        return
+    if quotient.specification.optimality.improves_optimum(optimum):
+        quotient.specification.optimality.update_optimum(optimum)
 
-        subfamilies = []
-        if res.can_improve:
-            subfamilies = quotient.split(family)
-            subfamilies = [ family_to_hole_options(family) for family in subfamilies ]
+def broadcast_optimum(shared_optimum, value):
+    ''' Publish a new optimum to all processes unless a better one has already been published. '''
+    opt = quotient.specification.optimality
+    with shared_optimum.get_lock():
+        if math.isnan(shared_optimum.value) or opt.meets_op(value, shared_optimum.value):
+            shared_optimum.value = value
 
-        return (family.mdp.states, improving_value, improving_assignment, subfamilies)
 
+def worker_loop(worker_id, task_queue, result_queue, shared_optimum, stop_event):
+    '''
+    Persistent worker: repeatedly takes a family from the shared pool and explores it. After each split, one subfamily
+    is kept locally and explored next (DFS), while the remaining subfamilies are returned to the pool where they can be
+    picked up by idle workers.
+    '''
+    try:
+        synthesizer = SynthesizerAR(quotient)
+        # worker-local statistics, counters relevant to the master are sent along with the results
+        synthesizer.stat = paynt.synthesizer.statistic.Statistic(synthesizer)
+        while True:
+            task = task_queue.get()
+            if task is None:
+                return
+            families = [unpack_family(task)]
+            while families:
+                if stop_event.is_set():
+                    break
+                family = families.pop(-1)
+                synchronize_optimum(shared_optimum)
+
+                quotient.build(family)
+                secondary_skipped = synthesizer.stat.num_secondary_skipped
+                synthesizer.check_specification(family)
+                secondary_skipped = synthesizer.stat.num_secondary_skipped - secondary_skipped
+                res = family.analysis_result
+
+                improving_value = res.improving_value
+                improving_assignment = res.improving_assignment
+                if improving_assignment is not None:
+                    if improving_value is not None:
+                        quotient.specification.optimality.update_optimum(improving_value)
+                        broadcast_optimum(shared_optimum, improving_value)
+                    improving_assignment = improving_assignment.pack()
+
+                explored = 0
+                subfamilies = []
+                if res.can_improve is False:
+                    explored = family.size
+                else:
+                    subfamilies = quotient.split(family)
+                    # keep the core subfamily, share the others
+                    families.append(subfamilies.pop(-1))
+                    subfamilies = [subfamily.pack() for subfamily in subfamilies]
+
+                result_queue.put(
+                    (MSG_RESULT, worker_id, family.mdp.states, explored, secondary_skipped, improving_value, improving_assignment, subfamilies)
+                )
+            result_queue.put((MSG_IDLE, worker_id))
     except:
-        logger.error("Worker sub-process encountered an error.")
-        return None
-
+        result_queue.put((MSG_ERROR, worker_id, traceback.format_exc()))
 
 
 class SynthesizerMultiCoreAR(SynthesizerAR):
 
+    # number of worker processes; if None, os.cpu_count() workers will be used
+    num_workers = None
+
     @property
     def method_name(self):
         return "AR (multicore)"
 
     def synthesize_one(self, family):
 
-        satisfying_assignment = None
-        families = [family]
-
         global quotient
         quotient = self.quotient
-        profiling = False
-        if profiling:
-            global profiler
-            profiler = cProfile.Profile()
-            profiler.enable()
-
-        # create a pool of processes
-        # by default, os.cpu_count() processes will be spawned
-        with multiprocessing.Pool(
-            # processes=1
-        ) as pool:
 
-            while families:
-
-                # get current optimum
-                optimum = None
-                if self.quotient.specification.has_optimality:
-                    optimum = self.quotient.specification.optimality.optimum
-
-                # work with some number of families
-                # print("submitting ", len(families), " families")
-
-                split = os.cpu_count() * 1
-                input_families = families[-split:]
-                input_families_size = sum([family.size for family in input_families])
-                remaining_families = families[:-split]
-                input_families = [family_to_hole_options(family) for family in input_families]
-
-                inputs = zip(input_families, [optimum] * len(input_families))
-
-                results = pool.map(solve_family, inputs)
-                # results = pool.imap_unordered(solve_family, inputs, chunksize=10)
-                # results = pool.map(solve_batch, inputs)
-
-                # process the results
-                new_families = []
-                for r in results:
-                    if r is None:
-                        logger.error("Worker sub-process encountered an error.")
-                        exit()
-                    mdp_states, improving_value, improving_assignment, subfamilies_hole_options = r
-                    self.stat.iteration_mdp(mdp_states)
-
-                    if improving_value is not None:
-                        if self.quotient.specification.optimality.improves_optimum(improving_value):
-                            self.quotient.specification.optimality.update_optimum(improving_value)
-                            improving_assignment = hole_options_to_family(improving_assignment)
-                            satisfying_assignment = improving_assignment
-
-                    subfamilies = [hole_options_to_family(hole_options) for hole_options in subfamilies_hole_options]
-                    new_families += subfamilies
-
-                new_families_size = sum([family.size for family in new_families])
-                self.explored += input_families_size-new_families_size
-
-                families = remaining_families + new_families
-
-            if profiling:
-                pool.apply(solve_family, (None,))
-
-        if profiling:
-            pstats.Stats(profiler).sort_stats('tottime').print_stats(10)
-        return satisfying_assignment
+        num_workers = SynthesizerMultiCoreAR.num_workers
+        if num_workers is None:
+            num_workers = os.cpu_count()
+
+        # workers are forked to inherit the quotient: its matrix and coloring live in C++ memory that is only read, so
+        # their pages stay shared between all processes
+        context = multiprocessing.get_context("fork")
+        task_queue = context.Queue()
+        result_queue = context.Queue()
+        shared_optimum = context.Value("d", math.nan)
+        stop_event = context.Event()
+        if self.quotient.specification.has_optimality and self.quotient.specification.optimality.optimum is not None:
+            shared_optimum.value = self.quotient.specification.optimality.optimum
+
+        workers = []
+        families = [family.pack()]
+        idle_workers = list(range(num_workers))
+        try:
+            for worker_id in range(num_workers):
+                worker = context.Process(
+                    target=worker_loop, args=(worker_id,task_queue,result_queue,shared_optimum,stop_event))
+                worker.start()
+                workers.append(worker)
+
+            while families or len(idle_workers) < num_workers:
+
+                # dispatch families to idle workers
+                while families and idle_workers:
+                    idle_workers.pop(-1)
+                    task_queue.put(families.pop(-1))
+
+                try:
+                    message = result_queue.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    message = None
+                    # a worker killed without reporting (e.g. by the OOM killer) would never become idle again
+                    for worker_id,worker in enumerate(workers):
+                        if not worker.is_alive():
+                            raise RuntimeError(
+                                f"worker {worker_id} terminated unexpectedly (exit code {worker.exitcode})")
+                if self.resource_limit_reached():
+                    break
+                if message is None:
+                    continue
+
+                message_type = message[0]
+                if message_type == MSG_ERROR:
+                    _,worker_id,error = message
+                    # the search is incomplete, its result must not be reported as the answer
+                    raise RuntimeError(f"worker {worker_id} encountered an error:\n{error}")
+                if message_type == MSG_IDLE:
+                    _,worker_id = message
+                    idle_workers.append(worker_id)
+                    continue
+
+                _,worker_id,mdp_states,explored,secondary_skipped,improving_value,improving_assignment,subfamilies = message
+                self.stat.iteration_mdp(mdp_states)
+                self.stat.num_secondary_skipped += secondary_skipped
+                self.explored += explored
+                families += subfamilies
+                if improving_assignment is not None:
+                    self.update_optimum_from_worker(improving_value, improving_assignment)
+                    if not self.quotient.specification.has_optimality:
+                        break
+        finally:
+            stop_event.set()
+            for _ in workers:
+                task_queue.put(None)
+            for worker in workers:
+                worker.join(timeout=POLL_INTERVAL)
+                if worker.is_alive():
+                    worker.terminate()
+            # ru_maxrss is in kB on Linux, for children it is the maximum over all terminated workers
+            worker_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // 1024
+            master_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+            logger.info(f"peak resident memory: worker {worker_rss} MB ({num_workers} workers), master {master_rss} MB")
+
+        return self.best_assignment
+
+    def update_optimum_from_worker(self, improving_value, improving_assignment):
+        assignment = unpack_family(improving_assignment)
+        if not self.quotient.specification.has_optimality:
+            self.best_assignment = assignment
+            return
+        if not self.quotient.specification.optimality.improves_optimum(improving_value):
+            return
+        self.quotient.specification.optimality.update_optimum(improving_value)
+        self.best_assignment = assignment
+        self.best_assignment_value = improving_value
+        logger.info(f"value {round(improving_value,4)} achieved after {round(paynt.utils.timer.GlobalTimer.read(),2)} seconds")
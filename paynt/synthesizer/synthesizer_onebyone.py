@@ -1,5 +1,7 @@
 import paynt.synthesizer.synthesizer
 
+import itertools
+
 import logging
 logger = logging.getLogger(__name__)
 
@@ -9,23 +11,51 @@ class SynthesizerOneByOne(paynt.synthesizer.synthesizer.Synthesizer):
     def method_name(self):
         return "1-by-1"
 
+    # number of assignments evaluated in a single batch
+    batch_size = 1024
+
     def synthesize_one(self, family):
-        
-        for hole_combination in family.all_combinations():
-            
-            assignment = family.construct_assignment(hole_combination)
-            dtmc = self.quotient.build_assignment(assignment)
-            self.stat.iteration(dtmc)
-            result = dtmc.check_specification(self.quotient.specification, short_evaluation=True)
-            self.explore(assignment)
+        spec = self.quotient.specification
+        combinations = family.all_combinations()
+        while True:
+            if self.resource_limit_reached():
+                break
+            batch = list(itertools.islice(combinations, SynthesizerOneByOne.batch_size))
+            if not batch:
+                break
+
+            # evaluate each constraint only for assignments that satisfy the previous ones
+            num_states = None
+            satisfying = list(range(len(batch)))
+            for prop in spec.constraints:
+                if not satisfying:
+                    break
+                values,dtmc_states = self.quotient.evaluate_assignments([batch[index] for index in satisfying], prop)
+                if num_states is None:
+                    num_states = dtmc_states
+                satisfying = [index for index,value in zip(satisfying,values) if prop.satisfies_threshold(value)]
+            optimality_values = None
+            if spec.has_optimality and satisfying:
+                optimality_values,dtmc_states = self.quotient.evaluate_assignments([batch[index] for index in satisfying], spec.optimality)
+                if num_states is None:
+                    num_states = dtmc_states
+                optimality_values = dict(zip(satisfying,optimality_values))
+            satisfying = set(satisfying)
 
-            accepting,improving_value = result.accepting_dtmc(self.quotient.specification)
-            if accepting:
-                self.best_assignment = assignment
-            if improving_value is not None:
-                self.quotient.specification.optimality.update_optimum(improving_value)
-            if accepting and not self.quotient.specification.can_be_improved:
-                return accepting_assignment
+            for index,hole_combination in enumerate(batch):
+                if num_states is not None:
+                    self.stat.iteration_dtmc(num_states[index])
+                self.explored += 1
+                if index not in satisfying:
+                    continue
+                if spec.has_optimality:
+                    value = optimality_values[index]
+                    if not spec.optimality.improves_optimum(value):
+                        continue
+                    spec.optimality.update_optimum(value)
+                self.best_assignment = family.construct_assignment(hole_combination)
+                if not spec.can_be_improved():
+                    return self.best_assignment
 
         return self.best_assignment
 
@@ -35,6 +65,14 @@ class SynthesizerOneByOne(paynt.synthesizer.synthesizer.Synthesizer):
             logger.debug("forcing keep_value_only=True for the one-by-one evaluation")
             keep_value_only = True
 
+        if keep_value_only:
+            combinations = list(family.all_combinations())
+            values,num_states = self.quotient.evaluate_assignments(combinations, prop)
+            for dtmc_states in num_states:
+                self.stat.iteration_dtmc(dtmc_states)
+            self.explored += len(combinations)
+            return list(values)
+
         evaluations = []
         for hole_combination in family.all_combinations():
             assignment = family.construct_assignment(hole_combination)
@@ -0,0 +1,94 @@
+import paynt.synthesizer.synthesizer
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class SynthesizerSymbolic(paynt.synthesizer.synthesizer.Synthesizer):
+    '''
+    Synthesizer over the symbolic quotient: families are decided using the symbolic model checking results restricted
+    to the family, undecided families are split until they are small enough to be evaluated member by member.
+    '''
+
+    @property
+    def method_name(self):
+        return "symbolic"
+
+    def verify_family(self, family):
+        '''
+        Decide the family using the symbolic results.
+        :returns True if all members satisfy the constraints, False if none does, None otherwise
+        '''
+        spec = self.quotient.specification
+        all_sat = True
+        for index,prop in enumerate(spec.constraints):
+            lower,upper = self.quotient.family_bounds(family, index)
+            best,worst = (lower,upper) if prop.minimizing else (upper,lower)
+            if not prop.satisfies_threshold(best):
+                return False
+            if not prop.satisfies_threshold(worst):
+                all_sat = False
+        if spec.has_optimality:
+            value = self.quotient.family_best_value(family, len(spec.constraints))
+            if not spec.optimality.improves_optimum(value):
+                return False
+        if not all_sat:
+            return None
+        return True
+
+    def locate_best_member(self, family):
+        ''' Descend to the member of the family having the best optimality value. '''
+        optimality_index = len(self.quotient.specification.constraints)
+        minimizing = self.quotient.specification.optimality.minimizing
+        while family.size > 1:
+            subfamilies = self.quotient.split(family)
+            values = [self.quotient.family_best_value(subfamily, optimality_index) for subfamily in subfamilies]
+            best = values.index(min(values) if minimizing else max(values))
+            family = subfamilies[best]
+        return family, self.quotient.family_best_value(family, optimality_index)
+
+    def update_optimum(self, assignment, value):
+        spec = self.quotient.specification
+        self.best_assignment = assignment
+        if spec.has_optimality:
+            spec.optimality.update_optimum(value)
+            self.best_assignment_value = value
+            logger.info(f"new optimum achieved: {value}")
+
+    def synthesize_members(self, family):
+        ''' Evaluate each member of a small family individually. '''
+        spec = self.quotient.specification
+        for combination,values in self.quotient.evaluate_members(family):
+            if not all(prop.satisfies_threshold(values[index]) for index,prop in enumerate(spec.constraints)):
+                continue
+            value = None
+            if spec.has_optimality:
+                value = values[-1]
+                if not spec.optimality.improves_optimum(value):
+                    continue
+            self.update_optimum(family.construct_assignment(combination), value)
+
+    def synthesize_one(self, family):
+        spec = self.quotient.specification
+        families = [family]
+        while families:
+            if self.resource_limit_reached():
+                break
+            family = families.pop(-1)
+            self.stat.iteration_mdp(self.quotient.quotient_mdp.nr_states)
+
+            result = self.verify_family(family)
+            if result is None and family.size > self.quotient.sparse_family_size:
+                families += self.quotient.split(family)
+                continue
+            if result is None:
+                self.synthesize_members(family)
+            elif result:
+                if spec.has_optimality:
+                    self.update_optimum(*self.locate_best_member(family))
+                else:
+                    self.update_optimum(family, None)
+            self.explore(family)
+            if not spec.has_optimality and self.best_assignment is not None:
+                break
+        return self.best_assignment
@@ -85,6 +85,17 @@ class Property:
     def model_check(cls, model, formula):
         return stormpy.model_checking(model, formula, extract_scheduler=True, environment=cls.environment)
 
+    @classmethod
+    def model_check_with_hint(cls, model, formula, hint_result, state_to_hint_state):
+        '''
+        Model check the MDP using the result for a related MDP (e.g. the MDP of the parent family) as the starting
+        point of value iteration.
+        :param state_to_hint_state for each state of the model, the corresponding state of the related MDP
+        '''
+        return payntbind.synthesis.model_check_mdp_with_hint(
+            model, formula, hint_result, state_to_hint_state, produce_schedulers=True, env=cls.environment
+        )
+
     @classmethod
     def compute_expected_visits(cls, model):
         result = stormpy.compute_expected_number_of_visits(cls.environment, model)
@@ -10,6 +10,9 @@
 
 #include <sstream>
 #include <string>
+#include <vector>
+
+#include <pybind11/numpy.h>
 
 /**
  * Helper function to get a string out of the stream operator.
@@ -33,6 +36,17 @@ std::string containerToString(T& t) {
     return ss.str();
 }
 
+/**
+ * Helper function to expose a vector as a NumPy array without copying it. The vector is moved to the heap and is
+ * owned by the array.
+ */
+template<typename T>
+pybind11::array_t<T> vectorToArray(std::vector<T>&& vector) {
+    auto data = new std::vector<T>(std::move(vector));
+    pybind11::capsule owner(data, [](void* data) { delete reinterpret_cast<std::vector<T>*>(data); });
+    return pybind11::array_t<T>(data->size(), data->data(), owner);
+}
+
 // Be warned: Enabling something like this will break everything about Monomial,
 // as to Python the shared_ptr (Arg) IS the Monomial
 //  //PYBIND11_DECLARE_HOLDER_TYPE(T, std::shared_ptr<T>);
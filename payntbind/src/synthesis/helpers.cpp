@@ -1,4 +1,6 @@
 #include "synthesis.h"
+#include "verification/MdpModelChecker.h"
+#include "src/helpers.h"
 
 #include <storm/adapters/RationalNumberAdapter.h>
 #include <storm/logic/Formula.h>
@@ -13,7 +15,13 @@
 #include <storm/environment/solver/NativeSolverEnvironment.h>
 #include <storm/environment/solver/MinMaxSolverEnvironment.h>
 #include <storm/storage/SparseMatrix.h>
+#include <storm/storage/BitVector.h>
 #include <storm/models/sparse/Model.h>
+#include <storm/models/sparse/StandardRewardModel.h>
+#include <storm/exceptions/InvalidArgumentException.h>
+#include <storm/utility/constants.h>
+
+#include <optional>
 
 #include <storm/storage/jani/TemplateEdge.h>
 
@@ -45,6 +53,54 @@ void removeRewardModel(storm::models::sparse::Model<ValueType> & model, std::str
     model.removeRewardModel(reward_name);
 }
 
+/** Identify states all of whose choices lead back to the state itself. */
+template<typename ValueType>
+storm::storage::BitVector identifyAbsorbingStates(storm::models::sparse::Model<ValueType> const& model) {
+    auto const& matrix = model.getTransitionMatrix();
+    auto const& row_groups = matrix.getRowGroupIndices();
+    storm::storage::BitVector state_is_absorbing(model.getNumberOfStates(), true);
+    for(uint64_t state = 0; state < model.getNumberOfStates(); ++state) {
+        for(uint64_t row = row_groups[state]; row < row_groups[state+1] and state_is_absorbing[state]; ++row) {
+            for(auto const& entry: matrix.getRow(row)) {
+                if(entry.getColumn() != state) {
+                    state_is_absorbing.set(state,false);
+                    break;
+                }
+            }
+        }
+    }
+    return state_is_absorbing;
+}
+
+/**
+ * Construct a reward model equivalent to the given one where state rewards are added to the rewards of all choices
+ * of the state.
+ */
+template<typename ValueType>
+storm::models::sparse::StandardRewardModel<ValueType> stateActionRewardModel(
+    storm::models::sparse::Model<ValueType> const& model, std::string const& reward_name
+) {
+    auto const& reward_model = model.getRewardModel(reward_name);
+    STORM_LOG_THROW(!reward_model.hasTransitionRewards(), storm::exceptions::InvalidArgumentException,
+        "Paynt does not support transition rewards");
+    auto const& row_groups = model.getTransitionMatrix().getRowGroupIndices();
+    std::vector<ValueType> action_reward;
+    if(reward_model.hasStateActionRewards()) {
+        action_reward = reward_model.getStateActionRewardVector();
+    } else {
+        action_reward.assign(model.getNumberOfChoices(), storm::utility::zero<ValueType>());
+    }
+    if(reward_model.hasStateRewards()) {
+        auto const& state_reward = reward_model.getStateRewardVector();
+        for(uint64_t state = 0; state < model.getNumberOfStates(); ++state) {
+            for(uint64_t row = row_groups[state]; row < row_groups[state+1]; ++row) {
+                action_reward[row] += state_reward[state];
+            }
+        }
+    }
+    return storm::models::sparse::StandardRewardModel<ValueType>(std::nullopt, std::move(action_reward));
+}
+
 bool janiTemplateEdgeAddTransientAssignment(storm::jani::TemplateEdge & template_edge, storm::jani::Assignment const& assignment, bool add_to_existing = false) {
     return template_edge.addTransientAssignment(assignment,add_to_existing);
 }
@@ -55,8 +111,52 @@ void janiTemplateEdgeAddAssignments(storm::jani::TemplateEdge & template_edge, s
     }
 }
 
+/**
+ * Compute values of choices of the model given values of its states: the value of a choice is its expected reward
+ * (if the reward model is given) plus the expected value of its successor states. Infinite choice values are replaced
+ * by the average choice value, where infinite values count as zero.
+ */
+std::vector<double> computeChoiceValues(
+    storm::models::sparse::Model<double> const& model, std::vector<double> const& state_values,
+    std::optional<std::string> const& reward_name
+) {
+    auto const& matrix = model.getTransitionMatrix();
+    std::vector<double> choice_values(matrix.getRowCount());
+    matrix.multiplyWithVector(state_values, choice_values);
+
+    double finite_sum = 0;
+    bool has_infinity = false;
+    for(auto value: choice_values) {
+        if(value == storm::utility::infinity<double>()) {
+            has_infinity = true;
+        } else {
+            finite_sum += value;
+        }
+    }
+    if(has_infinity) {
+        double default_value = finite_sum / choice_values.size();
+        for(auto & value: choice_values) {
+            if(value == storm::utility::infinity<double>()) {
+                value = default_value;
+            }
+        }
+    }
+
+    if(reward_name) {
+        auto const& reward_model = model.getRewardModel(*reward_name);
+        STORM_LOG_THROW(reward_model.hasStateActionRewards(), storm::exceptions::InvalidArgumentException,
+            "reward model " << *reward_name << " has no state-action rewards.");
+        auto const& choice_rewards = reward_model.getStateActionRewardVector();
+        for(uint64_t choice = 0; choice < choice_values.size(); ++choice) {
+            choice_values[choice] += choice_rewards[choice];
+        }
+    }
+    return choice_values;
 }
 
+}
+
+
 
 void define_helpers(py::module& m) {
 
@@ -72,6 +172,10 @@ void define_helpers(py::module& m) {
     m.def("transform_until_to_eventually", &synthesis::transformUntilToEventually<double>, py::arg("formula"));
     m.def("remove_reward_model", &synthesis::removeRewardModel<double>, py::arg("model"), py::arg("reward_name"));
     m.def("remove_reward_model_exact", &synthesis::removeRewardModel<storm::RationalNumber>, py::arg("model"), py::arg("reward_name"));
+    m.def("state_action_reward_model", &synthesis::stateActionRewardModel<double>, py::arg("model"), py::arg("reward_name"));
+    m.def("state_action_reward_model_exact", &synthesis::stateActionRewardModel<storm::RationalNumber>, py::arg("model"), py::arg("reward_name"));
+    m.def("identify_absorbing_states", &synthesis::identifyAbsorbingStates<double>, py::arg("model"));
+    m.def("identify_absorbing_states_exact", &synthesis::identifyAbsorbingStates<storm::RationalNumber>, py::arg("model"));
 
     m.def("multiply_with_vector", [] (storm::storage::SparseMatrix<double> matrix,std::vector<double> vector) {
         std::vector<double> result(matrix.getRowCount());
@@ -79,12 +183,28 @@ void define_helpers(py::module& m) {
         return result;
     }, py::arg("matrix"), py::arg("vector"));
 
+    m.def("compute_choice_values", [] (
+        storm::models::sparse::Model<double> const& model, std::vector<double> const& state_values,
+        std::optional<std::string> const& reward_name
+    ) {
+        return vectorToArray(synthesis::computeChoiceValues(model, state_values, reward_name));
+    }, py::arg("model"), py::arg("state_values"), py::arg("reward_name") = std::nullopt);
+
     m.def("multiply_with_vector_exact", [] (storm::storage::SparseMatrix<storm::RationalNumber> matrix,std::vector<storm::RationalNumber> vector) {
         std::vector<storm::RationalNumber> result(matrix.getRowCount());
         matrix.multiplyWithVector(vector, result);
         return result;
     }, py::arg("matrix"), py::arg("vector"));
 
+    m.def("model_check_mdp_with_hint", [] (
+        std::shared_ptr<storm::models::sparse::Mdp<double>> const& mdp, storm::logic::Formula const& formula,
+        storm::modelchecker::ExplicitQuantitativeCheckResult<double> const& hint_result,
+        std::vector<uint64_t> const& state_to_hint_state, bool produce_schedulers, storm::Environment const& env
+    ) {
+        return synthesis::verifyMdpWithHint<double>(env, mdp, formula, hint_result, state_to_hint_state, produce_schedulers);
+    }, py::arg("mdp"), py::arg("formula"), py::arg("hint_result"), py::arg("state_to_hint_state"),
+        py::arg("produce_schedulers") = true, py::arg("env") = storm::Environment());
+
     m.def("janiTemplateEdgeAddAssignments", &synthesis::janiTemplateEdgeAddAssignments, py::arg("template_edge"), py::arg("assignments"));
 }
 
@@ -0,0 +1,292 @@
+#include "PosmgParser.h"
+
+#include <storm/storage/SparseMatrix.h>
+#include <storm/storage/sparse/ModelComponents.h>
+#include <storm/models/sparse/StateLabeling.h>
+#include <storm/models/sparse/ChoiceLabeling.h>
+#include <storm/models/sparse/StandardRewardModel.h>
+#include <storm/utility/macros.h>
+#include <storm/exceptions/FileIoException.h>
+#include <storm/exceptions/WrongFormatException.h>
+
+#include <algorithm>
+#include <cctype>
+#include <fstream>
+#include <optional>
+#include <sstream>
+
+namespace synthesis {
+
+namespace {
+
+std::string const NO_LABEL = "__NOLABEL__";
+
+bool startsWith(std::string const& line, std::string const& prefix) {
+    return line.compare(0, prefix.size(), prefix) == 0;
+}
+
+std::string trim(std::string const& line) {
+    auto begin = line.find_first_not_of(" \t\r");
+    if(begin == std::string::npos) {
+        return "";
+    }
+    auto end = line.find_last_not_of(" \t\r");
+    return line.substr(begin, end-begin+1);
+}
+
+/** Parse a probability or a reward, fractions a/b are supported. */
+double parseValue(std::string const& token) {
+    size_t processed;
+    double value;
+    try {
+        value = std::stod(token, &processed);
+    } catch(std::exception const&) {
+        STORM_LOG_THROW(false, storm::exceptions::WrongFormatException, "cannot parse value '" << token << "'.");
+    }
+    if(processed < token.size() and token[processed] == '/') {
+        value /= std::stod(token.substr(processed+1));
+    }
+    return value;
+}
+
+/**
+ * Split the line into tokens separated by whitespace, where a bracketed group ([...], {...} or <...>) forms a single
+ * token even if it contains whitespace.
+ */
+std::vector<std::string> tokenize(std::string const& line) {
+    std::vector<std::string> tokens;
+    uint64_t position = 0;
+    while(position < line.size()) {
+        if(std::isspace(line[position])) {
+            ++position;
+            continue;
+        }
+        uint64_t end;
+        char opening = line[position];
+        if(opening == '[' or opening == '{' or opening == '<') {
+            char closing = opening == '[' ? ']' : (opening == '{' ? '}' : '>');
+            end = line.find(closing, position);
+            STORM_LOG_THROW(end != std::string::npos, storm::exceptions::WrongFormatException,
+                "missing '" << closing << "' in line '" << line << "'.");
+            ++end;
+        } else {
+            end = position;
+            while(end < line.size() and not std::isspace(line[end])) {
+                ++end;
+            }
+        }
+        tokens.push_back(line.substr(position, end-position));
+        position = end;
+    }
+    return tokens;
+}
+
+/** Parse a bracketed list of comma-separated rewards, one for each reward model. */
+std::vector<double> parseRewards(std::string const& token, uint64_t num_reward_models) {
+    std::vector<double> rewards;
+    std::string list = token.substr(1, token.size()-2);
+    if(trim(list).empty()) {
+        return rewards;
+    }
+    std::stringstream stream(list);
+    std::string reward;
+    while(std::getline(stream, reward, ',')) {
+        rewards.push_back(parseValue(trim(reward)));
+    }
+    STORM_LOG_THROW(rewards.size() == num_reward_models, storm::exceptions::WrongFormatException,
+        "expected " << num_reward_models << " rewards in '" << token << "'.");
+    return rewards;
+}
+
+}
+
+std::shared_ptr<Posmg<double>> parsePosmgDrn(std::string const& path) {
+    std::ifstream file(path);
+    STORM_LOG_THROW(file, storm::exceptions::FileIoException, "cannot open " << path << ".");
+
+    // header
+    std::string line;
+    std::vector<std::string> reward_model_names;
+    std::optional<uint64_t> num_states_header;
+    std::optional<uint64_t> num_choices_header;
+    bool type_found = false;
+    auto nextLine = [&]() {
+        STORM_LOG_THROW(std::getline(file, line), storm::exceptions::WrongFormatException, "unexpected end of file.");
+        return trim(line);
+    };
+    // set if the current line holds a header that was read while skipping the values of an unknown header
+    bool header_pending = false;
+    while(true) {
+        std::string header = header_pending ? trim(line) : nextLine();
+        header_pending = false;
+        if(header.empty() or startsWith(header, "//")) {
+            continue;
+        }
+        if(startsWith(header, "@type:")) {
+            std::string type = trim(header.substr(6));
+            STORM_LOG_THROW(type == "POSMG", storm::exceptions::WrongFormatException, "expected a POSMG, found " << type << ".");
+            type_found = true;
+        } else if(header == "@parameters") {
+            STORM_LOG_THROW(nextLine().empty(), storm::exceptions::WrongFormatException, "parametric models are not supported.");
+        } else if(header == "@reward_models") {
+            std::stringstream names(nextLine());
+            std::string name;
+            while(names >> name) {
+                reward_model_names.push_back(name);
+            }
+        } else if(header == "@nr_states") {
+            num_states_header = std::stoull(nextLine());
+        } else if(header == "@nr_choices") {
+            num_choices_header = std::stoull(nextLine());
+        } else if(header == "@model") {
+            break;
+        } else {
+            // unknown header (e.g. @value_type or @placeholders), skip it together with its values
+            STORM_LOG_WARN("skipping unknown header '" << header << "'.");
+            while(not startsWith(nextLine(), "@")) {}
+            header_pending = true;
+        }
+    }
+    STORM_LOG_THROW(type_found and num_states_header and num_choices_header, storm::exceptions::WrongFormatException,
+        "the header must contain the model type, the number of states and the number of choices.");
+    uint64_t num_states = *num_states_header;
+    uint64_t num_choices = *num_choices_header;
+    uint64_t num_reward_models = reward_model_names.size();
+
+    // model
+    storm::storage::SparseMatrixBuilder<double> builder(num_choices, num_states, 0, true, true, num_states);
+    storm::models::sparse::StateLabeling state_labeling(num_states);
+    storm::models::sparse::ChoiceLabeling choice_labeling(num_choices);
+    std::vector<uint32_t> observations(num_states);
+    std::vector<storm::storage::PlayerIndex> state_player(num_states);
+    std::vector<std::vector<double>> state_rewards(num_reward_models);
+    std::vector<std::vector<double>> action_rewards(num_reward_models);
+
+    int64_t state = -1;
+    int64_t choice = -1;
+    // transitions of the current choice, sorted upon completion of the choice
+    std::vector<std::pair<uint64_t,double>> row;
+    auto flushRow = [&]() {
+        if(choice < 0) {
+            return;
+        }
+        std::sort(row.begin(), row.end());
+        for(uint64_t entry = 0; entry < row.size(); ++entry) {
+            if(entry+1 < row.size() and row[entry].first == row[entry+1].first) {
+                // merge duplicate destinations
+                row[entry+1].second += row[entry].second;
+                continue;
+            }
+            builder.addNextValue(choice, row[entry].first, row[entry].second);
+        }
+        row.clear();
+    };
+
+    while(std::getline(file, line)) {
+        if(startsWith(line, "state ")) {
+            flushRow();
+            std::vector<std::string> tokens = tokenize(line.substr(6));
+            STORM_LOG_THROW(not tokens.empty(), storm::exceptions::WrongFormatException, "missing state index.");
+            uint64_t index = std::stoull(tokens[0]);
+            STORM_LOG_THROW((int64_t)index == state+1 and index < num_states, storm::exceptions::WrongFormatException,
+                "states must be listed in order, found state " << index << " after state " << state << ".");
+            state = index;
+            builder.newRowGroup(choice+1);
+            bool observation_found = false;
+            bool player_found = false;
+            for(uint64_t token_index = 1; token_index < tokens.size(); ++token_index) {
+                std::string const& token = tokens[token_index];
+                if(token[0] == '{') {
+                    observations[state] = std::stoul(token.substr(1, token.size()-2));
+                    observation_found = true;
+                } else if(token[0] == '<') {
+                    state_player[state] = std::stoull(token.substr(1, token.size()-2));
+                    player_found = true;
+                } else if(token[0] == '[') {
+                    auto rewards = parseRewards(token, num_reward_models);
+                    for(uint64_t reward_model = 0; reward_model < rewards.size(); ++reward_model) {
+                        if(state_rewards[reward_model].empty()) {
+                            state_rewards[reward_model].resize(num_states, 0);
+                        }
+                        state_rewards[reward_model][state] = rewards[reward_model];
+                    }
+                } else {
+                    if(not state_labeling.containsLabel(token)) {
+                        state_labeling.addLabel(token);
+                    }
+                    state_labeling.addLabelToState(token, state);
+                }
+            }
+            STORM_LOG_THROW(observation_found and player_found, storm::exceptions::WrongFormatException,
+                "state " << state << " has no observation or no player indication.");
+        } else if(startsWith(line, "\taction ")) {
+            STORM_LOG_THROW(state >= 0, storm::exceptions::WrongFormatException, "action outside of a state.");
+            flushRow();
+            ++choice;
+            STORM_LOG_THROW((uint64_t)choice < num_choices, storm::exceptions::WrongFormatException, "too many choices.");
+            std::vector<std::string> tokens = tokenize(line.substr(8));
+            for(std::string const& token: tokens) {
+                if(token[0] == '[') {
+                    auto rewards = parseRewards(token, num_reward_models);
+                    for(uint64_t reward_model = 0; reward_model < rewards.size(); ++reward_model) {
+                        if(action_rewards[reward_model].empty()) {
+                            action_rewards[reward_model].resize(num_choices, 0);
+                        }
+                        action_rewards[reward_model][choice] = rewards[reward_model];
+                    }
+                    continue;
+                }
+                if(token == NO_LABEL) {
+                    continue;
+                }
+                std::stringstream labels(token);
+                std::string label;
+                while(std::getline(labels, label, '|')) {
+                    if(not choice_labeling.containsLabel(label)) {
+                        choice_labeling.addLabel(label);
+                    }
+                    choice_labeling.addLabelToChoice(label, choice);
+                }
+            }
+        } else if(startsWith(line, "\t\t")) {
+            STORM_LOG_THROW(choice >= 0, storm::exceptions::WrongFormatException, "transition outside of an action.");
+            std::string transition = trim(line);
+            auto separator = transition.find(':');
+            STORM_LOG_THROW(separator != std::string::npos, storm::exceptions::WrongFormatException,
+                "cannot parse transition '" << transition << "'.");
+            uint64_t destination = std::stoull(transition.substr(0, separator));
+            STORM_LOG_THROW(destination < num_states, storm::exceptions::WrongFormatException,
+                "transition to a non-existent state " << destination << ".");
+            row.emplace_back(destination, parseValue(trim(transition.substr(separator+1))));
+        } else if(not trim(line).empty() and not startsWith(trim(line), "//")) {
+            STORM_LOG_THROW(false, storm::exceptions::WrongFormatException, "unexpected line '" << line << "'.");
+        }
+    }
+    flushRow();
+    STORM_LOG_THROW(state+1 == (int64_t)num_states and choice+1 == (int64_t)num_choices, storm::exceptions::WrongFormatException,
+        "the number of states or choices does not match the header.");
+
+    std::unordered_map<std::string,storm::models::sparse::StandardRewardModel<double>> reward_models;
+    for(uint64_t reward_model = 0; reward_model < num_reward_models; ++reward_model) {
+        std::optional<std::vector<double>> state_reward_vector;
+        std::optional<std::vector<double>> action_reward_vector;
+        if(not state_rewards[reward_model].empty()) {
+            state_reward_vector = std::move(state_rewards[reward_model]);
+        }
+        if(not action_rewards[reward_model].empty() or not state_reward_vector) {
+            action_rewards[reward_model].resize(num_choices, 0);
+            action_reward_vector = std::move(action_rewards[reward_model]);
+        }
+        reward_models.emplace(reward_model_names[reward_model],
+            storm::models::sparse::StandardRewardModel<double>(std::move(state_reward_vector), std::move(action_reward_vector))
+        );
+    }
+
+    storm::storage::sparse::ModelComponents<double> components(builder.build(), std::move(state_labeling), std::move(reward_models));
+    components.choiceLabeling = std::move(choice_labeling);
+    components.observabilityClasses = std::move(observations);
+    components.statePlayerIndications = std::move(state_player);
+    return std::make_shared<Posmg<double>>(std::move(components));
+}
+
+} // namespace synthesis
@@ -0,0 +1,20 @@
+#pragma once
+
+#include "Posmg.h"
+
+#include <memory>
+#include <string>
+
+namespace synthesis {
+
+/**
+ * @brief Parse a POSMG from a file in the explicit DRN format.
+ *
+ * The file is read once as a stream; observations ({obs}) and player indications (<player>) of each state are
+ * collected directly while the transition matrix is being built.
+ *
+ * @param path Path to the DRN file
+ */
+std::shared_ptr<Posmg<double>> parsePosmgDrn(std::string const& path);
+
+} // namespace synthesis
@@ -2,6 +2,7 @@
 
 #include "Posmg.h"
 #include "PosmgManager.h"
+#include "PosmgParser.h"
 
 #include "storm/models/sparse/Smg.h"
 
@@ -26,6 +27,7 @@ void bindings_posmg(py::module &m) {
 
     m.def("posmg_from_pomdp", &synthesis::posmgFromPomdp<double>, py::arg("pomdp"), py::arg("state_player_indications"));
     m.def("posmg_from_smg", &synthesis::posmgFromSmg<double>, py::arg("smg"), py::arg("observability_classes"));
+    m.def("parse_posmg_drn", &synthesis::parsePosmgDrn, py::arg("path"), py::call_guard<py::gil_scoped_release>());
 
     py::class_<synthesis::PosmgManager<double>, std::shared_ptr<synthesis::PosmgManager<double>>>(m, "PosmgManager")
         .def(py::init<synthesis::Posmg<double> const&, uint64_t>(), py::arg("posmg"), py::arg("optimizing_player"))
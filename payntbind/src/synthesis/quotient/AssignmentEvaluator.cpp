@@ -0,0 +1,170 @@
+#include "AssignmentEvaluator.h"
+
+#include <storm/modelchecker/CheckTask.h>
+#include <storm/modelchecker/prctl/SparseDtmcPrctlModelChecker.h>
+#include <storm/modelchecker/results/ExplicitQuantitativeCheckResult.h>
+#include <storm/storage/SparseMatrix.h>
+#include <storm/storage/sparse/ModelComponents.h>
+#include <storm/models/sparse/StandardRewardModel.h>
+#include <storm/exceptions/InvalidArgumentException.h>
+#include <storm/exceptions/NotSupportedException.h>
+
+#include <atomic>
+#include <exception>
+#include <mutex>
+#include <queue>
+#include <thread>
+
+namespace synthesis {
+
+std::shared_ptr<storm::models::sparse::Dtmc<double>> restrictQuotientToDtmc(
+    storm::models::sparse::Mdp<double> const& quotient,
+    BitVector const& choices
+) {
+    auto const& matrix = quotient.getTransitionMatrix();
+    auto const& row_groups = matrix.getRowGroupIndices();
+    uint64_t num_states = quotient.getNumberOfStates();
+
+    // for each reachable state, identify its only selected choice
+    std::vector<uint64_t> state_to_choice(num_states,quotient.getNumberOfChoices());
+    BitVector state_reachable(num_states,false);
+    std::queue<uint64_t> state_queue;
+    for(auto state: quotient.getInitialStates()) {
+        state_reachable.set(state,true);
+        state_queue.push(state);
+    }
+    uint64_t num_entries = 0;
+    while(not state_queue.empty()) {
+        auto state = state_queue.front();
+        state_queue.pop();
+        for(uint64_t choice = row_groups[state]; choice < row_groups[state+1]; ++choice) {
+            if(not choices[choice]) {
+                continue;
+            }
+            STORM_LOG_THROW(state_to_choice[state] == quotient.getNumberOfChoices(), storm::exceptions::InvalidArgumentException,
+                "state " << state << " has multiple selected choices.");
+            state_to_choice[state] = choice;
+            num_entries += matrix.getRow(choice).getNumberOfEntries();
+            for(auto const& entry: matrix.getRow(choice)) {
+                if(not state_reachable[entry.getColumn()]) {
+                    state_reachable.set(entry.getColumn(),true);
+                    state_queue.push(entry.getColumn());
+                }
+            }
+        }
+        STORM_LOG_THROW(state_to_choice[state] < quotient.getNumberOfChoices(), storm::exceptions::InvalidArgumentException,
+            "reachable state " << state << " has no selected choice.");
+    }
+
+    std::vector<uint64_t> state_map;
+    std::vector<uint64_t> state_to_sub_state(num_states,num_states);
+    for(auto state: state_reachable) {
+        state_to_sub_state[state] = state_map.size();
+        state_map.push_back(state);
+    }
+    storm::storage::SparseMatrixBuilder<double> builder(state_map.size(), state_map.size(), num_entries);
+    for(uint64_t sub_state = 0; sub_state < state_map.size(); ++sub_state) {
+        for(auto const& entry: matrix.getRow(state_to_choice[state_map[sub_state]])) {
+            builder.addNextValue(sub_state, state_to_sub_state[entry.getColumn()], entry.getValue());
+        }
+    }
+
+    std::unordered_map<std::string,storm::models::sparse::StandardRewardModel<double>> reward_models;
+    for(auto const& [name,reward_model]: quotient.getRewardModels()) {
+        STORM_LOG_THROW(not reward_model.hasTransitionRewards(), storm::exceptions::NotSupportedException,
+            "transition rewards are not supported.");
+        std::optional<std::vector<double>> state_rewards;
+        std::optional<std::vector<double>> action_rewards;
+        if(reward_model.hasStateRewards()) {
+            state_rewards = std::vector<double>(state_map.size());
+            for(uint64_t sub_state = 0; sub_state < state_map.size(); ++sub_state) {
+                (*state_rewards)[sub_state] = reward_model.getStateReward(state_map[sub_state]);
+            }
+        }
+        if(reward_model.hasStateActionRewards()) {
+            action_rewards = std::vector<double>(state_map.size());
+            for(uint64_t sub_state = 0; sub_state < state_map.size(); ++sub_state) {
+                (*action_rewards)[sub_state] = reward_model.getStateActionReward(state_to_choice[state_map[sub_state]]);
+            }
+        }
+        reward_models.emplace(name, storm::models::sparse::StandardRewardModel<double>(std::move(state_rewards), std::move(action_rewards)));
+    }
+
+    storm::storage::sparse::ModelComponents<double> components(
+        builder.build(), quotient.getStateLabeling().getSubLabeling(state_reachable), std::move(reward_models)
+    );
+    return std::make_shared<storm::models::sparse::Dtmc<double>>(std::move(components));
+}
+
+std::pair<std::vector<double>,std::vector<uint64_t>> evaluateAssignments(
+    storm::models::sparse::Mdp<double> const& quotient,
+    Coloring const& coloring,
+    Family const& family,
+    std::vector<std::vector<uint64_t>> const& assignments,
+    storm::logic::Formula const& formula,
+    storm::Environment const& env,
+    uint64_t num_threads
+) {
+    uint64_t num_assignments = assignments.size();
+    std::vector<double> values(num_assignments);
+    std::vector<uint64_t> num_states(num_assignments);
+
+    // storm's model checkers are not guaranteed to be re-entrant w.r.t. a shared environment or formula, each thread
+    // therefore works with its own copies
+    auto evaluate = [&](uint64_t index, storm::logic::Formula const& formula, storm::Environment const& env) {
+        Family assignment(family);
+        for(uint64_t hole = 0; hole < family.numHoles(); ++hole) {
+            assignment.holeSetOption(hole, assignments[index][hole]);
+        }
+        auto dtmc = restrictQuotientToDtmc(quotient, coloring.selectCompatibleChoices(assignment));
+        storm::modelchecker::CheckTask<storm::logic::Formula, double> task(formula, true);
+        storm::modelchecker::SparseDtmcPrctlModelChecker<storm::models::sparse::Dtmc<double>> modelchecker(*dtmc);
+        auto result = modelchecker.check(env, task);
+        auto initial_state = *dtmc->getInitialStates().begin();
+        values[index] = result->asExplicitQuantitativeCheckResult<double>()[initial_state];
+        num_states[index] = dtmc->getNumberOfStates();
+    };
+
+    if(num_threads <= 1) {
+        for(uint64_t index = 0; index < num_assignments; ++index) {
+            evaluate(index, formula, env);
+        }
+        return std::make_pair(values,num_states);
+    }
+
+    // threads pick assignments one by one until all are evaluated
+    std::atomic<uint64_t> next_index(0);
+    std::exception_ptr error = nullptr;
+    std::mutex error_mutex;
+    auto worker = [&](std::shared_ptr<storm::logic::Formula const> thread_formula, storm::Environment thread_env) {
+        while(true) {
+            uint64_t index = next_index++;
+            if(index >= num_assignments) {
+                return;
+            }
+            try {
+                evaluate(index, *thread_formula, thread_env);
+            } catch(...) {
+                std::lock_guard<std::mutex> lock(error_mutex);
+                if(error == nullptr) {
+                    error = std::current_exception();
+                }
+                return;
+            }
+        }
+    };
+    std::vector<std::thread> threads;
+    for(uint64_t thread = 0; thread < std::min(num_threads,num_assignments); ++thread) {
+        // copies are made in the calling thread before the worker starts
+        threads.emplace_back(worker, formula.clone(), env);
+    }
+    for(auto & thread: threads) {
+        thread.join();
+    }
+    if(error != nullptr) {
+        std::rethrow_exception(error);
+    }
+    return std::make_pair(values,num_states);
+}
+
+}
@@ -0,0 +1,45 @@
+#pragma once
+
+#include "src/synthesis/quotient/Family.h"
+#include "src/synthesis/quotient/Coloring.h"
+
+#include <storm/environment/Environment.h>
+#include <storm/logic/Formula.h>
+#include <storm/models/sparse/Mdp.h>
+#include <storm/models/sparse/Dtmc.h>
+#include <storm/storage/BitVector.h>
+
+#include <cstdint>
+#include <vector>
+#include <memory>
+
+namespace synthesis {
+
+/**
+ * Restrict the quotient MDP to the given choices and to the states reachable via these choices. Each reachable
+ * state must have exactly one selected choice, the result is a DTMC.
+ */
+std::shared_ptr<storm::models::sparse::Dtmc<double>> restrictQuotientToDtmc(
+    storm::models::sparse::Mdp<double> const& quotient,
+    BitVector const& choices
+);
+
+/**
+ * Evaluate a property on the DTMCs induced by the given hole assignments. DTMCs are built directly from the quotient
+ * and are model checked using the given environment, optionally by multiple threads. Each thread model checks using its
+ * own copy of the environment and of the formula.
+ * @param assignments for each assignment, an option of each hole
+ * @param num_threads number of worker threads; if 1, assignments are evaluated in the calling thread
+ * @return for each assignment, the value in the initial state and the number of states of the DTMC
+ */
+std::pair<std::vector<double>,std::vector<uint64_t>> evaluateAssignments(
+    storm::models::sparse::Mdp<double> const& quotient,
+    Coloring const& coloring,
+    Family const& family,
+    std::vector<std::vector<uint64_t>> const& assignments,
+    storm::logic::Formula const& formula,
+    storm::Environment const& env,
+    uint64_t num_threads
+);
+
+}
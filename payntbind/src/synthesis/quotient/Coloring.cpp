@@ -21,10 +21,15 @@ Coloring::Coloring(
 
     auto num_holes = family.numHoles();
     choice_to_holes.resize(num_choices);
+    hole_option_to_choices.resize(num_holes);
+    for(uint64_t hole = 0; hole<num_holes; ++hole) {
+        hole_option_to_choices[hole].resize(family.holeNumOptionsTotal(hole));
+    }
     for(uint64_t choice = 0; choice<num_choices; ++choice) {
         choice_to_holes[choice] = BitVector(num_holes,false);
         for(auto const& [hole,option]: choice_to_assignment[choice]) {
             choice_to_holes[choice].set(hole,true);
+            hole_option_to_choices[hole][option].push_back(choice);
         }
     }
 
@@ -51,13 +56,39 @@ std::vector<BitVector> const& Coloring::getStateToHoles() const {
     return state_to_holes;
 }
 
-BitVector Coloring::selectCompatibleChoices(Family const& subfamily) const {
-    auto selection = BitVector(uncolored_choices);
-    for(auto choice: colored_choices) {
-        if(subfamily.includesAssignment(choice_to_assignment[choice])) {
-            selection.set(choice,true);
+void Coloring::removeIncompatibleChoices(Family const& subfamily, BitVector & selection) const {
+    for(uint64_t hole = 0; hole < family.numHoles(); ++hole) {
+        removeIncompatibleChoices(subfamily,hole,selection);
+    }
+}
+
+void Coloring::removeIncompatibleChoices(Family const& subfamily, uint64_t hole, BitVector & selection) const {
+    auto const& options_mask = subfamily.holeOptionsMask(hole);
+    if(subfamily.holeNumOptions(hole) == options_mask.size()) {
+        return;
+    }
+    for(auto option: ~options_mask) {
+        for(auto choice: hole_option_to_choices[hole][option]) {
+            selection.set(choice,false);
         }
     }
+}
+
+BitVector Coloring::selectCompatibleChoices(Family const& subfamily) const {
+    auto selection = BitVector(numChoices(),true);
+    removeIncompatibleChoices(subfamily,selection);
+    return selection;
+}
+
+BitVector Coloring::selectCompatibleChoices(Family const& subfamily, BitVector const& base_choices) const {
+    auto selection = BitVector(base_choices);
+    removeIncompatibleChoices(subfamily,selection);
+    return selection;
+}
+
+BitVector Coloring::selectCompatibleChoices(Family const& subfamily, BitVector const& base_choices, uint64_t hole) const {
+    auto selection = BitVector(base_choices);
+    removeIncompatibleChoices(subfamily,hole,selection);
     return selection;
 }
 
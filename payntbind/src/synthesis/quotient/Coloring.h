@@ -28,6 +28,13 @@ public:
     
     /** Get a mask of choices compatible with the family. */
     BitVector selectCompatibleChoices(Family const& subfamily) const;
+    /** Get a mask of choices compatible with the family, considering only the base choices. */
+    BitVector selectCompatibleChoices(Family const& subfamily, BitVector const& base_choices) const;
+    /**
+     * Get a mask of choices compatible with the family, considering only the base choices that are compatible with
+     * all holes except for the given one (e.g. choices of the parent family that was split wrt this hole).
+     */
+    BitVector selectCompatibleChoices(Family const& subfamily, BitVector const& base_choices, uint64_t hole) const;
     /** For each hole, collect options (colors) involved in any of the given choices. */
     std::vector<std::vector<uint64_t>> collectHoleOptions(BitVector const& choices) const;
     
@@ -50,6 +57,13 @@ protected:
     BitVector uncolored_choices;
     /** Choices labeled by some hole. */
     BitVector colored_choices;
+    /** For each hole and each of its options, a list of choices labeled by this hole-option pair. */
+    std::vector<std::vector<std::vector<uint64_t>>> hole_option_to_choices;
+
+    /** Remove from the selection choices labeled by options excluded from the family. */
+    void removeIncompatibleChoices(Family const& subfamily, BitVector & selection) const;
+    /** Remove from the selection choices labeled by options of the given hole excluded from the family. */
+    void removeIncompatibleChoices(Family const& subfamily, uint64_t hole, BitVector & selection) const;
 
     /** For each hole, collect options (colors) involved in any of the given choices. */
     std::vector<BitVector> collectHoleOptionsMask(BitVector const& choices) const;
@@ -0,0 +1,121 @@
+#include "ExpectedVisits.h"
+
+#include <storm/modelchecker/helper/infinitehorizon/SparseDeterministicVisitingTimesHelper.h>
+#include <storm/storage/SparseMatrix.h>
+#include <storm/utility/constants.h>
+#include <storm/exceptions/InvalidArgumentException.h>
+
+#include <queue>
+
+namespace synthesis {
+
+std::vector<double> computeExpectedVisits(
+    storm::models::sparse::Model<double> const& model,
+    storm::storage::BitVector const& choices,
+    storm::Environment const& env,
+    uint64_t max_iterations
+) {
+    auto const& matrix = model.getTransitionMatrix();
+    auto const& row_groups = matrix.getRowGroupIndices();
+    uint64_t num_states = model.getNumberOfStates();
+
+    // for each reachable state, identify its selected choice
+    std::vector<uint64_t> state_to_choice(num_states,model.getNumberOfChoices());
+    storm::storage::BitVector state_reachable(num_states,false);
+    std::queue<uint64_t> state_queue;
+    for(auto state: model.getInitialStates()) {
+        state_reachable.set(state,true);
+        state_queue.push(state);
+    }
+    uint64_t num_entries = 0;
+    while(not state_queue.empty()) {
+        auto state = state_queue.front();
+        state_queue.pop();
+        auto choice = choices.getNextSetIndex(row_groups[state]);
+        STORM_LOG_THROW(choice < row_groups[state+1], storm::exceptions::InvalidArgumentException,
+            "reachable state " << state << " has no selected choice.");
+        state_to_choice[state] = choice;
+        num_entries += matrix.getRow(choice).getNumberOfEntries();
+        for(auto const& entry: matrix.getRow(choice)) {
+            if(not state_reachable[entry.getColumn()]) {
+                state_reachable.set(entry.getColumn(),true);
+                state_queue.push(entry.getColumn());
+            }
+        }
+    }
+
+    std::vector<uint64_t> state_map;
+    std::vector<uint64_t> state_to_sub_state(num_states,num_states);
+    for(auto state: state_reachable) {
+        state_to_sub_state[state] = state_map.size();
+        state_map.push_back(state);
+    }
+    uint64_t num_sub_states = state_map.size();
+    storm::storage::SparseMatrixBuilder<double> builder(num_sub_states, num_sub_states, num_entries);
+    for(uint64_t sub_state = 0; sub_state < num_sub_states; ++sub_state) {
+        for(auto const& entry: matrix.getRow(state_to_choice[state_map[sub_state]])) {
+            builder.addNextValue(sub_state, state_to_sub_state[entry.getColumn()], entry.getValue());
+        }
+    }
+    auto sub_matrix = builder.build();
+    storm::storage::BitVector sub_initial_states(num_sub_states,false);
+    for(auto state: model.getInitialStates()) {
+        sub_initial_states.set(state_to_sub_state[state],true);
+    }
+
+    std::vector<double> sub_visits;
+    if(max_iterations == 0) {
+        storm::modelchecker::helper::SparseDeterministicVisitingTimesHelper<double> helper(sub_matrix);
+        sub_visits = helper.computeExpectedVisitingTimes(env, sub_initial_states);
+    } else {
+        // truncated power iteration: accumulate the state distributions of the first steps
+        std::vector<double> distribution(num_sub_states,0);
+        for(auto sub_state: sub_initial_states) {
+            distribution[sub_state] = 1.0 / sub_initial_states.getNumberOfSetBits();
+        }
+        sub_visits = distribution;
+        std::vector<double> next_distribution(num_sub_states);
+        storm::storage::BitVector sub_state_absorbing(num_sub_states,false);
+        for(uint64_t sub_state = 0; sub_state < num_sub_states; ++sub_state) {
+            auto row = sub_matrix.getRow(sub_state);
+            if(row.getNumberOfEntries() == 1 and row.begin()->getColumn() == sub_state) {
+                sub_state_absorbing.set(sub_state,true);
+            }
+        }
+        for(uint64_t iteration = 0; iteration < max_iterations; ++iteration) {
+            std::fill(next_distribution.begin(), next_distribution.end(), 0);
+            double transient_mass = 0;
+            for(uint64_t sub_state = 0; sub_state < num_sub_states; ++sub_state) {
+                if(distribution[sub_state] == 0 or sub_state_absorbing[sub_state]) {
+                    continue;
+                }
+                for(auto const& entry: sub_matrix.getRow(sub_state)) {
+                    next_distribution[entry.getColumn()] += entry.getValue() * distribution[sub_state];
+                }
+            }
+            for(uint64_t sub_state = 0; sub_state < num_sub_states; ++sub_state) {
+                sub_visits[sub_state] += next_distribution[sub_state];
+                if(not sub_state_absorbing[sub_state]) {
+                    transient_mass += next_distribution[sub_state];
+                }
+            }
+            std::swap(distribution,next_distribution);
+            if(transient_mass == 0) {
+                break;
+            }
+        }
+        for(auto sub_state: sub_state_absorbing) {
+            if(sub_visits[sub_state] > 0) {
+                sub_visits[sub_state] = storm::utility::infinity<double>();
+            }
+        }
+    }
+
+    std::vector<double> visits(num_states,0);
+    for(uint64_t sub_state = 0; sub_state < num_sub_states; ++sub_state) {
+        visits[state_map[sub_state]] = sub_visits[sub_state];
+    }
+    return visits;
+}
+
+}
@@ -0,0 +1,28 @@
+#pragma once
+
+#include <storm/environment/Environment.h>
+#include <storm/models/sparse/Model.h>
+#include <storm/storage/BitVector.h>
+
+#include <cstdint>
+#include <vector>
+
+namespace synthesis {
+
+/**
+ * Compute the expected number of visits of states in the DTMC induced by the selected choices of the model. The DTMC
+ * is represented only by its transition matrix over the states reachable via the selected choices; each such state
+ * must have exactly one selected choice.
+ * @param max_iterations if 0, expected visits are computed exactly (infinite for states in bottom SCCs); otherwise,
+ *  they are approximated by a truncated power iteration of at most this many steps, where only absorbing states are
+ *  assigned infinite visits
+ * @return for each state of the model, its expected number of visits; unreachable states have 0 visits
+ */
+std::vector<double> computeExpectedVisits(
+    storm::models::sparse::Model<double> const& model,
+    storm::storage::BitVector const& choices,
+    storm::Environment const& env,
+    uint64_t max_iterations
+);
+
+}
@@ -1,6 +1,9 @@
 #include "Coloring.h"
 
+#include <storm/exceptions/InvalidArgumentException.h>
+
 #include <iostream>
+#include <algorithm>
 
 
 namespace synthesis {
@@ -14,6 +17,21 @@ Family::Family(Family const& other) {
     }
 }
 
+Family::Family(Family const& reference, uint64_t const* words, uint64_t num_words) {
+    hole_options = std::vector<std::vector<uint64_t>>(reference.numHoles());
+    hole_options_mask = std::vector<BitVector>(reference.numHoles());
+    uint64_t word = 0;
+    for(uint64_t hole = 0; hole < numHoles(); ++hole) {
+        uint64_t num_options = reference.holeNumOptionsTotal(hole);
+        STORM_LOG_THROW(word+numPackedWords(num_options) <= num_words, storm::exceptions::InvalidArgumentException,
+            "packed family does not match the reference family.");
+        holeSetOptions(hole, unpackBitVector(num_options, words+word));
+        word += numPackedWords(num_options);
+    }
+    STORM_LOG_THROW(word == num_words, storm::exceptions::InvalidArgumentException,
+        "packed family does not match the reference family.");
+}
+
 uint64_t Family::numHoles() const {
     return hole_options.size();
 }
@@ -136,6 +154,33 @@ std::vector<BitVector>::const_iterator Family::end() const {
 }
 
 
+std::vector<uint64_t> Family::packOptions() const {
+    std::vector<uint64_t> words;
+    for(auto const& options: hole_options_mask) {
+        packBitVector(options, words);
+    }
+    return words;
+}
+
+uint64_t Family::numPackedWords(uint64_t num_bits) {
+    return (num_bits+63) / 64;
+}
+
+void Family::packBitVector(BitVector const& bv, std::vector<uint64_t> & words) {
+    for(uint64_t bit = 0; bit < bv.size(); bit += 64) {
+        words.push_back(bv.getAsInt(bit, std::min<uint64_t>(64, bv.size()-bit)));
+    }
+}
+
+BitVector Family::unpackBitVector(uint64_t num_bits, uint64_t const* words) {
+    BitVector bv(num_bits,false);
+    for(uint64_t bit = 0; bit < num_bits; bit += 64) {
+        bv.setFromInt(bit, std::min<uint64_t>(64, num_bits-bit), words[bit/64]);
+    }
+    return bv;
+}
+
+
 void Family::setChoices(BitVector const& choices) {
     this->choices = BitVector(choices);
 }
@@ -16,6 +16,8 @@ public:
     
     Family() {};
     Family(Family const& other);
+    /** Construct a family with holes of the reference family and options unpacked from words produced by packOptions(). */
+    Family(Family const& reference, uint64_t const* words, uint64_t num_words);
 
     uint64_t numHoles() const;
     uint64_t addHole(uint64_t num_options);
@@ -43,11 +45,21 @@ public:
     std::vector<BitVector>::const_iterator begin() const;
     std::vector<BitVector>::const_iterator end() const;
 
+    /** Pack option masks of all holes into a sequence of 64-bit words. */
+    std::vector<uint64_t> packOptions() const;
+
     // choice operations
     void setChoices(BitVector const& choices);
     void setChoices(BitVector&& choices);
     BitVector const& getChoices() const;
 
+    /** Number of 64-bit words needed to pack a bit vector of the given size. */
+    static uint64_t numPackedWords(uint64_t num_bits);
+    /** Append the contents of the bit vector to the sequence of 64-bit words. */
+    static void packBitVector(BitVector const& bv, std::vector<uint64_t> & words);
+    /** Reconstruct a bit vector of the given size from packed 64-bit words. */
+    static BitVector unpackBitVector(uint64_t num_bits, uint64_t const* words);
+
 protected:
 
     /** For each hole, a list of available options. */
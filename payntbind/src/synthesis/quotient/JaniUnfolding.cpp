@@ -0,0 +1,221 @@
+#include "JaniUnfolding.h"
+
+#include <storm/storage/jani/Automaton.h>
+#include <storm/storage/jani/Edge.h>
+#include <storm/storage/jani/TemplateEdge.h>
+#include <storm/storage/jani/EdgeDestination.h>
+#include <storm/storage/jani/TemplateEdgeDestination.h>
+#include <storm/storage/jani/OrderedAssignments.h>
+#include <storm/storage/jani/ModelType.h>
+
+#include <algorithm>
+#include <limits>
+#include <memory>
+#include <set>
+
+namespace synthesis {
+
+const uint64_t CombinationColoring::NO_OPTION = std::numeric_limits<uint64_t>::max();
+
+CombinationColoring::CombinationColoring(uint64_t num_holes) : num_holes(num_holes) {
+    // reserved color 0
+    table.resize(num_holes, NO_OPTION);
+}
+
+uint64_t CombinationColoring::numHoles() const {
+    return num_holes;
+}
+
+uint64_t CombinationColoring::numColors() const {
+    return num_holes == 0 ? 1 : table.size() / num_holes;
+}
+
+uint64_t CombinationColoring::getOrMakeColor(std::vector<uint64_t> const& combination) {
+    std::string key(reinterpret_cast<char const*>(combination.data()), combination.size()*sizeof(uint64_t));
+    auto [entry,inserted] = combination_to_color.try_emplace(std::move(key), numColors());
+    if(inserted) {
+        table.insert(table.end(), combination.begin(), combination.end());
+    }
+    return entry->second;
+}
+
+std::vector<std::pair<uint64_t,uint64_t>> CombinationColoring::colorToHoleOptions(uint64_t color) const {
+    std::vector<std::pair<uint64_t,uint64_t>> hole_options;
+    for(uint64_t hole = 0; hole < num_holes; ++hole) {
+        uint64_t option = table[color*num_holes+hole];
+        if(option != NO_OPTION) {
+            hole_options.emplace_back(hole,option);
+        }
+    }
+    return hole_options;
+}
+
+
+namespace {
+
+using Substitution = std::map<storm::expressions::Variable,storm::expressions::Expression>;
+
+/** Collect holes that appear in the guard, the probabilities or the assignments of the edge. */
+std::vector<uint64_t> edgeHoles(
+    storm::jani::Edge const& edge, std::map<storm::expressions::Variable,uint64_t> const& variable_to_hole
+) {
+    std::set<storm::expressions::Variable> variables = edge.getGuard().getVariables();
+    auto collect = [&variables](storm::expressions::Expression const& expression) {
+        auto expression_variables = expression.getVariables();
+        variables.insert(expression_variables.begin(), expression_variables.end());
+    };
+    for(auto const& assignment: edge.getTemplateEdge()->getAssignments()) {
+        collect(assignment.getAssignedExpression());
+    }
+    for(auto const& destination: edge.getDestinations()) {
+        collect(destination.getProbability());
+    }
+    for(auto const& destination: edge.getTemplateEdge()->getDestinations()) {
+        for(auto const& assignment: destination.getOrderedAssignments()) {
+            collect(assignment.getAssignedExpression());
+        }
+    }
+    std::vector<uint64_t> holes;
+    for(auto const& variable: variables) {
+        auto hole = variable_to_hole.find(variable);
+        if(hole != variable_to_hole.end()) {
+            holes.push_back(hole->second);
+        }
+    }
+    std::sort(holes.begin(), holes.end());
+    return holes;
+}
+
+/** Copy the edge, substituting the holes if the substitution is given. */
+storm::jani::Edge constructEdge(storm::jani::Edge const& edge, Substitution const* substitution = nullptr) {
+    auto const& template_edge = *edge.getTemplateEdge();
+    storm::expressions::Expression guard = template_edge.getGuard();
+    storm::jani::OrderedAssignments assignments = template_edge.getAssignments().clone();
+    if(substitution != nullptr) {
+        guard = guard.substitute(*substitution);
+        assignments.substitute(*substitution, true);
+    }
+    auto new_template_edge = std::make_shared<storm::jani::TemplateEdge>(guard);
+    for(auto const& assignment: assignments) {
+        new_template_edge->addTransientAssignment(assignment);
+    }
+    for(auto const& destination: template_edge.getDestinations()) {
+        storm::jani::OrderedAssignments destination_assignments = destination.getOrderedAssignments().clone();
+        if(substitution != nullptr) {
+            destination_assignments.substitute(*substitution, true);
+        }
+        new_template_edge->addDestination(storm::jani::TemplateEdgeDestination(destination_assignments));
+    }
+
+    std::vector<std::pair<uint64_t,storm::expressions::Expression>> destinations;
+    for(auto const& destination: edge.getDestinations()) {
+        storm::expressions::Expression probability = destination.getProbability();
+        if(substitution != nullptr) {
+            probability = probability.substitute(*substitution);
+        }
+        destinations.emplace_back(destination.getLocationIndex(), probability);
+    }
+    return storm::jani::Edge(
+        edge.getSourceLocationIndex(), edge.getActionIndex(), edge.getOptionalRate(), new_template_edge, destinations
+    );
+}
+
+}
+
+std::pair<storm::jani::Model,std::map<uint64_t,std::vector<std::pair<uint64_t,uint64_t>>>> unfoldJaniHoles(
+    storm::jani::Model const& jani,
+    std::vector<storm::expressions::Variable> const& hole_variables,
+    std::vector<std::vector<storm::expressions::Expression>> const& hole_expressions
+) {
+    uint64_t num_holes = hole_variables.size();
+    std::map<storm::expressions::Variable,uint64_t> variable_to_hole;
+    for(uint64_t hole = 0; hole < num_holes; ++hole) {
+        variable_to_hole[hole_variables[hole]] = hole;
+    }
+
+    CombinationColoring combination_coloring(num_holes);
+    storm::jani::Model unfolded(jani);
+    for(uint64_t automaton_index = 0; automaton_index < jani.getNumberOfAutomata(); ++automaton_index) {
+        auto const& automaton = jani.getAutomaton(automaton_index);
+        std::vector<std::vector<uint64_t>> edge_to_holes;
+        bool automaton_has_holes = false;
+        for(auto const& edge: automaton.getEdges()) {
+            edge_to_holes.push_back(edgeHoles(edge, variable_to_hole));
+            automaton_has_holes |= not edge_to_holes.back().empty();
+        }
+        if(not automaton_has_holes) {
+            continue;
+        }
+
+        storm::jani::Automaton new_automaton(automaton.getName(), automaton.getLocationExpressionVariable());
+        for(auto const& location: automaton.getLocations()) {
+            new_automaton.addLocation(location);
+        }
+        for(auto location: automaton.getInitialLocationIndices()) {
+            new_automaton.addInitialLocation(location);
+        }
+        for(auto const& variable: automaton.getVariables()) {
+            new_automaton.addVariable(variable);
+        }
+        for(uint64_t edge_index = 0; edge_index < automaton.getNumberOfEdges(); ++edge_index) {
+            auto const& edge = automaton.getEdge(edge_index);
+            auto const& holes = edge_to_holes[edge_index];
+            if(holes.empty()) {
+                new_automaton.addEdge(constructEdge(edge));
+                continue;
+            }
+            // enumerate all combinations of options of the holes of this edge
+            std::vector<uint64_t> combination(num_holes, CombinationColoring::NO_OPTION);
+            for(auto hole: holes) {
+                combination[hole] = 0;
+            }
+            while(true) {
+                Substitution substitution;
+                for(auto hole: holes) {
+                    substitution[hole_variables[hole]] = hole_expressions[hole][combination[hole]];
+                }
+                storm::jani::Edge new_edge = constructEdge(edge, &substitution);
+                new_edge.setColor(combination_coloring.getOrMakeColor(combination));
+                new_automaton.addEdge(new_edge);
+
+                // next combination, the last hole changes the fastest
+                uint64_t position = holes.size();
+                while(position > 0) {
+                    uint64_t hole = holes[position-1];
+                    if(++combination[hole] < hole_expressions[hole].size()) {
+                        break;
+                    }
+                    combination[hole] = 0;
+                    --position;
+                }
+                if(position == 0) {
+                    break;
+                }
+            }
+        }
+        unfolded.replaceAutomaton(automaton_index, new_automaton);
+    }
+    for(auto const& variable: hole_variables) {
+        unfolded.removeConstant(variable.getName());
+    }
+    unfolded.setModelType(storm::jani::ModelType::MDP);
+    unfolded.finalize();
+    unfolded.checkValid();
+
+    // collect hole options of each edge
+    std::map<uint64_t,std::vector<std::pair<uint64_t,uint64_t>>> edge_to_hole_options;
+    for(uint64_t automaton_index = 0; automaton_index < unfolded.getNumberOfAutomata(); ++automaton_index) {
+        auto const& automaton = unfolded.getAutomaton(automaton_index);
+        for(uint64_t edge_index = 0; edge_index < automaton.getNumberOfEdges(); ++edge_index) {
+            uint64_t color = automaton.getEdge(edge_index).getColor();
+            if(color == 0) {
+                continue;
+            }
+            uint64_t global_index = unfolded.encodeAutomatonAndEdgeIndices(automaton_index, edge_index);
+            edge_to_hole_options[global_index] = combination_coloring.colorToHoleOptions(color);
+        }
+    }
+    return std::make_pair(std::move(unfolded),std::move(edge_to_hole_options));
+}
+
+}
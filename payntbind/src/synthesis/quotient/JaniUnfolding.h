@@ -0,0 +1,60 @@
+#pragma once
+
+#include <storm/storage/jani/Model.h>
+#include <storm/storage/expressions/Expression.h>
+#include <storm/storage/expressions/Variable.h>
+
+#include <cstdint>
+#include <map>
+#include <string>
+#include <unordered_map>
+#include <utility>
+#include <vector>
+
+namespace synthesis {
+
+/**
+ * Colors associated with different hole combinations. A combination assigns an option to some of the holes; the
+ * combinations are stored in a flat table with one row of numHoles() entries per color, where NO_OPTION marks holes
+ * not involved in the combination. Color 0 is reserved for hole-free edges.
+ */
+class CombinationColoring {
+public:
+
+    static const uint64_t NO_OPTION;
+
+    CombinationColoring(uint64_t num_holes);
+
+    uint64_t numHoles() const;
+    /** Number of colors, including the reserved color 0. */
+    uint64_t numColors() const;
+
+    /** Get the color of the combination, a new color is created if the combination has not been seen before. */
+    uint64_t getOrMakeColor(std::vector<uint64_t> const& combination);
+
+    /** Get the (hole,option) pairs of the combination associated with the color. */
+    std::vector<std::pair<uint64_t,uint64_t>> colorToHoleOptions(uint64_t color) const;
+
+private:
+    uint64_t num_holes;
+    std::vector<uint64_t> table;
+    /** For each combination (encoded as raw bytes of its row), its color. */
+    std::unordered_map<std::string,uint64_t> combination_to_color;
+};
+
+/**
+ * Unfold hole options in the Jani program: each edge that depends on some holes is replaced by a copy for each
+ * combination of options of these holes, where the holes are substituted by the corresponding expressions. The holes
+ * are then removed from the constants of the program.
+ * @param hole_variables for each hole, the constant it corresponds to
+ * @param hole_expressions for each hole, expressions of its options
+ * @return (1) the unfolded program
+ * @return (2) for each global index of an unfolded edge, hole options associated with this edge
+ */
+std::pair<storm::jani::Model,std::map<uint64_t,std::vector<std::pair<uint64_t,uint64_t>>>> unfoldJaniHoles(
+    storm::jani::Model const& jani,
+    std::vector<storm::expressions::Variable> const& hole_variables,
+    std::vector<std::vector<storm::expressions::Expression>> const& hole_expressions
+);
+
+}
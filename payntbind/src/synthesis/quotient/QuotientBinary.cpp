@@ -0,0 +1,419 @@
+#include "QuotientBinary.h"
+
+#include "Family.h"
+#include "QuotientSerialization.h"
+#include "src/synthesis/posmg/Posmg.h"
+
+#include <storm/storage/SparseMatrix.h>
+#include <storm/storage/sparse/ModelComponents.h>
+#include <storm/models/sparse/Pomdp.h>
+#include <storm/models/sparse/Smg.h>
+#include <storm/models/sparse/StateLabeling.h>
+#include <storm/models/sparse/ChoiceLabeling.h>
+#include <storm/models/sparse/StandardRewardModel.h>
+#include <storm/utility/builder.h>
+#include <storm/utility/macros.h>
+#include <storm/exceptions/FileIoException.h>
+#include <storm/exceptions/WrongFormatException.h>
+#include <storm/exceptions/NotSupportedException.h>
+
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <fcntl.h>
+#include <unistd.h>
+
+#include <cstring>
+#include <fstream>
+
+namespace synthesis {
+
+namespace {
+
+char const MAGIC[8] = {'P','A','Y','N','T','Q','B','\0'};
+uint64_t const FORMAT_VERSION = 1;
+
+enum BinaryModelType : uint64_t { DTMC = 0, MDP = 1, POMDP = 2, POSMG = 3 };
+
+/** Sequential writer of 8-byte aligned sections. */
+class BinaryWriter {
+public:
+    BinaryWriter(std::string const& path) : file(path, std::ios::binary | std::ios::trunc) {
+        STORM_LOG_THROW(file, storm::exceptions::FileIoException, "cannot open " << path << " for writing.");
+    }
+
+    template<typename T>
+    void write(T const* data, uint64_t count) {
+        uint64_t size = count*sizeof(T);
+        file.write(reinterpret_cast<char const*>(data), size);
+        pad(size);
+    }
+
+    void write(uint64_t value) {
+        write(&value,1);
+    }
+
+    void write(std::string const& string) {
+        write(string.size());
+        write(string.data(), string.size());
+    }
+
+    void write(storm::storage::BitVector const& bv) {
+        std::vector<uint64_t> words;
+        Family::packBitVector(bv, words);
+        write(words.data(), words.size());
+    }
+
+    void close() {
+        file.close();
+        STORM_LOG_THROW(file, storm::exceptions::FileIoException, "failed to write the model.");
+    }
+
+private:
+    void pad(uint64_t size) {
+        static char const zeros[8] = {};
+        file.write(zeros, (8-size%8)%8);
+    }
+
+    std::ofstream file;
+};
+
+/** Read-only memory mapping of a file. */
+class MappedFile {
+public:
+    MappedFile(std::string const& path) {
+        fd = open(path.c_str(), O_RDONLY);
+        STORM_LOG_THROW(fd >= 0, storm::exceptions::FileIoException, "cannot open " << path << ".");
+        struct stat file_stat;
+        if(fstat(fd, &file_stat) != 0) {
+            close(fd);
+            STORM_LOG_THROW(false, storm::exceptions::FileIoException, "cannot stat " << path << ".");
+        }
+        size = file_stat.st_size;
+        if(size > 0) {
+            data = static_cast<char const*>(mmap(nullptr, size, PROT_READ, MAP_PRIVATE, fd, 0));
+            if(data == MAP_FAILED) {
+                close(fd);
+                STORM_LOG_THROW(false, storm::exceptions::FileIoException, "cannot map " << path << ".");
+            }
+            // the sections are read front to back
+            madvise(const_cast<char*>(data), size, MADV_SEQUENTIAL);
+        }
+    }
+
+    ~MappedFile() {
+        if(size > 0) {
+            munmap(const_cast<char*>(data), size);
+        }
+        close(fd);
+    }
+
+    MappedFile(MappedFile const&) = delete;
+    MappedFile& operator=(MappedFile const&) = delete;
+
+    int fd;
+    char const* data = nullptr;
+    uint64_t size = 0;
+};
+
+/** Sequential reader of 8-byte aligned sections of a memory-mapped file. */
+class BinaryReader {
+public:
+    BinaryReader(MappedFile const& file) : data(file.data), size(file.size) {}
+
+    template<typename T>
+    T const* read(uint64_t count) {
+        // compare counts rather than byte sizes to rule out overflows caused by corrupted headers
+        STORM_LOG_THROW(count <= (size-offset)/sizeof(T), storm::exceptions::WrongFormatException, "unexpected end of file.");
+        uint64_t bytes = count*sizeof(T);
+        uint64_t padded = (bytes+7)/8*8;
+        STORM_LOG_THROW(padded <= size-offset, storm::exceptions::WrongFormatException, "unexpected end of file.");
+        T const* section = reinterpret_cast<T const*>(data+offset);
+        offset += padded;
+        return section;
+    }
+
+    uint64_t readValue() {
+        return *read<uint64_t>(1);
+    }
+
+    std::string readString() {
+        uint64_t length = readValue();
+        return std::string(read<char>(length), length);
+    }
+
+    storm::storage::BitVector readBitVector(uint64_t num_bits) {
+        return Family::unpackBitVector(num_bits, read<uint64_t>(Family::numPackedWords(num_bits)));
+    }
+
+private:
+    char const* data;
+    uint64_t size;
+    uint64_t offset = 0;
+};
+
+BinaryModelType binaryModelType(storm::models::sparse::Model<double> const& model) {
+    switch(model.getType()) {
+        case storm::models::ModelType::Dtmc: return DTMC;
+        case storm::models::ModelType::Mdp: return MDP;
+        case storm::models::ModelType::Pomdp: return POMDP;
+        case storm::models::ModelType::Smg:
+            STORM_LOG_THROW(dynamic_cast<Posmg<double> const*>(&model) != nullptr, storm::exceptions::NotSupportedException,
+                "only partially observable SMGs are supported.");
+            return POSMG;
+        default:
+            break;
+    }
+    STORM_LOG_THROW(false, storm::exceptions::NotSupportedException, "unsupported model type " << model.getType() << ".");
+}
+
+}
+
+bool isQuotientBinary(std::string const& path) {
+    std::ifstream file(path, std::ios::binary);
+    char magic[sizeof(MAGIC)];
+    if(not file.read(magic, sizeof(MAGIC))) {
+        return false;
+    }
+    return std::memcmp(magic, MAGIC, sizeof(MAGIC)) == 0;
+}
+
+void exportQuotientBinary(storm::models::sparse::Model<double> const& model, std::string const& path) {
+    BinaryModelType model_type = binaryModelType(model);
+    auto const& matrix = model.getTransitionMatrix();
+    uint64_t num_states = matrix.getRowGroupCount();
+    uint64_t num_choices = matrix.getRowCount();
+    uint64_t num_entries = matrix.getEntryCount();
+
+    BinaryWriter writer(path);
+    writer.write(MAGIC, sizeof(MAGIC));
+    for(uint64_t value: {FORMAT_VERSION, (uint64_t)model_type, num_states, num_choices, num_entries}) {
+        writer.write(value);
+    }
+
+    // transition matrix
+    std::vector<uint64_t> row_groups(matrix.getRowGroupIndices().begin(), matrix.getRowGroupIndices().end());
+    writer.write(row_groups.data(), row_groups.size());
+    std::vector<uint64_t> row_starts;
+    row_starts.reserve(num_choices+1);
+    uint64_t entry_index = 0;
+    for(uint64_t choice = 0; choice < num_choices; ++choice) {
+        row_starts.push_back(entry_index);
+        entry_index += matrix.getRow(choice).getNumberOfEntries();
+    }
+    row_starts.push_back(entry_index);
+    writer.write(row_starts.data(), row_starts.size());
+    std::vector<uint64_t> columns;
+    columns.reserve(num_entries);
+    for(auto const& entry: matrix) {
+        columns.push_back(entry.getColumn());
+    }
+    writer.write(columns.data(), columns.size());
+    columns = std::vector<uint64_t>();
+    std::vector<double> values;
+    values.reserve(num_entries);
+    for(auto const& entry: matrix) {
+        values.push_back(entry.getValue());
+    }
+    writer.write(values.data(), values.size());
+    values = std::vector<double>();
+
+    // labels
+    auto const& state_labeling = model.getStateLabeling();
+    writer.write(state_labeling.getNumberOfLabels());
+    for(auto const& label: state_labeling.getLabels()) {
+        writer.write(label);
+        writer.write(state_labeling.getStates(label));
+    }
+    if(model.hasChoiceLabeling()) {
+        auto const& choice_labeling = model.getChoiceLabeling();
+        writer.write(choice_labeling.getNumberOfLabels());
+        for(auto const& label: choice_labeling.getLabels()) {
+            writer.write(label);
+            writer.write(choice_labeling.getChoices(label));
+        }
+    } else {
+        writer.write((uint64_t)0);
+    }
+
+    // rewards
+    writer.write(model.getRewardModels().size());
+    for(auto const& [name,reward_model]: model.getRewardModels()) {
+        STORM_LOG_THROW(not reward_model.hasTransitionRewards(), storm::exceptions::NotSupportedException,
+            "transition rewards are not supported.");
+        writer.write(name);
+        writer.write((uint64_t)reward_model.hasStateRewards());
+        if(reward_model.hasStateRewards()) {
+            writer.write(reward_model.getStateRewardVector().data(), num_states);
+        }
+        writer.write((uint64_t)reward_model.hasStateActionRewards());
+        if(reward_model.hasStateActionRewards()) {
+            writer.write(reward_model.getStateActionRewardVector().data(), num_choices);
+        }
+    }
+
+    // observations and players
+    if(model_type == POMDP) {
+        auto const& observations = static_cast<storm::models::sparse::Pomdp<double> const&>(model).getObservations();
+        writer.write(observations.data(), num_states);
+    }
+    if(model_type == POSMG) {
+        auto const& posmg = static_cast<Posmg<double> const&>(model);
+        writer.write(posmg.getObservations().data(), num_states);
+        auto const& players = posmg.getStatePlayerIndications();
+        std::vector<uint64_t> state_player(players.begin(), players.end());
+        writer.write(state_player.data(), num_states);
+    }
+
+    // state valuations
+    std::vector<std::string> variable_name;
+    std::vector<bool> variable_is_boolean;
+    std::vector<int64_t> valuations;
+    if(model.hasStateValuations()) {
+        try {
+            std::tie(variable_name,variable_is_boolean,valuations) = stateValuationsToMatrix(model.getStateValuations(), num_states);
+        } catch(storm::exceptions::NotSupportedException const& e) {
+            STORM_LOG_WARN("state valuations will not be exported: " << e.what());
+            variable_name.clear();
+        }
+    }
+    writer.write(variable_name.size());
+    for(uint64_t variable = 0; variable < variable_name.size(); ++variable) {
+        writer.write(variable_name[variable]);
+        writer.write((uint64_t)variable_is_boolean[variable]);
+    }
+    if(not variable_name.empty()) {
+        writer.write(valuations.data(), valuations.size());
+    }
+    writer.close();
+}
+
+std::shared_ptr<storm::models::sparse::Model<double>> importQuotientBinary(std::string const& path) {
+    STORM_LOG_THROW(isQuotientBinary(path), storm::exceptions::WrongFormatException, path << " is not a binary model.");
+    MappedFile file(path);
+    BinaryReader reader(file);
+    reader.read<char>(sizeof(MAGIC));
+    uint64_t version = reader.readValue();
+    STORM_LOG_THROW(version == FORMAT_VERSION, storm::exceptions::WrongFormatException,
+        "unsupported version " << version << " of the binary format.");
+    auto model_type = (BinaryModelType)reader.readValue();
+    uint64_t num_states = reader.readValue();
+    uint64_t num_choices = reader.readValue();
+    uint64_t num_entries = reader.readValue();
+    STORM_LOG_THROW(model_type <= POSMG, storm::exceptions::WrongFormatException, "unknown model type.");
+    STORM_LOG_THROW(num_states < file.size and num_choices < file.size and num_entries < file.size,
+        storm::exceptions::WrongFormatException, "model dimensions exceed the size of the file.");
+
+    // transition matrix, offsets and columns are validated before any of them is used as an index
+    uint64_t const* row_groups = reader.read<uint64_t>(num_states+1);
+    uint64_t const* row_starts = reader.read<uint64_t>(num_choices+1);
+    uint64_t const* columns = reader.read<uint64_t>(num_entries);
+    double const* values = reader.read<double>(num_entries);
+    STORM_LOG_THROW(row_groups[0] == 0 and row_groups[num_states] == num_choices and row_starts[0] == 0 and
+        row_starts[num_choices] == num_entries, storm::exceptions::WrongFormatException, "inconsistent transition matrix.");
+    for(uint64_t state = 0; state < num_states; ++state) {
+        STORM_LOG_THROW(row_groups[state] <= row_groups[state+1], storm::exceptions::WrongFormatException,
+            "invalid row group of state " << state << ".");
+    }
+    for(uint64_t choice = 0; choice < num_choices; ++choice) {
+        STORM_LOG_THROW(row_starts[choice] <= row_starts[choice+1], storm::exceptions::WrongFormatException,
+            "invalid row of choice " << choice << ".");
+    }
+    for(uint64_t entry = 0; entry < num_entries; ++entry) {
+        STORM_LOG_THROW(columns[entry] < num_states, storm::exceptions::WrongFormatException,
+            "invalid destination " << columns[entry] << " of entry " << entry << ".");
+    }
+    bool has_row_grouping = model_type != DTMC;
+    STORM_LOG_THROW(has_row_grouping or num_choices == num_states, storm::exceptions::WrongFormatException,
+        "a DTMC must have exactly one choice per state.");
+    storm::storage::SparseMatrixBuilder<double> builder(
+        num_choices, num_states, num_entries, true, has_row_grouping, has_row_grouping ? num_states : 0
+    );
+    for(uint64_t state = 0; state < num_states; ++state) {
+        if(has_row_grouping) {
+            builder.newRowGroup(row_groups[state]);
+        }
+        for(uint64_t choice = row_groups[state]; choice < row_groups[state+1]; ++choice) {
+            for(uint64_t entry = row_starts[choice]; entry < row_starts[choice+1]; ++entry) {
+                builder.addNextValue(choice, columns[entry], values[entry]);
+            }
+        }
+    }
+
+    // labels
+    storm::models::sparse::StateLabeling state_labeling(num_states);
+    uint64_t num_state_labels = reader.readValue();
+    for(uint64_t label = 0; label < num_state_labels; ++label) {
+        std::string name = reader.readString();
+        state_labeling.addLabel(name, reader.readBitVector(num_states));
+    }
+    std::optional<storm::models::sparse::ChoiceLabeling> choice_labeling;
+    uint64_t num_choice_labels = reader.readValue();
+    if(num_choice_labels > 0) {
+        choice_labeling = storm::models::sparse::ChoiceLabeling(num_choices);
+        for(uint64_t label = 0; label < num_choice_labels; ++label) {
+            std::string name = reader.readString();
+            choice_labeling->addLabel(name, reader.readBitVector(num_choices));
+        }
+    }
+
+    // rewards
+    std::unordered_map<std::string,storm::models::sparse::StandardRewardModel<double>> reward_models;
+    uint64_t num_reward_models = reader.readValue();
+    for(uint64_t reward_model = 0; reward_model < num_reward_models; ++reward_model) {
+        std::string name = reader.readString();
+        std::optional<std::vector<double>> state_rewards;
+        std::optional<std::vector<double>> action_rewards;
+        if(reader.readValue()) {
+            double const* rewards = reader.read<double>(num_states);
+            state_rewards = std::vector<double>(rewards, rewards+num_states);
+        }
+        if(reader.readValue()) {
+            double const* rewards = reader.read<double>(num_choices);
+            action_rewards = std::vector<double>(rewards, rewards+num_choices);
+        }
+        reward_models.emplace(name, storm::models::sparse::StandardRewardModel<double>(std::move(state_rewards), std::move(action_rewards)));
+    }
+
+    storm::storage::sparse::ModelComponents<double> components(builder.build(), std::move(state_labeling), std::move(reward_models));
+    if(choice_labeling) {
+        components.choiceLabeling = std::move(*choice_labeling);
+    }
+
+    // observations and players
+    if(model_type == POMDP or model_type == POSMG) {
+        uint32_t const* observations = reader.read<uint32_t>(num_states);
+        components.observabilityClasses = std::vector<uint32_t>(observations, observations+num_states);
+    }
+    if(model_type == POSMG) {
+        uint64_t const* players = reader.read<uint64_t>(num_states);
+        components.statePlayerIndications = std::vector<storm::storage::PlayerIndex>(players, players+num_states);
+    }
+
+    // state valuations
+    uint64_t num_variables = reader.readValue();
+    if(num_variables > 0) {
+        std::vector<std::string> variable_name;
+        std::vector<bool> variable_is_boolean;
+        for(uint64_t variable = 0; variable < num_variables; ++variable) {
+            variable_name.push_back(reader.readString());
+            variable_is_boolean.push_back(reader.readValue() != 0);
+        }
+        STORM_LOG_THROW(num_states == 0 or num_variables <= file.size/num_states, storm::exceptions::WrongFormatException,
+            "unexpected end of file.");
+        int64_t const* valuations = reader.read<int64_t>(num_states*num_variables);
+        components.stateValuations = stateValuationsFromMatrix(variable_name, variable_is_boolean, num_states, valuations);
+    }
+
+    switch(model_type) {
+        case DTMC:
+            return storm::utility::builder::buildModelFromComponents<double>(storm::models::ModelType::Dtmc, std::move(components));
+        case MDP:
+            return storm::utility::builder::buildModelFromComponents<double>(storm::models::ModelType::Mdp, std::move(components));
+        case POMDP:
+            return storm::utility::builder::buildModelFromComponents<double>(storm::models::ModelType::Pomdp, std::move(components));
+        default:
+            return std::make_shared<Posmg<double>>(std::move(components));
+    }
+}
+
+}
@@ -0,0 +1,26 @@
+#pragma once
+
+#include <storm/models/sparse/Model.h>
+
+#include <memory>
+#include <string>
+
+namespace synthesis {
+
+/**
+ * Compact binary format of explicit models (DTMCs, MDPs, POMDPs and POSMGs). The file consists of a header followed
+ * by 8-byte aligned sections: the transition matrix in CSR form (row groups, row starts, columns, values), initial
+ * states, state and choice labels (packed bit vectors), reward models, observations, player indications and state
+ * valuations. Numbers are stored in the native byte order.
+ */
+
+/** Check whether the file starts with the header of the binary format. */
+bool isQuotientBinary(std::string const& path);
+
+/** Write the model into the file in the binary format. */
+void exportQuotientBinary(storm::models::sparse::Model<double> const& model, std::string const& path);
+
+/** Read the model from the file in the binary format; the file is memory-mapped while the model is constructed. */
+std::shared_ptr<storm::models::sparse::Model<double>> importQuotientBinary(std::string const& path);
+
+}
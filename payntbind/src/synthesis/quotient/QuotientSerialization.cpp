@@ -0,0 +1,101 @@
+#include "QuotientSerialization.h"
+
+#include <storm/storage/expressions/ExpressionManager.h>
+#include <storm/exceptions/NotSupportedException.h>
+#include <storm/utility/macros.h>
+
+#include <memory>
+
+namespace synthesis {
+
+std::tuple<std::vector<uint64_t>,std::vector<uint64_t>,std::vector<uint64_t>> choiceToAssignmentToCsr(
+    std::vector<std::vector<std::pair<uint64_t,uint64_t>>> const& choice_to_assignment
+) {
+    std::vector<uint64_t> offsets;
+    std::vector<uint64_t> holes;
+    std::vector<uint64_t> options;
+    offsets.reserve(choice_to_assignment.size()+1);
+    for(auto const& assignment: choice_to_assignment) {
+        offsets.push_back(holes.size());
+        for(auto const& [hole,option]: assignment) {
+            holes.push_back(hole);
+            options.push_back(option);
+        }
+    }
+    offsets.push_back(holes.size());
+    return std::make_tuple(std::move(offsets),std::move(holes),std::move(options));
+}
+
+std::vector<std::vector<std::pair<uint64_t,uint64_t>>> choiceToAssignmentFromCsr(
+    uint64_t num_choices, uint64_t const* offsets, uint64_t const* holes, uint64_t const* options
+) {
+    std::vector<std::vector<std::pair<uint64_t,uint64_t>>> choice_to_assignment(num_choices);
+    for(uint64_t choice = 0; choice < num_choices; ++choice) {
+        auto & assignment = choice_to_assignment[choice];
+        assignment.reserve(offsets[choice+1]-offsets[choice]);
+        for(uint64_t entry = offsets[choice]; entry < offsets[choice+1]; ++entry) {
+            assignment.emplace_back(holes[entry],options[entry]);
+        }
+    }
+    return choice_to_assignment;
+}
+
+std::tuple<std::vector<std::string>,std::vector<bool>,std::vector<int64_t>> stateValuationsToMatrix(
+    storm::storage::sparse::StateValuations const& state_valuations, uint64_t num_states
+) {
+    std::vector<std::string> variable_name;
+    std::vector<bool> variable_is_boolean;
+    std::vector<int64_t> matrix;
+    for(uint64_t state = 0; state < num_states; ++state) {
+        uint64_t variable = 0;
+        for(auto it = state_valuations.at(state).begin(); it != state_valuations.at(state).end(); ++it) {
+            STORM_LOG_THROW(it.isVariableAssignment() and (it.isBoolean() or it.isInteger()),
+                storm::exceptions::NotSupportedException, "only boolean and integer state variables are supported.");
+            if(state == 0) {
+                variable_name.push_back(it.getVariable().getName());
+                variable_is_boolean.push_back(it.isBoolean());
+            }
+            matrix.push_back(it.isBoolean() ? (int64_t)it.getBooleanValue() : it.getIntegerValue());
+            ++variable;
+        }
+        STORM_LOG_THROW(variable == variable_name.size(), storm::exceptions::NotSupportedException,
+            "state " << state << " has a different number of variables than the initial state.");
+    }
+    return std::make_tuple(std::move(variable_name),std::move(variable_is_boolean),std::move(matrix));
+}
+
+storm::storage::sparse::StateValuations stateValuationsFromMatrix(
+    std::vector<std::string> const& variable_name, std::vector<bool> const& variable_is_boolean,
+    uint64_t num_states, int64_t const* matrix
+) {
+    auto em = std::make_shared<storm::expressions::ExpressionManager>();
+    std::vector<storm::expressions::Variable> variables;
+    uint64_t num_booleans = 0;
+    storm::storage::sparse::StateValuationsBuilder sv_builder;
+    for(uint64_t variable = 0; variable < variable_name.size(); ++variable) {
+        if(variable_is_boolean[variable]) {
+            variables.push_back(em->declareBooleanVariable(variable_name[variable]));
+            ++num_booleans;
+        } else {
+            variables.push_back(em->declareIntegerVariable(variable_name[variable]));
+        }
+        sv_builder.addVariable(variables.back());
+    }
+    uint64_t num_variables = variables.size();
+    for(uint64_t state = 0; state < num_states; ++state) {
+        std::vector<bool> boolean_values(num_booleans);
+        std::vector<int64_t> integer_values(num_variables-num_booleans);
+        int64_t const* row = matrix + state*num_variables;
+        for(uint64_t variable = 0; variable < num_variables; ++variable) {
+            if(variable_is_boolean[variable]) {
+                boolean_values[variables[variable].getOffset()] = row[variable] != 0;
+            } else {
+                integer_values[variables[variable].getOffset()] = row[variable];
+            }
+        }
+        sv_builder.addState(state, std::move(boolean_values), std::move(integer_values));
+    }
+    return sv_builder.build();
+}
+
+}
@@ -0,0 +1,45 @@
+#pragma once
+
+#include <storm/storage/sparse/StateValuations.h>
+
+#include <cstdint>
+#include <string>
+#include <tuple>
+#include <utility>
+#include <vector>
+
+namespace synthesis {
+
+/**
+ * Flatten the choice-to-assignment mapping of a coloring into CSR arrays.
+ * @return (1) for each choice, index of its first (hole,option) pair; contains num_choices+1 entries
+ * @return (2) hole of each pair
+ * @return (3) option of each pair
+ */
+std::tuple<std::vector<uint64_t>,std::vector<uint64_t>,std::vector<uint64_t>> choiceToAssignmentToCsr(
+    std::vector<std::vector<std::pair<uint64_t,uint64_t>>> const& choice_to_assignment
+);
+
+/** Inverse of choiceToAssignmentToCsr(). */
+std::vector<std::vector<std::pair<uint64_t,uint64_t>>> choiceToAssignmentFromCsr(
+    uint64_t num_choices, uint64_t const* offsets, uint64_t const* holes, uint64_t const* options
+);
+
+/**
+ * Store state valuations as a row-major integer matrix with one row per state and one column per variable, boolean
+ * values are stored as 0/1. Only boolean and integer variables are supported.
+ * @return (1) variable names
+ * @return (2) for each variable, whether it is boolean
+ * @return (3) the matrix
+ */
+std::tuple<std::vector<std::string>,std::vector<bool>,std::vector<int64_t>> stateValuationsToMatrix(
+    storm::storage::sparse::StateValuations const& state_valuations, uint64_t num_states
+);
+
+/** Inverse of stateValuationsToMatrix(); variables are declared in a fresh expression manager. */
+storm::storage::sparse::StateValuations stateValuationsFromMatrix(
+    std::vector<std::string> const& variable_name, std::vector<bool> const& variable_is_boolean,
+    uint64_t num_states, int64_t const* matrix
+);
+
+}
@@ -0,0 +1,212 @@
+#include "SymbolicQuotient.h"
+
+#include <storm/api/verification.h>
+#include <storm/modelchecker/CheckTask.h>
+#include <storm/modelchecker/results/CheckResult.h>
+#include <storm/modelchecker/results/SymbolicQuantitativeCheckResult.h>
+#include <storm/models/symbolic/Dtmc.h>
+#include <storm/models/symbolic/Mdp.h>
+#include <storm/models/symbolic/StandardRewardModel.h>
+#include <storm/storage/dd/DdManager.h>
+#include <storm/storage/dd/Odd.h>
+#include <storm/transformer/SymbolicToSparseTransformer.h>
+#include <storm/utility/macros.h>
+#include <storm/exceptions/InvalidArgumentException.h>
+#include <storm/exceptions/NotSupportedException.h>
+
+#include <limits>
+#include <set>
+
+namespace synthesis {
+
+SymbolicQuotient::SymbolicQuotient(
+    std::shared_ptr<SymbolicModel> model,
+    std::vector<std::string> const& hole_names,
+    std::vector<std::vector<int64_t>> const& hole_to_option_values
+) : model(model), hole_to_option_values(hole_to_option_values) {
+    STORM_LOG_THROW(
+        model->isOfType(storm::models::ModelType::Dtmc) or model->isOfType(storm::models::ModelType::Mdp),
+        storm::exceptions::NotSupportedException, "symbolic quotient must be a DTMC or an MDP."
+    );
+    for(auto const& name: hole_names) {
+        bool found = false;
+        for(auto const& variable: model->getRowVariables()) {
+            if(variable.getName() == name) {
+                hole_variables.push_back(variable);
+                found = true;
+                break;
+            }
+        }
+        STORM_LOG_THROW(found, storm::exceptions::InvalidArgumentException,
+            "hole " << name << " is not a state variable of the symbolic quotient.");
+    }
+    for(auto const& option_values: hole_to_option_values) {
+        std::map<int64_t,uint64_t> value_to_option;
+        for(uint64_t option = 0; option < option_values.size(); ++option) {
+            value_to_option[option_values[option]] = option;
+        }
+        hole_value_to_option.push_back(std::move(value_to_option));
+    }
+}
+
+std::shared_ptr<SymbolicQuotient::SymbolicModel> SymbolicQuotient::getModel() const {
+    return model;
+}
+
+SymbolicQuotient::Bdd SymbolicQuotient::familyBdd(Family const& family) const {
+    auto const& manager = model->getManager();
+    Bdd family_bdd = manager.getBddOne();
+    for(uint64_t hole = 0; hole < hole_variables.size(); ++hole) {
+        Bdd hole_bdd = manager.getBddZero();
+        for(auto option: family.holeOptions(hole)) {
+            hole_bdd |= manager.getEncoding(hole_variables[hole], hole_to_option_values[hole][option]);
+        }
+        family_bdd &= hole_bdd;
+    }
+    return family_bdd;
+}
+
+bool SymbolicQuotient::familyIsEmpty(Family const& family) const {
+    return (model->getInitialStates() && familyBdd(family)).isZero();
+}
+
+void SymbolicQuotient::checkFormula(uint64_t formula_index, storm::logic::Formula const& formula) {
+    storm::modelchecker::CheckTask<storm::logic::Formula,double> task(formula, false);
+    std::unique_ptr<storm::modelchecker::CheckResult> result = storm::api::verifyWithDdEngine<LibraryType,double>(model, task);
+    STORM_LOG_THROW(result != nullptr and result->isSymbolicQuantitativeCheckResult(), storm::exceptions::NotSupportedException,
+        "formula " << formula << " cannot be checked symbolically.");
+    formula_values.insert_or_assign(formula_index, result->asSymbolicQuantitativeCheckResult<LibraryType,double>().getValueVector());
+}
+
+std::pair<double,double> SymbolicQuotient::familyBounds(uint64_t formula_index, Family const& family) const {
+    auto const& values = formula_values.at(formula_index);
+    auto const& manager = model->getManager();
+    Bdd members = model->getInitialStates() && familyBdd(family);
+    double infinity = std::numeric_limits<double>::infinity();
+    if(members.isZero()) {
+        return std::make_pair(infinity,-infinity);
+    }
+    double min = members.ite(values, manager.template getConstant<double>(infinity)).getMin();
+    double max = members.ite(values, manager.template getConstant<double>(-infinity)).getMax();
+    return std::make_pair(min,max);
+}
+
+std::pair<SymbolicQuotient::Bdd,SymbolicQuotient::Add> SymbolicQuotient::projectMembers(
+    uint64_t formula_index, Family const& family
+) const {
+    auto const& values = formula_values.at(formula_index);
+    Add zero = model->getManager().template getAddZero<double>();
+    std::set<storm::expressions::Variable> other_variables = model->getRowVariables();
+    for(auto const& variable: hole_variables) {
+        other_variables.erase(variable);
+    }
+    Bdd initial = model->getInitialStates() && familyBdd(family);
+    Bdd members = initial.existsAbstract(other_variables);
+    Add member_value = initial.ite(values, zero).maxAbstract(other_variables);
+    return std::make_pair(members,member_value);
+}
+
+std::vector<double> SymbolicQuotient::memberValues(uint64_t formula_index, Family const& family) const {
+    auto const& manager = model->getManager();
+    Add zero = manager.template getAddZero<double>();
+
+    // project the initial states of the members onto the hole variables
+    auto [members,member_value] = projectMembers(formula_index, family);
+
+    // index of each hole assignment in the row-major array
+    Add member_index = zero;
+    uint64_t num_assignments = 1;
+    for(int64_t hole = hole_variables.size()-1; hole >= 0; --hole) {
+        for(uint64_t option = 0; option < hole_to_option_values[hole].size(); ++option) {
+            Bdd encoding = manager.getEncoding(hole_variables[hole], hole_to_option_values[hole][option]);
+            member_index += encoding.template toAdd<double>() * manager.template getConstant<double>(option*num_assignments);
+        }
+        num_assignments *= family.holeNumOptionsTotal(hole);
+    }
+
+    // both vectors are enumerated in the order given by the same ODD
+    storm::dd::Odd odd = members.createOdd();
+    std::vector<double> index_vector = members.ite(member_index, zero).toVector(odd);
+    std::vector<double> value_vector = members.ite(member_value, zero).toVector(odd);
+    std::vector<double> assignment_value(num_assignments, std::numeric_limits<double>::quiet_NaN());
+    for(uint64_t member = 0; member < index_vector.size(); ++member) {
+        assignment_value[(uint64_t)index_vector[member]] = value_vector[member];
+    }
+    return assignment_value;
+}
+
+std::pair<std::vector<std::vector<uint64_t>>,std::vector<double>> SymbolicQuotient::familyMemberValues(
+    uint64_t formula_index, Family const& family
+) const {
+    auto const& manager = model->getManager();
+    Add zero = manager.template getAddZero<double>();
+    auto [members,member_value] = projectMembers(formula_index, family);
+
+    // options of the members and their values are enumerated in the order given by the same ODD
+    storm::dd::Odd odd = members.createOdd();
+    std::vector<std::vector<uint64_t>> hole_to_member_option(hole_variables.size());
+    for(uint64_t hole = 0; hole < hole_variables.size(); ++hole) {
+        Add member_option = zero;
+        for(uint64_t option = 0; option < hole_to_option_values[hole].size(); ++option) {
+            Bdd encoding = manager.getEncoding(hole_variables[hole], hole_to_option_values[hole][option]);
+            member_option += encoding.template toAdd<double>() * manager.template getConstant<double>(option);
+        }
+        for(double option: members.ite(member_option, zero).toVector(odd)) {
+            hole_to_member_option[hole].push_back((uint64_t)option);
+        }
+    }
+    std::vector<double> values = members.ite(member_value, zero).toVector(odd);
+    return std::make_pair(hole_to_member_option,values);
+}
+
+std::pair<std::shared_ptr<storm::models::sparse::Model<double>>,std::vector<std::vector<uint64_t>>> SymbolicQuotient::buildSparse(
+    Family const& family, std::vector<std::shared_ptr<storm::logic::Formula const>> const& formulas
+) const {
+    // hole variables never change their value, so the states reachable from the members of the family are exactly
+    // the reachable states of the quotient that agree with the family
+    Bdd members = familyBdd(family);
+    Bdd reachable = model->getReachableStates() && members;
+    Bdd initial = model->getInitialStates() && members;
+    Bdd deadlock = model->getDeadlockStates() && reachable;
+    Add transitions = model->getTransitionMatrix() * reachable.template toAdd<double>();
+    std::map<std::string,Bdd> label_to_bdd;
+    for(auto const& label: model->getLabels()) {
+        label_to_bdd[label] = model->getStates(label) && reachable;
+    }
+
+    std::shared_ptr<storm::models::sparse::Model<double>> sparse;
+    if(model->isOfType(storm::models::ModelType::Dtmc)) {
+        storm::models::symbolic::Dtmc<LibraryType,double> restricted(
+            model->getManagerAsSharedPointer(), reachable, initial, deadlock, transitions,
+            model->getRowVariables(), model->getColumnVariables(), model->getRowColumnMetaVariablePairs(),
+            label_to_bdd, model->getRewardModels()
+        );
+        storm::transformer::SymbolicDtmcToSparseDtmcTransformer<LibraryType,double> transformer;
+        sparse = transformer.translate(restricted, formulas);
+    } else {
+        auto const& mdp = *model->template as<storm::models::symbolic::Mdp<LibraryType,double>>();
+        storm::models::symbolic::Mdp<LibraryType,double> restricted(
+            model->getManagerAsSharedPointer(), reachable, initial, deadlock, transitions,
+            model->getRowVariables(), model->getColumnVariables(), model->getRowColumnMetaVariablePairs(),
+            mdp.getNondeterminismVariables(), label_to_bdd, model->getRewardModels()
+        );
+        sparse = storm::transformer::SymbolicMdpToSparseMdpTransformer<LibraryType,double>::translate(restricted, formulas);
+    }
+
+    // the transformers enumerate states in the order given by the ODD of reachable states
+    storm::dd::Odd odd = reachable.createOdd();
+    Add reachable_add = reachable.template toAdd<double>();
+    std::vector<std::vector<uint64_t>> hole_to_state_option(hole_variables.size());
+    for(uint64_t hole = 0; hole < hole_variables.size(); ++hole) {
+        std::vector<double> state_value =
+            (reachable_add * model->getManager().template getIdentity<double>(hole_variables[hole])).toVector(odd);
+        auto & state_option = hole_to_state_option[hole];
+        state_option.reserve(state_value.size());
+        for(double value: state_value) {
+            state_option.push_back(hole_value_to_option[hole].at((int64_t)value));
+        }
+    }
+    return std::make_pair(sparse,std::move(hole_to_state_option));
+}
+
+}
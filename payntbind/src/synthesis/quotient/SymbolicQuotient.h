@@ -0,0 +1,113 @@
+#pragma once
+
+#include "src/synthesis/quotient/Family.h"
+
+#include <storm/models/symbolic/Model.h>
+#include <storm/models/sparse/Model.h>
+#include <storm/storage/dd/DdType.h>
+#include <storm/storage/dd/Bdd.h>
+#include <storm/storage/dd/Add.h>
+#include <storm/storage/expressions/Variable.h>
+#include <storm/logic/Formula.h>
+
+#include <cstdint>
+#include <map>
+#include <memory>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace synthesis {
+
+/**
+ * Symbolic (BDD-based) quotient of a family of models. Holes are kept as state variables of the symbolic model whose
+ * value never changes: each initial state corresponds to a single member of the family. Restricting the quotient to
+ * a sub-family is a cofactor wrt the BDD encoding the hole options of the sub-family.
+ */
+class SymbolicQuotient {
+public:
+
+    static constexpr storm::dd::DdType LibraryType = storm::dd::DdType::Sylvan;
+    using SymbolicModel = storm::models::symbolic::Model<LibraryType,double>;
+    using Bdd = storm::dd::Bdd<LibraryType>;
+    using Add = storm::dd::Add<LibraryType,double>;
+
+    /**
+     * @param model symbolic model where holes are represented by constant integer state variables
+     * @param hole_names for each hole, the name of the corresponding state variable
+     * @param hole_to_option_values for each hole, values of the state variable associated with individual options
+     */
+    SymbolicQuotient(
+        std::shared_ptr<SymbolicModel> model,
+        std::vector<std::string> const& hole_names,
+        std::vector<std::vector<int64_t>> const& hole_to_option_values
+    );
+
+    std::shared_ptr<SymbolicModel> getModel() const;
+
+    /** Encode the hole options of the family as a BDD over the state variables of the holes. */
+    Bdd familyBdd(Family const& family) const;
+
+    /** Check whether the family has at least one member, i.e. at least one initial state of the quotient. */
+    bool familyIsEmpty(Family const& family) const;
+
+    /**
+     * Model check the formula in all reachable states of the quotient via the DD engine. The result is kept under
+     * the given index to be restricted to sub-families.
+     */
+    void checkFormula(uint64_t formula_index, storm::logic::Formula const& formula);
+
+    /**
+     * Compute minimum and maximum value of the formula (checked via checkFormula()) over all members of the family.
+     * If the family has no members, (inf,-inf) is returned.
+     */
+    std::pair<double,double> familyBounds(uint64_t formula_index, Family const& family) const;
+
+    /**
+     * Collect values of the formula (checked via checkFormula()) for all members of the family. Each member is
+     * expected to have a single initial state.
+     * @return dense row-major array indexed by hole assignments (option indices wrt all options of each hole),
+     *  NaN for assignments that are not members of the family
+     */
+    std::vector<double> memberValues(uint64_t formula_index, Family const& family) const;
+
+    /**
+     * Collect values of the formula (checked via checkFormula()) for the members of the family only, this is to be
+     * preferred to memberValues() for small families of large design spaces.
+     * @return (1) for each hole, for each member, its option of this hole
+     * @return (2) for each member, its value
+     */
+    std::pair<std::vector<std::vector<uint64_t>>,std::vector<double>> familyMemberValues(
+        uint64_t formula_index, Family const& family
+    ) const;
+
+    /**
+     * Convert the quotient restricted to the family into an explicit model. Each initial state of the explicit
+     * model corresponds to one member of the family.
+     * @param formulas formulas whose atomic expressions are to be preserved as labels
+     * @return (1) the explicit model
+     * @return (2) for each hole, for each state of the explicit model, the option of this hole
+     */
+    std::pair<std::shared_ptr<storm::models::sparse::Model<double>>,std::vector<std::vector<uint64_t>>> buildSparse(
+        Family const& family, std::vector<std::shared_ptr<storm::logic::Formula const>> const& formulas
+    ) const;
+
+private:
+    /**
+     * Project the initial states of the members of the family onto the hole variables.
+     * @return (1) BDD of hole assignments of the members
+     * @return (2) value of the formula for each hole assignment
+     */
+    std::pair<Bdd,Add> projectMembers(uint64_t formula_index, Family const& family) const;
+
+    std::shared_ptr<SymbolicModel> model;
+    /** For each hole, the corresponding row meta variable. */
+    std::vector<storm::expressions::Variable> hole_variables;
+    std::vector<std::vector<int64_t>> hole_to_option_values;
+    /** For each hole, a mapping of variable values to options. */
+    std::vector<std::map<int64_t,uint64_t>> hole_value_to_option;
+    /** For each checked formula, values in reachable states of the quotient. */
+    std::map<uint64_t,Add> formula_values;
+};
+
+}
@@ -1,9 +1,16 @@
 #include "../synthesis.h"
 
 #include "JaniChoices.h"
+#include "JaniUnfolding.h"
 #include "Family.h"
 #include "Coloring.h"
 #include "ColoringSmt.h"
+#include "AssignmentEvaluator.h"
+#include "ExpectedVisits.h"
+#include "QuotientSerialization.h"
+#include "QuotientBinary.h"
+#include "SymbolicQuotient.h"
+#include "src/helpers.h"
 #include "src/synthesis/translation/componentTranslations.h"
 
 #include <storm/storage/expressions/ExpressionManager.h>
@@ -12,6 +19,7 @@
 #include <storm/utility/builder.h>
 
 #include <storm/exceptions/InvalidModelException.h>
+#include <storm/exceptions/InvalidArgumentException.h>
 #include <storm/models/sparse/Mdp.h>
 #include <storm/models/sparse/NondeterministicModel.h>
 #include <storm/storage/BitVector.h>
@@ -23,6 +31,12 @@
 
 #include <z3++.h>
 
+#include <pybind11/numpy.h>
+
+#include <limits>
+#include <optional>
+#include <queue>
+
 namespace synthesis {
 
 template<typename ValueType>
@@ -117,9 +131,9 @@ std::vector<uint64_t> schedulerToStateToGlobalChoice(
 std::map<uint64_t,double> computeInconsistentHoleVariance(
     Family const& family,
     std::vector<uint64_t> const& row_groups, std::vector<uint64_t> const& choice_to_global_choice,
-    std::vector<double> const& choice_to_value,
+    double const* choice_to_value,
     Coloring const& coloring, std::map<uint64_t,std::vector<uint64_t>> const& hole_to_inconsistent_options,
-    std::vector<double> const& state_to_expected_visits
+    double const* state_to_expected_visits
 ) {
 
     auto num_holes = family.numHoles();
@@ -191,38 +205,127 @@ std::map<uint64_t,double> computeInconsistentHoleVariance(
 }
 
 
-/*storm::storage::BitVector keepReachableChoices(
-    storm::storage::BitVector enabled_choices, uint64_t initial_state,
-    std::vector<uint64_t> const& row_groups, std::vector<std::vector<uint64_t>> const& choice_destinations
-) {
+// marks states without a selected choice in the state-to-choice mappings below
+const uint64_t NO_CHOICE = std::numeric_limits<uint64_t>::max();
 
-    uint64_t num_states = row_groups.size()-1;
-    uint64_t num_choices = enabled_choices.size();
+std::vector<uint64_t> fromOptionalChoices(std::vector<std::optional<uint64_t>> const& state_to_choice) {
+    std::vector<uint64_t> result(state_to_choice.size());
+    for(uint64_t state = 0; state < state_to_choice.size(); ++state) {
+        result[state] = state_to_choice[state] ? *state_to_choice[state] : NO_CHOICE;
+    }
+    return result;
+}
 
-    storm::storage::BitVector reachable_choices(num_choices,false);
-    storm::storage::BitVector state_visited(num_states,false);
+std::vector<std::optional<uint64_t>> toOptionalChoices(std::vector<uint64_t> const& state_to_choice) {
+    std::vector<std::optional<uint64_t>> result(state_to_choice.size());
+    for(uint64_t state = 0; state < state_to_choice.size(); ++state) {
+        if(state_to_choice[state] != NO_CHOICE) {
+            result[state] = state_to_choice[state];
+        }
+    }
+    return result;
+}
+
+/**
+ * Keep only choices in states reachable from the initial state of the quotient via the selected choices. Choices that
+ * do not belong to the quotient are kept but have no successors.
+ */
+template<typename ValueType>
+std::vector<uint64_t> keepReachableChoices(
+    storm::models::sparse::Model<ValueType> const& quotient, std::vector<uint64_t> const& state_to_choice
+) {
+    auto const& matrix = quotient.getTransitionMatrix();
+    uint64_t num_states = quotient.getNumberOfStates();
+    uint64_t num_choices = quotient.getNumberOfChoices();
 
+    std::vector<uint64_t> state_to_choice_reachable(num_states,NO_CHOICE);
+    storm::storage::BitVector state_visited(num_states,false);
     std::queue<uint64_t> state_queue;
+    uint64_t initial_state = *quotient.getInitialStates().begin();
     state_visited.set(initial_state,true);
     state_queue.push(initial_state);
     while(not state_queue.empty()) {
         auto state = state_queue.front();
         state_queue.pop();
-        for(uint64_t choice = row_groups[state]; choice < row_groups[state+1]; ++choice) {
-            if(not enabled_choices[choice]) {
-                continue;
-            }
-            reachable_choices.set(choice,true);
-            for(auto dst: choice_destinations[choice]) {
-                if(not state_visited[dst]) {
-                    state_visited.set(dst,true);
-                    state_queue.push(dst);
-                }
+        auto choice = state_to_choice[state];
+        state_to_choice_reachable[state] = choice;
+        if(choice >= num_choices) {
+            continue;
+        }
+        for(auto const& entry: matrix.getRow(choice)) {
+            auto dst = entry.getColumn();
+            if(not state_visited[dst]) {
+                state_visited.set(dst,true);
+                state_queue.push(dst);
             }
         }
     }
-    return reachable_choices;
-}*/
+    return state_to_choice_reachable;
+}
+
+/**
+ * Map a deterministic memoryless scheduler of a sub-MDP to choices of the quotient, optionally keeping only choices
+ * in states that are reachable in the quotient using these choices.
+ */
+template<typename ValueType>
+std::vector<uint64_t> schedulerToQuotientStateToChoice(
+    storm::storage::Scheduler<ValueType> const& scheduler, storm::models::sparse::Mdp<ValueType> const& sub_mdp,
+    std::vector<uint64_t> const& state_to_quotient_state, std::vector<uint64_t> const& choice_to_quotient_choice,
+    storm::models::sparse::Model<ValueType> const& quotient, bool discard_unreachable_choices
+) {
+    std::vector<uint64_t> state_to_choice(quotient.getNumberOfStates(),NO_CHOICE);
+    auto const& nci = sub_mdp.getNondeterministicChoiceIndices();
+    for(uint64_t state = 0; state < sub_mdp.getNumberOfStates(); ++state) {
+        uint64_t choice = nci[state] + scheduler.getChoice(state).getDeterministicChoice();
+        state_to_choice[state_to_quotient_state[state]] = choice_to_quotient_choice[choice];
+    }
+    if(discard_unreachable_choices) {
+        state_to_choice = keepReachableChoices(quotient, state_to_choice);
+    }
+    return state_to_choice;
+}
+
+storm::storage::BitVector stateToChoiceToChoices(std::vector<uint64_t> const& state_to_choice, uint64_t num_choices) {
+    storm::storage::BitVector choices(num_choices,false);
+    for(auto choice: state_to_choice) {
+        if(choice < num_choices) {
+            choices.set(choice,true);
+        }
+    }
+    return choices;
+}
+
+storm::storage::BitVector restrictChoiceMask(
+    storm::storage::BitVector const& choices, std::vector<uint64_t> const& choice_map
+) {
+    storm::storage::BitVector sub_choices(choice_map.size(),false);
+    for(uint64_t sub_choice = 0; sub_choice < choice_map.size(); ++sub_choice) {
+        if(choices[choice_map[sub_choice]]) {
+            sub_choices.set(sub_choice,true);
+        }
+    }
+    return sub_choices;
+}
+
+storm::storage::BitVector liftChoiceMask(
+    storm::storage::BitVector const& sub_choices, std::vector<uint64_t> const& choice_map, uint64_t num_choices
+) {
+    storm::storage::BitVector choices(num_choices,false);
+    for(auto sub_choice: sub_choices) {
+        choices.set(choice_map[sub_choice],true);
+    }
+    return choices;
+}
+
+std::vector<uint64_t> composeMapping(
+    std::vector<uint64_t> const& inner_map, std::vector<uint64_t> const& outer_map
+) {
+    std::vector<uint64_t> composed(inner_map.size());
+    for(uint64_t index = 0; index < inner_map.size(); ++index) {
+        composed[index] = outer_map[inner_map[index]];
+    }
+    return composed;
+}
 
 // RA: I don't even understand why this needs to be optimized, but it does
 storm::storage::BitVector policyToChoicesForFamily(
@@ -288,19 +391,159 @@ storm::storage::BitVector policyToChoicesForFamily(
 void bindings_coloring(py::module& m) {
 
     m.def("addStateValuations", &synthesis::addStateValuations<double>);
+
+    m.def("isQuotientBinary", &synthesis::isQuotientBinary);
+    m.def("exportQuotientBinary", &synthesis::exportQuotientBinary, py::call_guard<py::gil_scoped_release>());
+    m.def("importQuotientBinary", &synthesis::importQuotientBinary, py::call_guard<py::gil_scoped_release>());
+
+    auto state_valuations_to_matrix = [](storm::storage::sparse::StateValuations const& state_valuations, uint64_t num_states) {
+        auto [variable_name,variable_is_boolean,matrix] = synthesis::stateValuationsToMatrix(state_valuations, num_states);
+        py::ssize_t num_variables = variable_name.size();
+        py::array matrix_array = vectorToArray(std::move(matrix)).reshape({(py::ssize_t)num_states,num_variables});
+        return std::make_tuple(variable_name,variable_is_boolean,matrix_array);
+    };
+    m.def("stateValuationsToMatrix", [state_valuations_to_matrix](storm::models::sparse::Model<double> const& model) {
+        return state_valuations_to_matrix(model.getStateValuations(), model.getNumberOfStates());
+    });
+    m.def("stateValuationsToMatrix", [state_valuations_to_matrix](storm::models::sparse::Model<storm::RationalNumber> const& model) {
+        return state_valuations_to_matrix(model.getStateValuations(), model.getNumberOfStates());
+    });
+
+    m.def("janiUnfoldHoles", &synthesis::unfoldJaniHoles, py::call_guard<py::gil_scoped_release>());
     m.def("janiMapChoicesToHoleAssignments", &synthesis::janiMapChoicesToHoleAssignments<double>);
     m.def("addChoiceLabelsFromJani", &synthesis::addChoiceLabelsFromJani<double>);
 
     m.def("schedulerToStateToGlobalChoice", &synthesis::schedulerToStateToGlobalChoice<double>);
     m.def("schedulerToStateToGlobalChoiceExact", &synthesis::schedulerToStateToGlobalChoice<storm::RationalNumber>);
 
-    m.def("computeInconsistentHoleVariance", &synthesis::computeInconsistentHoleVariance);
+    m.def("discardUnreachableChoices", [](
+        storm::models::sparse::Model<double> const& quotient, std::vector<std::optional<uint64_t>> const& state_to_choice
+    ) {
+        return synthesis::toOptionalChoices(synthesis::keepReachableChoices(quotient, synthesis::fromOptionalChoices(state_to_choice)));
+    });
+    m.def("discardUnreachableChoicesExact", [](
+        storm::models::sparse::Model<storm::RationalNumber> const& quotient, std::vector<std::optional<uint64_t>> const& state_to_choice
+    ) {
+        return synthesis::toOptionalChoices(synthesis::keepReachableChoices(quotient, synthesis::fromOptionalChoices(state_to_choice)));
+    });
+    m.def("stateToChoiceToChoices", [](std::vector<std::optional<uint64_t>> const& state_to_choice, uint64_t num_choices) {
+        return synthesis::stateToChoiceToChoices(synthesis::fromOptionalChoices(state_to_choice), num_choices);
+    });
+    m.def("schedulerToQuotientStateToChoice", [](
+        storm::storage::Scheduler<double> const& scheduler, storm::models::sparse::Mdp<double> const& sub_mdp,
+        std::vector<uint64_t> const& state_to_quotient_state, std::vector<uint64_t> const& choice_to_quotient_choice,
+        storm::models::sparse::Model<double> const& quotient, bool discard_unreachable_choices
+    ) {
+        return synthesis::toOptionalChoices(synthesis::schedulerToQuotientStateToChoice(
+            scheduler, sub_mdp, state_to_quotient_state, choice_to_quotient_choice, quotient, discard_unreachable_choices
+        ));
+    });
+    m.def("schedulerToQuotientStateToChoiceExact", [](
+        storm::storage::Scheduler<storm::RationalNumber> const& scheduler, storm::models::sparse::Mdp<storm::RationalNumber> const& sub_mdp,
+        std::vector<uint64_t> const& state_to_quotient_state, std::vector<uint64_t> const& choice_to_quotient_choice,
+        storm::models::sparse::Model<storm::RationalNumber> const& quotient, bool discard_unreachable_choices
+    ) {
+        return synthesis::toOptionalChoices(synthesis::schedulerToQuotientStateToChoice(
+            scheduler, sub_mdp, state_to_quotient_state, choice_to_quotient_choice, quotient, discard_unreachable_choices
+        ));
+    });
+    m.def("schedulerToQuotientChoices", [](
+        storm::storage::Scheduler<double> const& scheduler, storm::models::sparse::Mdp<double> const& sub_mdp,
+        std::vector<uint64_t> const& state_to_quotient_state, std::vector<uint64_t> const& choice_to_quotient_choice,
+        storm::models::sparse::Model<double> const& quotient
+    ) {
+        auto state_to_choice = synthesis::schedulerToQuotientStateToChoice(
+            scheduler, sub_mdp, state_to_quotient_state, choice_to_quotient_choice, quotient, true
+        );
+        return synthesis::stateToChoiceToChoices(state_to_choice, quotient.getNumberOfChoices());
+    });
+    m.def("schedulerToQuotientChoicesExact", [](
+        storm::storage::Scheduler<storm::RationalNumber> const& scheduler, storm::models::sparse::Mdp<storm::RationalNumber> const& sub_mdp,
+        std::vector<uint64_t> const& state_to_quotient_state, std::vector<uint64_t> const& choice_to_quotient_choice,
+        storm::models::sparse::Model<storm::RationalNumber> const& quotient
+    ) {
+        auto state_to_choice = synthesis::schedulerToQuotientStateToChoice(
+            scheduler, sub_mdp, state_to_quotient_state, choice_to_quotient_choice, quotient, true
+        );
+        return synthesis::stateToChoiceToChoices(state_to_choice, quotient.getNumberOfChoices());
+    });
+
+    m.def("computeInconsistentHoleVariance", [](
+        synthesis::Family const& family,
+        std::vector<uint64_t> const& row_groups, std::vector<uint64_t> const& choice_to_global_choice,
+        py::array_t<double, py::array::c_style | py::array::forcecast> const& choice_to_value,
+        synthesis::Coloring const& coloring, std::map<uint64_t,std::vector<uint64_t>> const& hole_to_inconsistent_options,
+        py::array_t<double, py::array::c_style | py::array::forcecast> const& state_to_expected_visits
+    ) {
+        STORM_LOG_THROW(
+            (uint64_t)choice_to_value.size() == row_groups.back() and (uint64_t)state_to_expected_visits.size() >= row_groups.size()-1,
+            storm::exceptions::InvalidArgumentException, "choice values or expected visits do not match the model."
+        );
+        return synthesis::computeInconsistentHoleVariance(
+            family, row_groups, choice_to_global_choice, choice_to_value.data(), coloring, hole_to_inconsistent_options,
+            state_to_expected_visits.data()
+        );
+    });
 
     m.def("policyToChoicesForFamily", &synthesis::policyToChoicesForFamily);
+    m.def("restrictChoiceMask", &synthesis::restrictChoiceMask);
+    m.def("liftChoiceMask", &synthesis::liftChoiceMask);
+    m.def("composeMapping", &synthesis::composeMapping);
+
+    m.def("computeExpectedVisits", [](
+        storm::models::sparse::Model<double> const& model, storm::storage::BitVector const& choices,
+        storm::Environment const& env, uint64_t max_iterations
+    ) {
+        std::vector<double> visits;
+        {
+            py::gil_scoped_release release;
+            visits = synthesis::computeExpectedVisits(model, choices, env, max_iterations);
+        }
+        return vectorToArray(std::move(visits));
+    }, py::arg("model"), py::arg("choices"), py::arg("env"), py::arg("max_iterations") = 0);
+
+    m.def("packBitVector", [](storm::storage::BitVector const& bv) {
+        std::vector<uint64_t> words;
+        synthesis::Family::packBitVector(bv, words);
+        return py::bytes(reinterpret_cast<char const*>(words.data()), words.size()*sizeof(uint64_t));
+    });
+    m.def("unpackBitVector", [](py::bytes const& data, uint64_t num_bits) {
+        std::string_view buffer = data;
+        STORM_LOG_THROW(buffer.size() == synthesis::Family::numPackedWords(num_bits)*sizeof(uint64_t),
+            storm::exceptions::InvalidArgumentException, "packed bit vector does not match its size.");
+        return synthesis::Family::unpackBitVector(num_bits, reinterpret_cast<uint64_t const*>(buffer.data()));
+    });
+
+    m.def("evaluateAssignments", [](
+        storm::models::sparse::Mdp<double> const& quotient, synthesis::Coloring const& coloring,
+        synthesis::Family const& family, std::vector<std::vector<uint64_t>> const& assignments,
+        storm::logic::Formula const& formula, storm::Environment const& env, uint64_t num_threads
+    ) {
+        std::pair<std::vector<double>,std::vector<uint64_t>> result;
+        {
+            py::gil_scoped_release release;
+            result = synthesis::evaluateAssignments(quotient, coloring, family, assignments, formula, env, num_threads);
+        }
+        auto const& [values,num_states] = result;
+        return std::make_pair(
+            py::array_t<double>(values.size(), values.data()), py::array_t<uint64_t>(num_states.size(), num_states.data())
+        );
+    }, py::arg("quotient"), py::arg("coloring"), py::arg("family"), py::arg("assignments"), py::arg("formula"),
+        py::arg("env"), py::arg("num_threads") = 1);
 
     py::class_<synthesis::Family>(m, "Family")
         .def(py::init<>())
         .def(py::init<synthesis::Family const&>())
+        .def(py::init([](synthesis::Family const& reference, py::bytes const& data) {
+            std::string_view buffer = data;
+            return synthesis::Family(
+                reference, reinterpret_cast<uint64_t const*>(buffer.data()), buffer.size()/sizeof(uint64_t)
+            );
+        }), "Construct a subfamily of the reference family from options packed via pack().")
+        .def("pack", [](synthesis::Family const& family) {
+            auto words = family.packOptions();
+            return py::bytes(reinterpret_cast<char const*>(words.data()), words.size()*sizeof(uint64_t));
+        })
         .def("numHoles", &synthesis::Family::numHoles)
         .def("addHole", &synthesis::Family::addHole)
         
@@ -319,9 +562,34 @@ void bindings_coloring(py::module& m) {
             std::vector<uint64_t> const&,
             std::vector<std::vector<std::pair<uint64_t,uint64_t>>>
         >())
+        .def(py::init([](
+            synthesis::Family const& family, std::vector<uint64_t> const& row_groups,
+            py::array_t<uint64_t, py::array::c_style | py::array::forcecast> const& offsets,
+            py::array_t<uint64_t, py::array::c_style | py::array::forcecast> const& holes,
+            py::array_t<uint64_t, py::array::c_style | py::array::forcecast> const& options
+        ) {
+            // construct from the CSR arrays produced by getChoiceToAssignmentCsr()
+            uint64_t num_choices = row_groups.back();
+            STORM_LOG_THROW(
+                (uint64_t)offsets.size() == num_choices+1 and holes.size() == options.size() and
+                (uint64_t)holes.size() == offsets.at(num_choices),
+                storm::exceptions::InvalidArgumentException, "CSR arrays do not match the number of choices."
+            );
+            return synthesis::Coloring(family, row_groups,
+                synthesis::choiceToAssignmentFromCsr(num_choices, offsets.data(), holes.data(), options.data())
+            );
+        }))
         .def("getChoiceToAssignment", &synthesis::Coloring::getChoiceToAssignment)
+        .def("getChoiceToAssignmentCsr", [](synthesis::Coloring const& coloring) {
+            auto [offsets,holes,options] = synthesis::choiceToAssignmentToCsr(coloring.getChoiceToAssignment());
+            return std::make_tuple(
+                vectorToArray(std::move(offsets)), vectorToArray(std::move(holes)), vectorToArray(std::move(options))
+            );
+        })
         .def("getStateToHoles", &synthesis::Coloring::getStateToHoles)
-        .def("selectCompatibleChoices", &synthesis::Coloring::selectCompatibleChoices)
+        .def("selectCompatibleChoices", py::overload_cast<synthesis::Family const&>(&synthesis::Coloring::selectCompatibleChoices, py::const_))
+        .def("selectCompatibleChoices", py::overload_cast<synthesis::Family const&, storm::storage::BitVector const&>(&synthesis::Coloring::selectCompatibleChoices, py::const_))
+        .def("selectCompatibleChoices", py::overload_cast<synthesis::Family const&, storm::storage::BitVector const&, uint64_t>(&synthesis::Coloring::selectCompatibleChoices, py::const_))
         .def("collectHoleOptions", &synthesis::Coloring::collectHoleOptions)
         ;
 
@@ -345,4 +613,26 @@ void bindings_coloring(py::module& m) {
         // .def_property_readonly("unsat_core", [](synthesis::ColoringSmt<>& coloring) {return coloring.unsat_core;})
         .def("getProfilingInfo", &synthesis::ColoringSmt<>::getProfilingInfo)
         ;
+
+    py::class_<synthesis::SymbolicQuotient, std::shared_ptr<synthesis::SymbolicQuotient>>(m, "SymbolicQuotient")
+        .def(py::init<
+            std::shared_ptr<synthesis::SymbolicQuotient::SymbolicModel>,
+            std::vector<std::string> const&,
+            std::vector<std::vector<int64_t>> const&
+        >())
+        .def("getModel", &synthesis::SymbolicQuotient::getModel)
+        .def("familyIsEmpty", &synthesis::SymbolicQuotient::familyIsEmpty)
+        .def("checkFormula", &synthesis::SymbolicQuotient::checkFormula, py::call_guard<py::gil_scoped_release>())
+        .def("familyBounds", &synthesis::SymbolicQuotient::familyBounds)
+        .def("memberValues", [](synthesis::SymbolicQuotient const& quotient, uint64_t formula_index, synthesis::Family const& family) {
+            std::vector<double> values;
+            {
+                py::gil_scoped_release release;
+                values = quotient.memberValues(formula_index, family);
+            }
+            return vectorToArray(std::move(values));
+        })
+        .def("familyMemberValues", &synthesis::SymbolicQuotient::familyMemberValues, py::call_guard<py::gil_scoped_release>())
+        .def("buildSparse", &synthesis::SymbolicQuotient::buildSparse, py::call_guard<py::gil_scoped_release>())
+        ;
 }
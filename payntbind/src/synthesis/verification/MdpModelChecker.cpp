@@ -1,6 +1,8 @@
 #include "MdpModelChecker.h"
 
 #include "storm/modelchecker/prctl/SparseMdpPrctlModelChecker.h"
+#include "storm/modelchecker/hints/ExplicitModelCheckerHint.h"
+#include "storm/utility/constants.h"
 #include "storm/exceptions/NotSupportedException.h"
 
 namespace synthesis {
@@ -18,10 +20,51 @@ namespace synthesis {
         return modelchecker.check(env, task);
     }
 
+    template<typename ValueType>
+    std::shared_ptr<storm::modelchecker::CheckResult> verifyMdpWithHint(
+        storm::Environment const& env,
+        std::shared_ptr<storm::models::sparse::Mdp<ValueType>> const& mdp,
+        storm::logic::Formula const& formula,
+        storm::modelchecker::ExplicitQuantitativeCheckResult<ValueType> const& hint_result,
+        std::vector<uint64_t> const& state_to_hint_state,
+        bool produce_schedulers
+    ) {
+        storm::modelchecker::CheckTask<storm::logic::Formula, ValueType> task(formula);
+        task.setProduceSchedulers(produce_schedulers);
+
+        auto const& hint_values = hint_result.getValueVector();
+        std::vector<ValueType> values(mdp->getNumberOfStates());
+        bool hint_is_finite = true;
+        for(uint64_t state = 0; state < mdp->getNumberOfStates(); ++state) {
+            values[state] = hint_values[state_to_hint_state[state]];
+            if(storm::utility::isInfinity(values[state])) {
+                hint_is_finite = false;
+                break;
+            }
+        }
+        // infinite values cannot be used as starting values of the solver
+        if(hint_is_finite) {
+            auto hint = std::make_shared<storm::modelchecker::ExplicitModelCheckerHint<ValueType>>();
+            hint->setResultHint(std::move(values));
+            task.setHint(hint);
+        }
+        storm::modelchecker::SparseMdpPrctlModelChecker<storm::models::sparse::Mdp<ValueType>> modelchecker(*mdp);
+        return modelchecker.check(env, task);
+    }
+
     template std::shared_ptr<storm::modelchecker::CheckResult> verifyMdp<double>(
         storm::Environment const& env,
         std::shared_ptr<storm::models::sparse::Mdp<double>> const& mdp,
         storm::logic::Formula const& formula,
         bool produce_schedulers
     );
+
+    template std::shared_ptr<storm::modelchecker::CheckResult> verifyMdpWithHint<double>(
+        storm::Environment const& env,
+        std::shared_ptr<storm::models::sparse::Mdp<double>> const& mdp,
+        storm::logic::Formula const& formula,
+        storm::modelchecker::ExplicitQuantitativeCheckResult<double> const& hint_result,
+        std::vector<uint64_t> const& state_to_hint_state,
+        bool produce_schedulers
+    );
 }
@@ -4,6 +4,7 @@
 #include "storm/models/sparse/Mdp.h"
 #include "storm/modelchecker/CheckTask.h"
 #include "storm/modelchecker/results/CheckResult.h"
+#include "storm/modelchecker/results/ExplicitQuantitativeCheckResult.h"
 
 namespace synthesis {
 
@@ -15,4 +16,19 @@ namespace synthesis {
         bool produce_schedulers
     );
 
+    /**
+     * Model check an MDP using the result obtained for a related MDP as the starting point of the solver.
+     * @param hint_result result computed for the related MDP
+     * @param state_to_hint_state for each state of the MDP, the corresponding state of the related MDP
+     */
+    template<typename ValueType>
+    std::shared_ptr<storm::modelchecker::CheckResult> verifyMdpWithHint(
+        storm::Environment const& env,
+        std::shared_ptr<storm::models::sparse::Mdp<ValueType>> const& mdp,
+        storm::logic::Formula const& formula,
+        storm::modelchecker::ExplicitQuantitativeCheckResult<ValueType> const& hint_result,
+        std::vector<uint64_t> const& state_to_hint_state,
+        bool produce_schedulers
+    );
+
 }
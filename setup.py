@@ -75,7 +75,7 @@ setup(
     long_description=
     "PAYNT (Probabilistic progrAm sYNThesizer) is a tool for automated synthesis of probabilistic programs.",
     packages=find_packages(),
-    install_requires=['click', 'stormpy', 'z3-solver'],
+    install_requires=['click', 'stormpy', 'z3-solver', 'numpy'],
     extras_require={},
     package_data={
         'paynt': [],
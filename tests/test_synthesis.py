@@ -1,6 +1,9 @@
 import unittest
 import subprocess
 import logging
+import json
+import os
+import tempfile
 
 from test_utils import PayntTestUtils
 
@@ -99,6 +102,96 @@ class SynthesisTestSuite(unittest.TestCase):
     # def test_grid_optimal_one_by_one(self):
     #     self.run_grid_optimal_for_oracle('onebyone')
 
+    def run_kydie_all_in_one(self, engine):
+
+        process = subprocess.Popen([
+            'python3',
+            PayntTestUtils.get_path_to_paynt_executable(),
+            PayntTestUtils.get_path_to_models() + '/dtmc/kydie/',
+            '--method', 'all_in_one',
+            '--all-in-one-engine', f'{engine}',
+        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        stdout, stderr = process.communicate()
+        # 3.verify phase
+        self.assertEqual(0, process.returncode)
+        self.assertIn("optimal member (value 3.66666", str(stdout))
+
+    def test_kydie_all_in_one_sparse(self):
+
+        self.run_kydie_all_in_one('sparse')
+
+    def test_kydie_all_in_one_bdd(self):
+
+        self.run_kydie_all_in_one('bdd')
+
+    def test_kydie_batch(self):
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_path = os.path.join(tmp_dir, "results.jsonl")
+            manifest_path = os.path.join(tmp_dir, "manifest.json")
+            manifest = {"output": output_path, "jobs": [
+                {"name": "ar", "props": "sketch.props"},
+                {"name": "cegis", "props": "sketch.props", "method": "cegis"},
+            ]}
+            with open(manifest_path, "w") as file:
+                json.dump(manifest, file)
+
+            process = subprocess.Popen([
+                'python3',
+                PayntTestUtils.get_path_to_paynt_executable(),
+                PayntTestUtils.get_path_to_models() + '/dtmc/kydie/',
+                '--batch', manifest_path,
+            ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+            stdout, stderr = process.communicate()
+            # 3.verify phase
+            self.assertEqual(0, process.returncode)
+            with open(output_path) as file:
+                records = [json.loads(line) for line in file]
+        self.assertEqual(["ar", "cegis"], [record["name"] for record in records])
+        for record in records:
+            self.assertNotIn("error", record)
+            self.assertAlmostEqual(3.666667, record["optimum"], places=4)
+        self.assertIn("mdp", records[0]["iterations"])
+        self.assertIn("dtmc", records[1]["iterations"])
+
+    def test_kydie_symbolic(self):
+
+        process = subprocess.Popen([
+            'python3',
+            PayntTestUtils.get_path_to_paynt_executable(),
+            PayntTestUtils.get_path_to_models() + '/dtmc/kydie/',
+            '--symbolic',
+        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        stdout, stderr = process.communicate()
+        # 3.verify phase
+        self.assertEqual(0, process.returncode)
+        self.assertIn("optimum: 3.666667", str(stdout))
+
+    def run_kydie_with_options(self, options):
+
+        process = subprocess.Popen([
+            'python3',
+            PayntTestUtils.get_path_to_paynt_executable(),
+            PayntTestUtils.get_path_to_models() + '/dtmc/kydie/',
+        ] + options, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        stdout, stderr = process.communicate()
+        # 3.verify phase
+        self.assertEqual(0, process.returncode)
+        self.assertIn("optimum: 3.666667", str(stdout))
+
+    def test_kydie_checkpoint_resume(self):
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checkpoint_path = os.path.join(tmp_dir, "kydie.checkpoint")
+            for method in ["ar", "hybrid"]:
+                self.run_kydie_with_options(['--method', method, '--checkpoint', checkpoint_path])
+                self.assertTrue(os.path.isfile(checkpoint_path))
+                self.run_kydie_with_options(['--method', method, '--resume', checkpoint_path])
+
     @classmethod
     def tearDownClass(cls):
         # 4.teardown phase
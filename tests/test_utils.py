@@ -10,12 +10,17 @@ PayntUtils class, which provides auxiliary methods for the tests
 
 
 class PayntTestUtils:
-    ROOT_DIR = "./../.."
+    ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
 
     @staticmethod
     def get_path_to_paynt_executable():
-        assert "paynt.py" in os.listdir(PayntTestUtils.ROOT_DIR + "/paynt/")
-        return PayntTestUtils.ROOT_DIR + "/paynt/paynt.py"
+        assert "paynt.py" in os.listdir(PayntTestUtils.ROOT_DIR)
+        return PayntTestUtils.ROOT_DIR + "/paynt.py"
+
+    @staticmethod
+    def get_path_to_models():
+        assert "models" in os.listdir(PayntTestUtils.ROOT_DIR)
+        return PayntTestUtils.ROOT_DIR + "/models"
 
     @staticmethod
     def get_path_to_workspace_examples():